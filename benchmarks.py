@@ -0,0 +1,214 @@
+import argparse
+import gc
+import json
+import platform
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List
+
+from blockchain import Block, Blockchain
+from constants import SignatureScheme
+from deserialize_service import DeserializeService
+from signature_backend import BACKENDS
+from transaction import Transaction, Instruction, AccountMeta
+from wallet import Keypair
+
+
+def _transfer(sender: str, receiver: str, amount: int, recent_blockhash: str = None) -> Transaction:
+    instr = Instruction(
+        program_id="SystemProgram",
+        accounts=[
+            AccountMeta(pubkey=sender, is_signer=True, is_writable=True),
+            AccountMeta(pubkey=receiver, is_signer=False, is_writable=True)
+        ],
+        data=json.dumps({"type": "transfer", "amount": amount})
+    )
+    return Transaction([instr], recent_blockhash)
+
+
+def build_chain(amount_of_blocks: int, txs_per_block: int) -> List[Block]:
+    keypair = Keypair.generate()
+    leader = keypair.address
+
+    # one real signature reused everywhere: these paths never verify, but messages keep their real size
+    template = _transfer(leader, leader, 0)
+    template.sign(keypair)
+
+    blockchain = Blockchain()
+    for i in range(1, amount_of_blocks):
+        if i > 1:
+            recent_blockhash = blockchain.get_last_block().hash()
+            for j in range(txs_per_block):
+                tx = _transfer(leader, f"{i:08x}{j:08x}".ljust(64, "0"), 0, recent_blockhash)
+                tx.signatures = dict(template.signatures)
+                blockchain.add_transaction(tx)
+        blockchain.add_external_block(blockchain.produce_block(leader))
+    return blockchain.blocks
+
+
+class Benchmark:
+    def __init__(self, name: str, ops: int, run: Callable[[object], None], setup: Callable[[], object] = None):
+        self.name = name
+        self.ops = ops
+        self.run = run
+        self.setup = setup or (lambda: None)
+
+
+def _make_benchmarks(blocks: List[Block], ops: int, sign_ops: int) -> List[Benchmark]:
+    keypair = Keypair.generate()
+    sender = keypair.address
+    txs = [_transfer(sender, f"{i:064x}", 1, blocks[-1].hash()) for i in range(ops)]
+    signed = txs[:sign_ops]
+    for tx in signed:
+        tx.sign(keypair)
+    busiest = max(blocks, key=lambda b: len(b.transactions))
+    chain_data = {"blocks": [b.to_dict() for b in blocks]}
+
+    def funded_blockchain():
+        blockchain = Blockchain()
+        blockchain.accounts[sender] = {"balance": ops}
+        return blockchain
+
+    def run_apply(blockchain: Blockchain):
+        for tx in txs:
+            blockchain.apply_transaction(tx)
+
+    def run_add(blockchain: Blockchain):
+        for block in blocks[1:]:
+            blockchain.add_external_block(block)
+
+    def sign_loop(signer):
+        return lambda _: [signer.sign(message) for _ in range(sign_ops)]
+
+    def verify_loop(verify, signature):
+        return lambda _: [verify(signature, message) for _ in range(sign_ops)]
+
+    signature_benchmarks = []
+    message = blocks[-1].hash().encode()
+    for scheme in SignatureScheme:
+        signer = Keypair.generate(scheme).signer
+        verifier = BACKENDS[scheme].verifier(signer.public_key)
+        signature_benchmarks += [
+            Benchmark(f"sign_{scheme.value}", sign_ops, sign_loop(signer)),
+            Benchmark(f"verify_{scheme.value}", sign_ops, verify_loop(verifier, signer.sign(message))),
+        ]
+
+    return signature_benchmarks + [
+        Benchmark("tx_hash", ops, lambda _: [tx.hash() for tx in txs]),
+        Benchmark("tx_sign", sign_ops, lambda _: [tx.sign(keypair) for tx in signed]),
+        Benchmark("tx_verify", sign_ops, lambda _: [tx.verify() for tx in signed]),
+        Benchmark("block_hash", ops, lambda _: [busiest.hash() for _ in range(ops)]),
+        Benchmark("deserialize_chain", len(blocks), lambda _: DeserializeService.deserialize_chain(chain_data)),
+        Benchmark("apply_transaction", ops, run_apply, funded_blockchain),
+        Benchmark("add_external_block", len(blocks) - 1, run_add, Blockchain),
+        Benchmark("try_to_update_chain", len(blocks), lambda b: b.try_to_update_chain(list(blocks)), Blockchain),
+    ]
+
+
+def measure(benchmark: Benchmark, repeat: int, warmup: int) -> dict:
+    samples = []
+    for i in range(warmup + repeat):
+        state = benchmark.setup()
+        gc_was_enabled = gc.isenabled()
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            benchmark.run(state)
+            elapsed = time.perf_counter() - start
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+        if i >= warmup:
+            samples.append(elapsed / benchmark.ops)
+
+    quartiles = statistics.quantiles(samples, n=4) if len(samples) > 1 else [samples[0]] * 3
+    median = statistics.median(samples)
+    return {
+        "ops": benchmark.ops,
+        "samples": samples,
+        "min": min(samples),
+        "median": median,
+        "mean": statistics.mean(samples),
+        "stdev": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "iqr": quartiles[2] - quartiles[0],
+        "ops_per_sec": 1 / median if median else 0.0
+    }
+
+
+def run_benchmarks(amount_of_blocks: int = 3000, txs_per_block: int = 10, ops: int = 1000, sign_ops: int = 100,
+                   repeat: int = 7, warmup: int = 1, only: List[str] = None) -> dict:
+    config = {
+        "blocks": amount_of_blocks,
+        "txs_per_block": txs_per_block,
+        "ops": ops,
+        "sign_ops": sign_ops,
+        "repeat": repeat,
+        "warmup": warmup
+    }
+    blocks = build_chain(amount_of_blocks, txs_per_block)
+
+    results = {}
+    for benchmark in _make_benchmarks(blocks, ops, sign_ops):
+        if only and benchmark.name not in only:
+            continue
+        results[benchmark.name] = measure(benchmark, repeat, warmup)
+        print(f"⏱️ {benchmark.name:<22} {results[benchmark.name]['median'] * 1e6:>12.2f} µs/op "
+              f"(±{results[benchmark.name]['iqr'] * 1e6:.2f} IQR)")
+
+    return {
+        "config": config,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "signature_backends": {scheme.value: backend.implementation for scheme, backend in BACKENDS.items()},
+        "timestamp": time.time(),
+        "results": results
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> Dict[str, float]:
+    regressions = {}
+    if current["config"] != baseline.get("config"):
+        print("⚠️ Baseline was recorded with a different configuration")
+
+    for name, result in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if base is None:
+            continue
+        ratio = result["median"] / base["median"]
+        marker = "❌" if ratio > 1 + threshold else "✅"
+        print(f"{marker} {name:<22} {ratio:6.2f}x baseline")
+        if ratio > 1 + threshold:
+            regressions[name] = ratio
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for the ledger hot paths")
+    parser.add_argument("--blocks", type=int, default=3000)
+    parser.add_argument("--txs-per-block", type=int, default=10)
+    parser.add_argument("--ops", type=int, default=1000)
+    parser.add_argument("--sign-ops", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--only", nargs="*")
+    parser.add_argument("--output", help="write JSON results to this file")
+    parser.add_argument("--baseline", help="compare against JSON results saved earlier")
+    parser.add_argument("--threshold", type=float, default=0.1, help="allowed slowdown of the median, 0.1 = 10%%")
+    args = parser.parse_args()
+
+    report = run_benchmarks(args.blocks, args.txs_per_block, args.ops, args.sign_ops, args.repeat, args.warmup,
+                            args.only)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Results saved to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            regressions = compare(report, json.load(f), args.threshold)
+        if regressions:
+            print(f"❌ {len(regressions)} benchmark(s) regressed by more than {args.threshold:.0%}")
+            sys.exit(1)
@@ -1,43 +1,94 @@
-import base64
 import hashlib
-from typing import List
+import json
+import threading
+import time
+from typing import List, Optional, Union
+
+from constants import Constants, EventType
+from events import EventBus
+from metrics import MetricsRegistry
+from state import StateVersion
+from state_root import StateTree
+from tracing import NULL_TRACER, Tracer
+from transaction import Transaction
+from wallet import Keypair, as_keypair, pubkey_to_address
 
-from ecdsa import SigningKey, SECP256k1
 
-from constants import Constants
-from transaction import Transaction
+def _header_content(index, previous_hash, leader_id, poh, txs_hash, state_root) -> str:
+    # blocks without a state root hash exactly as they did before roots existed
+    return f"{index}{previous_hash}{leader_id}{poh}{txs_hash}{state_root or ''}"
+
+
+def _hash_header(index, previous_hash, leader_id, poh, txs_hash, validator_signatures, state_root=None) -> str:
+    raw = _header_content(index, previous_hash, leader_id, poh, txs_hash, state_root)
+    raw += "".join(validator_signatures)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class BlockHeader:
+    def __init__(self, index, previous_hash, leader_id, poh, txs_hash, validator_signatures: dict,
+                 state_root: Optional[str] = None):
+        self.index = index
+        self.previous_hash = previous_hash
+        self.leader_id = leader_id
+        self.poh = poh
+        self.txs_hash = txs_hash
+        self.validator_signatures = validator_signatures
+        self.state_root = state_root
+
+    def hash(self):
+        return _hash_header(self.index, self.previous_hash, self.leader_id, self.poh, self.txs_hash,
+                            self.validator_signatures, self.state_root)
+
+    def to_dict(self):
+        data = {
+            "index": self.index,
+            "previous_hash": self.previous_hash,
+            "leader_id": self.leader_id,
+            "poh": self.poh,
+            "txs_hash": self.txs_hash,
+            "validator_signatures": self.validator_signatures
+        }
+        if self.state_root is not None:
+            data["state_root"] = self.state_root
+        return data
 
 
 class Block:
-    def __init__(self, index, previous_hash, transactions, leader_id, poh, validator_signatures: dict):
+    def __init__(self, index, previous_hash, transactions, leader_id, poh, validator_signatures: dict,
+                 state_root: Optional[str] = None):
         self.index = index
         self.previous_hash = previous_hash
         self.transactions = transactions
         self.leader_id = leader_id
         self.poh = poh
         self.validator_signatures = validator_signatures
+        # root of the state the block is applied to, i.e. after its parent
+        self.state_root = state_root
 
         self._txs_hash = hashlib.sha256("".join(tx.hash() for tx in self.transactions).encode()).hexdigest()
 
     def hash(self):
-        raw = f"{self.index}{self.previous_hash}{self.leader_id}{self.poh}{self._txs_hash}"
-        raw += "".join(self.validator_signatures)
-        return hashlib.sha256(raw.encode()).hexdigest()
+        return _hash_header(self.index, self.previous_hash, self.leader_id, self.poh, self._txs_hash,
+                            self.validator_signatures, self.state_root)
+
+    def header(self) -> BlockHeader:
+        return BlockHeader(self.index, self.previous_hash, self.leader_id, self.poh, self._txs_hash,
+                           self.validator_signatures, self.state_root)
 
     def hash_content(self):
-        raw = f"{self.index}{self.previous_hash}{self.leader_id}{self.poh}{self._txs_hash}"
+        raw = _header_content(self.index, self.previous_hash, self.leader_id, self.poh, self._txs_hash,
+                              self.state_root)
         return hashlib.sha256(raw.encode()).hexdigest()
 
-    def sign_block(self, privkey_wif: str) -> str:
-        sk = SigningKey.from_string(base64.b64decode(privkey_wif), curve=SECP256k1)
-        message_hash = self.hash_content().encode()
-        return base64.b64encode(sk.sign(message_hash)).decode()
+    def sign_block(self, key: Union[Keypair, str]) -> str:
+        return as_keypair(key).sign(self.hash_content())
 
     def add_signature(self, validator: str, signature: str):
         self.validator_signatures[validator] = signature
 
     def to_dict(self):
-        return {
+        data = {
             "index": self.index,
             "previous_hash": self.previous_hash,
             "transactions": [tx.to_dict() for tx in self.transactions],
@@ -45,6 +96,9 @@ class Block:
             "poh": self.poh,
             "validator_signatures": self.validator_signatures
         }
+        if self.state_root is not None:
+            data["state_root"] = self.state_root
+        return data
 
 
 def _initial_poh() -> str:
@@ -52,13 +106,44 @@ def _initial_poh() -> str:
 
 
 class Blockchain:
-    def __init__(self):
+    def __init__(self, metrics: MetricsRegistry = None, tracer: Tracer = None, events: EventBus = None):
         self.blocks: List[Block] = []
         self.accounts: dict[str, dict] = {}
+        self._dirty: set = set()
+        self._state = StateVersion(0, {})
+        self._state_reset = False
+        self.state_tree = StateTree()
         self.pending_txs: List[Transaction] = []
+        self.next_slot_txs: List[Transaction] = []
+        self._mempool_lock = threading.Lock()
+        self._pending_since: Optional[float] = None
+        self._next_slot_since: Optional[float] = None
         self.last_poh = _initial_poh()
+        self.validators: set = set()
+        self._epoch_stakes: dict[int, dict[str, float]] = {}
+        self._tx_index: dict[str, int] = {}
+        self._tx_indexed_height = 0
+        self._tx_index_lock = threading.Lock()
+        self._executor = None
+        self._tracer = tracer or NULL_TRACER
+        self.events = events or EventBus()
+        self._init_metrics(metrics or MetricsRegistry())
         self._create_genesis_block()
 
+    def _init_metrics(self, metrics: MetricsRegistry):
+        self._m_blocks_added = metrics.counter("blocks_added_total", "Blocks appended to the local chain")
+        self._m_blocks_rejected = metrics.counter("blocks_rejected_total", "Blocks that failed validation")
+        self._m_block_apply = metrics.histogram("block_apply_seconds", "Time to execute a block's transactions")
+        self._m_txs_applied = metrics.counter("transactions_applied_total", "Transactions executed")
+        self._m_chain_replaced = metrics.counter("chain_replacements_total", "Full chain replacements")
+        metrics.gauge("chain_height", "Number of blocks in the local chain").set_function(lambda: len(self.blocks))
+        mempool = metrics.gauge("mempool_size", "Transactions waiting in the mempool", ("slot",))
+        mempool.set_function(lambda: len(self.pending_txs), "current")
+        mempool.set_function(lambda: len(self.next_slot_txs), "next")
+
+    def set_executor(self, executor):
+        self._executor = executor
+
     def _generate_next_poh(self) -> str:
         next_poh = hashlib.sha256(self.last_poh.encode()).hexdigest()
         self.last_poh = next_poh
@@ -72,6 +157,11 @@ class Blockchain:
         if block.poh != expected_poh:
             print("❌ Block rejected: invalid PoH")
             return False
+
+        # with split execution the local root lags behind the chain, so only the leader's side is checked there
+        if block.state_root is not None and self._executor is None and block.state_root != self.state_root():
+            print(f"❌ Block rejected: state root mismatch at block {block.index}")
+            return False
         return True
 
     def _peek_next_poh(self) -> str:
@@ -84,14 +174,49 @@ class Blockchain:
     def get_last_block(self) -> Block:
         return self.blocks[-1]
 
-    def add_transaction(self, tx: Transaction) -> bool:
-        self.pending_txs.append(tx)
+    def add_transaction(self, tx: Transaction, next_slot: bool = False) -> bool:
+        with self._mempool_lock:
+            if next_slot:
+                if not self.next_slot_txs:
+                    self._next_slot_since = time.monotonic()
+                self.next_slot_txs.append(tx)
+            else:
+                if not self.pending_txs:
+                    self._pending_since = time.monotonic()
+                self.pending_txs.append(tx)
         return True
 
+    def mempool_size(self) -> int:
+        return len(self.pending_txs)
+
+    def oldest_pending_age(self) -> Optional[float]:
+        since = self._pending_since
+        if since is None or not self.pending_txs:
+            return None
+        return time.monotonic() - since
+
+    def _advance_mempool(self, block: Block):
+        self._merge_next_slot({tx.hash() for tx in block.transactions})
+
+    def release_next_slot(self):
+        # the round was dropped, so transactions held back for it are due in the next one
+        self._merge_next_slot(set())
+
+    def _merge_next_slot(self, included: set):
+        with self._mempool_lock:
+            leftovers = [tx for tx in self.pending_txs if tx.hash() not in included]
+            if not leftovers:
+                self._pending_since = self._next_slot_since
+            self.pending_txs = leftovers + self.next_slot_txs
+            self.next_slot_txs = []
+            self._next_slot_since = None
+
     def apply_transaction(self, tx: Transaction):
         for instr in tx.instructions:
             if instr.program_id == "SystemProgram":
                 self._execute_system_program(instr)
+            elif instr.program_id == "ValidatorProgram":
+                self._execute_validator_program(tx, instr)
 
     def _execute_system_program(self, instr):
         sender = instr.accounts[0].pubkey
@@ -100,57 +225,225 @@ class Blockchain:
         amount = data.get("amount")
 
         if self.accounts.get(sender, {}).get("balance", 0) >= amount:
-            self.accounts[sender]["balance"] -= amount
-            self.accounts.setdefault(receiver, {"balance": 0})
-            self.accounts[receiver]["balance"] += amount
-
-    def produce_block(self, leader_id: str) -> Block:
-        poh = self._peek_next_poh()
-        block = Block(
-            index=len(self.blocks),
-            previous_hash=self.get_last_block().hash(),
-            transactions=self.pending_txs,
-            leader_id=leader_id,
-            poh=poh,
-            validator_signatures={}
-        )
+            self._set_balance(sender, self.accounts[sender]["balance"] - amount)
+            self._set_balance(receiver, self.accounts.get(receiver, {}).get("balance", 0) + amount)
+
+    def _execute_validator_program(self, tx: Transaction, instr):
+        address = instr.accounts[0].pubkey
+        try:
+            action = json.loads(instr.data).get("action")
+        except (ValueError, AttributeError):
+            return
+
+        # only the key behind an address may register it
+        if action == "register" and address in {pubkey_to_address(pubkey) for pubkey in tx.signatures}:
+            self.validators.add(address)
+
+    def _set_balance(self, address: str, balance: float):
+        self.accounts[address] = {"balance": balance}
+        self._dirty.add(address)
+        self.state_tree.update(address, balance)
+
+    def produce_block(self, leader_id: str) -> Optional[Block]:
+        with self._tracer.span("produce_block", len(self.blocks)):
+            poh = self._peek_next_poh()
+            # a root taken before the parent is applied would be stale, and followers would reject the block
+            if self._executor is not None and not self._executor.wait_applied(Constants.TIME_TO_SLEEP):
+                print("⚠️ Execution is lagging, skipping the slot")
+                return None
+            block = Block(
+                index=len(self.blocks),
+                previous_hash=self.get_last_block().hash(),
+                transactions=list(self.pending_txs),
+                leader_id=leader_id,
+                poh=poh,
+                validator_signatures={},
+                state_root=self.state_root()
+            )
 
         return block
 
     def add_external_block(self, block: Block) -> bool:
+        with self._tracer.span("add_external_block", block.index):
+            return self._add_external_block(block)
+
+    def _add_external_block(self, block: Block) -> bool:
         if not self.validate_block(block):
+            self._m_blocks_rejected.inc()
             return False
 
         self.last_poh = block.poh
 
-        for tx in block.transactions:
-            self.apply_transaction(tx)
+        started = time.perf_counter()
+        self._execute_block(block)
+        self._m_block_apply.observe(time.perf_counter() - started)
         self.blocks.append(block)
-        self.pending_txs = []
-
-        self.accounts.setdefault(block.leader_id, {"balance": 0})
-        self.accounts[block.leader_id]["balance"] += Constants.BLOCK_REWARD
+        if self._executor is None:
+            self.publish_state()
+        self._advance_mempool(block)
+        self._m_blocks_added.inc()
+        self._announce_blocks([block])
 
         return True
 
+    def apply_block(self, block: Block):
+        for tx in block.transactions:
+            self.apply_transaction(tx)
+        self._m_txs_applied.inc(amount=len(block.transactions))
+
+        self._set_balance(block.leader_id, self.accounts.get(block.leader_id, {}).get("balance", 0)
+                          + Constants.BLOCK_REWARD)
+        self._record_epoch_stakes(block)
+
+    def _execute_block(self, block: Block):
+        if self._executor is not None:
+            self._executor.execute_block(block)
+        else:
+            self.apply_block(block)
+
+    def apply_execution_result(self, accounts: dict[str, float], epoch: Optional[int] = None,
+                               stakes: Optional[dict[str, float]] = None, validators: Optional[list] = None,
+                               publish: bool = True):
+        for address, balance in accounts.items():
+            self._set_balance(address, balance)
+        if validators:
+            self.validators.update(validators)
+        if publish:
+            self.publish_state()
+        if epoch is not None:
+            self._epoch_stakes[epoch] = stakes
+            self._epoch_stakes.pop(epoch - 2, None)
+
+    def reset_state(self):
+        # the published version stays readable until the rebuilt state replaces it
+        self.accounts = {}
+        self.validators = set()
+        self._epoch_stakes = {}
+        self._dirty = set()
+        self._state_reset = True
+        self.state_tree = StateTree()
+
+    def publish_state(self):
+        previous = self._state
+        if self._state_reset:
+            balances = {address: acc["balance"] for address, acc in self.accounts.items()}
+            self._state = StateVersion(len(self.blocks), balances)
+            self._state_reset = False
+            changed = None
+        else:
+            changed = {address: self.accounts[address]["balance"] for address in self._dirty}
+            self._state = previous.derive(len(self.blocks), changed)
+        self._dirty = set()
+
+        if self.events.has_subscribers(EventType.ACCOUNT_CHANGED):
+            if changed is None:
+                # a rebuilt base has no change set, so compare it with the version readers saw before
+                old = previous.to_dict()
+                changed = {address: balance for address, balance in balances.items() if old.get(address) != balance}
+                changed.update((address, 0.0) for address in old.keys() - balances.keys())
+            for address, balance in changed.items():
+                self.events.publish(EventType.ACCOUNT_CHANGED,
+                                    {"address": address, "balance": balance, "height": self._state.height}, address)
+
+    def _announce_blocks(self, blocks: List[Block]):
+        for block in blocks:
+            self.events.publish(EventType.BLOCK_ADDED, {"index": block.index, "hash": block.hash(),
+                                                        "leader_id": block.leader_id,
+                                                        "transactions": len(block.transactions)})
+            if self.events.has_subscribers(EventType.TX_CONFIRMED):
+                for tx in block.transactions:
+                    tx_hash = tx.hash()
+                    self.events.publish(EventType.TX_CONFIRMED, {"hash": tx_hash, "block": block.index}, tx_hash)
+
+    def state(self) -> StateVersion:
+        return self._state
+
+    def state_root(self) -> str:
+        return self.state_tree.root()
+
+    def replace_state_buckets(self, buckets: dict[int, dict[str, float]]):
+        # state sync: overwrite only the buckets found to differ with StateTree.diff
+        for index, accounts in buckets.items():
+            for address in self.state_tree.bucket(index):
+                if address not in accounts:
+                    self.state_tree.remove(address)
+                    self.accounts.pop(address, None)
+                    self._dirty.discard(address)
+                    self._state_reset = True
+            for address, balance in accounts.items():
+                self._set_balance(address, balance)
+        self.publish_state()
+
+    def _record_epoch_stakes(self, block: Block):
+        if (block.index + 1) % Constants.SLOTS_PER_EPOCH != 0:
+            return
+        epoch = (block.index + 1) // Constants.SLOTS_PER_EPOCH
+        # the snapshot freezes both the validator set and its stakes for the epoch
+        self._epoch_stakes[epoch] = {address: self.accounts.get(address, {}).get("balance", 0)
+                                     for address in self.validators}
+        self._epoch_stakes.pop(epoch - 2, None)
+
+    def get_epoch_stakes(self, epoch: int) -> Optional[dict[str, float]]:
+        # None until the epoch's last block is applied: live balances differ between nodes, snapshots do not
+        if epoch == 0:
+            return {}
+        stakes = self._epoch_stakes.get(epoch)
+        if stakes is None and self._executor is not None and self._executor.wait_applied(Constants.TIME_TO_SLEEP):
+            # with split execution the snapshot arrives with the result of the epoch's last block
+            stakes = self._epoch_stakes.get(epoch)
+        return stakes
+
     def print_chain(self):
         for block in self.blocks:
             print(f"Block {block.index} | Hash: {block.hash()[:8]} | TXs: {len(block.transactions)} | Leader: {block.leader_id[:6]} | PoH: {block.poh[:6]}")
 
+    def get_headers(self, start: int, end: int) -> List[BlockHeader]:
+        return [block.header() for block in self.blocks[start:end]]
+
+    def get_blocks(self, start: int, end: int) -> List[Block]:
+        return self.blocks[start:end]
+
+    def get_transaction_block(self, tx_hash: str) -> Optional[int]:
+        # built lazily, so block application never pays for hashes nobody asks about
+        with self._tx_index_lock:
+            blocks = self.blocks
+            for block in blocks[self._tx_indexed_height:]:
+                for tx in block.transactions:
+                    self._tx_index[tx.hash()] = block.index
+            self._tx_indexed_height = len(blocks)
+            return self._tx_index.get(tx_hash)
+
+    def is_pending(self, tx_hash: str) -> bool:
+        with self._mempool_lock:
+            txs = self.pending_txs + self.next_slot_txs
+        return any(tx.hash() == tx_hash for tx in txs)
+
     def get_balance(self, address: str) -> float:
-        return self.accounts.get(address, {}).get("balance", 0.0)
+        return self._state.get_balance(address)
 
     def try_to_update_chain(self, blocks: List[Block]):
         if len(blocks) > len(self.blocks):
+            old_height = len(self.blocks)
             self.blocks = blocks
-            self.accounts = {}
+            with self._tx_index_lock:
+                self._tx_index = {}
+                self._tx_indexed_height = 0
+            self._m_chain_replaced.inc()
             self.last_poh = _initial_poh()
             for block in self.blocks:
                 self.last_poh = block.poh
-                for tx in block.transactions:
-                    self.apply_transaction(tx)
-                self.accounts.setdefault(block.leader_id, {"balance": 0})
-                self.accounts[block.leader_id]["balance"] += Constants.BLOCK_REWARD
+            # genesis only seeds PoH; nodes that grew block by block never executed it either
+            replayed = [block for block in self.blocks if block.index > 0]
+            if self._executor is not None:
+                # the executor resets on its own results thread, and the old version stays published until the
+                # last replayed block is applied
+                self._executor.replay(replayed)
+            else:
+                self.reset_state()
+                for block in replayed:
+                    self.apply_block(block)
+                self.publish_state()
+            self._announce_blocks(blocks[old_height:])
 
     def to_dict(self):
         return {
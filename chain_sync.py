@@ -0,0 +1,117 @@
+import hashlib
+import time
+from typing import Dict, List, Optional, Tuple
+
+from blockchain import Block, BlockHeader
+from constants import Constants
+
+
+class ChainSync:
+    def __init__(self):
+        self.peer_tips: Dict[str, int] = {}
+        self.target_height = 0
+        self.last_duration: Optional[float] = None
+
+        self._header_peer: Optional[str] = None
+        self._headers: Dict[int, BlockHeader] = {}
+        self._bodies: Dict[int, Block] = {}
+        self._next_header = 0
+        self._next_range = 0
+        self._last_hash = ""
+        self._last_poh = ""
+        self._started_at = 0.0
+        self._last_progress = 0.0
+        self._round_robin = 0
+
+    def is_syncing(self) -> bool:
+        return self._header_peer is not None
+
+    def reset(self):
+        self._header_peer = None
+        self._headers = {}
+        self._bodies = {}
+        self.target_height = 0
+
+    def expire_stalled(self):
+        if self.is_syncing() and time.time() - self._last_progress > Constants.SYNC_TIMEOUT:
+            print("⚠️ Sync stalled, restarting")
+            self.reset()
+
+    def on_tip(self, peer: str, height: int, local_tip: Block) -> Optional[Tuple[int, int]]:
+        self.peer_tips[peer] = height
+        self.expire_stalled()
+
+        local_height = local_tip.index + 1
+        if self.is_syncing() or height <= local_height:
+            return None
+
+        self._header_peer = peer
+        self.target_height = height
+        self._next_header = local_height
+        self._next_range = local_height
+        self._last_hash = local_tip.hash()
+        self._last_poh = local_tip.poh
+        self._started_at = self._last_progress = time.time()
+        return self.next_header_range()
+
+    def next_header_range(self) -> Optional[Tuple[int, int]]:
+        if self._next_header >= self.target_height:
+            return None
+        return self._next_header, min(self.target_height, self._next_header + Constants.SYNC_MAX_HEADERS)
+
+    def is_header_peer(self, peer: str) -> bool:
+        return peer == self._header_peer
+
+    def is_first_batch(self) -> bool:
+        return not self._headers
+
+    def on_headers(self, headers: List[BlockHeader]) -> bool:
+        for header in headers:
+            expected_poh = hashlib.sha256(self._last_poh.encode()).hexdigest()
+            if header.index != self._next_header or header.previous_hash != self._last_hash \
+                    or header.poh != expected_poh:
+                return False
+
+            self._headers[header.index] = header
+            self._last_hash = header.hash()
+            self._last_poh = header.poh
+            self._next_header += 1
+
+        self._last_progress = time.time()
+        return True
+
+    def assign_ranges(self) -> List[Tuple[str, int, int]]:
+        assignments = []
+        while self._next_range < self._next_header:
+            start = self._next_range
+            end = min(self._next_header, start + Constants.SYNC_RANGE_SIZE)
+            peers = sorted(peer for peer, tip in self.peer_tips.items() if tip >= end)
+            if not peers:
+                peers = [self._header_peer]
+
+            assignments.append((peers[self._round_robin % len(peers)], start, end))
+            self._round_robin += 1
+            self._next_range = end
+        return assignments
+
+    def on_blocks(self, blocks: List[Block]):
+        for block in blocks:
+            header = self._headers.get(block.index)
+            if header is not None and block.hash() == header.hash():
+                self._bodies[block.index] = block
+        self._last_progress = time.time()
+
+    def pop_ready(self, local_height: int) -> List[Block]:
+        ready = []
+        while local_height in self._bodies:
+            ready.append(self._bodies.pop(local_height))
+            self._headers.pop(local_height, None)
+            local_height += 1
+        return ready
+
+    def try_finish(self, local_height: int) -> bool:
+        if not self.is_syncing() or local_height < self.target_height:
+            return False
+        self.last_duration = time.time() - self._started_at
+        self.reset()
+        return True
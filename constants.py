@@ -3,15 +3,22 @@ from enum import Enum
 
 class MessageType:
     TX = "tx"
+    TX_BATCH = "tx_batch"
     SHARE_BLOCK = "share_block"
     REQUEST_CHAIN = "request_chain"
     CHAIN = "chain"
-    CHOOSE_CREATOR = "choose_creator"
     REBROADCAST = "rebroadcast"
     FINALISE_BLOCK = "finalize_block"
     DISCONNECT = "disconnect"
     CREATOR = "creator"
     SIGNATURE = "signature"
+    REQUEST_TIP = "request_tip"
+    TIP = "tip"
+    REQUEST_HEADERS = "request_headers"
+    HEADERS = "headers"
+    REQUEST_BLOCKS = "request_blocks"
+    BLOCKS = "blocks"
+    ROUND_TIMEOUT = "round_timeout"
 
 
 class CreatorField:
@@ -22,6 +29,10 @@ class CreatorField:
 class SignatureField:
     ADDRESS = "address"
     SIGNATURE = "signature"
+    PUBKEY = "pubkey"
+    INDEX = "index"
+    BLOCK_HASH = "block_hash"
+    VOTES = "votes"
 
 
 class MessageField:
@@ -35,6 +46,10 @@ class TxField:
     SIGNATURES = "signatures"
 
 
+class TxBatchField:
+    TXS = "txs"
+
+
 class InstructionField:
     PROGRAM_ID = "program_id"
     ACCOUNTS = "accounts"
@@ -55,6 +70,8 @@ class BlockField:
     TIMESTAMP = "timestamp"
     POH = "poh"
     VALIDATOR_SIGNATURES = "validator_signatures"
+    TXS_HASH = "txs_hash"
+    STATE_ROOT = "state_root"
 
 
 class ShareBlockField:
@@ -67,6 +84,16 @@ class BlockchainField:
     BLOCKS = "blocks"
 
 
+class SyncField:
+    HOST = "host"
+    PORT = "port"
+    HEIGHT = "height"
+    START = "start"
+    END = "end"
+    HEADERS = "headers"
+    BLOCKS = "blocks"
+
+
 class DisconnectField:
     HOST = "host"
     PORT = "port"
@@ -76,6 +103,52 @@ class RebroadcastField:
     HOST = "host"
     PORT = "port"
     BLOCK = "block"
+    KIND = "kind"
+    NODES = "nodes"
+
+
+class ExecutionField:
+    OP = "op"
+    SEQ = "seq"
+    BLOCK = "block"
+    ACCOUNTS = "accounts"
+    EPOCH = "epoch"
+    STAKES = "stakes"
+    REPLAY = "replay"
+    VALIDATORS = "validators"
+
+
+class ExecutionOp:
+    BLOCK = "block"
+    RESET = "reset"
+    STOP = "stop"
+
+
+class RpcMethod:
+    SEND_TRANSACTION = "sendTransaction"
+    SEND_TRANSACTION_BATCH = "sendTransactionBatch"
+    GET_BALANCE = "getBalance"
+    GET_MULTIPLE_ACCOUNTS = "getMultipleAccounts"
+    GET_TRANSACTION_STATUS = "getTransactionStatus"
+    GET_BLOCK = "getBlock"
+    GET_STATE_NODES = "getStateNodes"
+    GET_STATE_BUCKET = "getStateBucket"
+
+
+class RpcErrorCode:
+    PARSE_ERROR = -32700
+    INVALID_REQUEST = -32600
+    METHOD_NOT_FOUND = -32601
+    INVALID_PARAMS = -32602
+    INTERNAL_ERROR = -32603
+    TRANSACTION_REJECTED = -32002
+
+
+class EventType:
+    BLOCK_ADDED = "blockAdded"
+    TX_CONFIRMED = "txConfirmed"
+    ACCOUNT_CHANGED = "accountChanged"
+    ALL = (BLOCK_ADDED, TX_CONFIRMED, ACCOUNT_CHANGED)
 
 
 class Role(Enum):
@@ -83,6 +156,21 @@ class Role(Enum):
     USER = "user"
 
 
+class OverflowPolicy(Enum):
+    BLOCK = "block"
+    DROP = "drop"
+
+
+class WorkerPoolKind(Enum):
+    THREAD = "thread"
+    PROCESS = "process"
+
+
+class SignatureScheme(Enum):
+    ECDSA = "ecdsa"
+    ED25519 = "ed25519"
+
+
 class Stage(Enum):
     TX = "tx"
     BLOCK = "block"
@@ -91,4 +179,47 @@ class Stage(Enum):
 
 class Constants:
     TIME_TO_SLEEP = 10
-    BLOCK_REWARD = 10
\ No newline at end of file
+    BLOCK_REWARD = 10
+    TURBINE_FANOUT = 3
+    SYNC_MAX_HEADERS = 2000
+    SYNC_RANGE_SIZE = 100
+    SYNC_TIMEOUT = 30
+    TX_BATCH_MAX_SIZE = 64
+    TX_BATCH_WINDOW_US = 2000
+    TX_LANE_CAPACITY = 10000
+    TX_LANE_OVERFLOW = OverflowPolicy.BLOCK
+    TX_LANE_PUT_TIMEOUT = 1.0
+    WORKER_POOL_KIND = WorkerPoolKind.THREAD
+    WORKER_POOL_SIZE = 4
+    DISCOVERY_PORT = 9000
+    HEARTBEAT_INTERVAL = 5
+    DISCOVERY_WINDOW = 0.5
+    PEER_TIMEOUT = 20
+    PEER_MAX_FAILURES = 3
+    PEER_RTT_ALPHA = 0.2
+    SYNC_REQUEST_INTERVAL = 10
+    SEEN_CACHE_CAPACITY = 100_000
+    SEEN_CACHE_TTL = 120
+    SEEN_CACHE_BLOOM_BITS = 0
+    SEEN_CACHE_BLOOM_HASHES = 4
+    SLOTS_PER_EPOCH = 100
+    VOTE_ROUNDS = 8
+    ROUND_TIMEOUT_SLOTS = 3
+    GENESIS_VALIDATORS = ()
+    MIN_SLOT_TIME = 0.2
+    SLOT_MEMPOOL_THRESHOLD = 1000
+    SLOT_MAX_TX_AGE = 1.0
+    SLOT_DURATION_ALPHA = 0.2
+    SHM_RING_CAPACITY = 16 * 1024 * 1024
+    METRICS_HOST = "127.0.0.1"
+    TRACE_CAPACITY = 100_000
+    STATE_MAX_OVERLAYS = 16
+    VERIFYING_KEY_CACHE_SIZE = 4096
+    SIGNATURE_SCHEME = SignatureScheme.ECDSA
+    KEYSTORE_CHUNK_SIZE = 256
+    RPC_HOST = "127.0.0.1"
+    RPC_MAX_BATCH = 1000
+    EVENT_FEED_HOST = "127.0.0.1"
+    EVENT_FEED_QUEUE_SIZE = 10_000
+    EVENT_FEED_POLL_INTERVAL = 1.0
+    STATE_TREE_BUCKETS = 256
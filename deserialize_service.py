@@ -1,9 +1,10 @@
 from typing import List, Tuple
 
-from blockchain import Block
+from blockchain import Block, BlockHeader
 from transaction import Transaction, Instruction, AccountMeta
+from vote_aggregator import Vote
 from constants import BlockField, BlockchainField, DisconnectField, RebroadcastField, TxField, ShareBlockField, \
-    SignatureField
+    SignatureField, SyncField, TxBatchField
 
 
 class DeserializeService:
@@ -31,6 +32,10 @@ class DeserializeService:
         tx.signatures = data.get("signatures", {})
         return tx
 
+    @staticmethod
+    def deserialize_tx_batch(data: dict) -> List[Transaction]:
+        return [DeserializeService.deserialize_tx(tx) for tx in data[TxBatchField.TXS]]
+
     @staticmethod
     def deserialize_block(data: dict) -> Block:
         txs = [DeserializeService.deserialize_tx(tx) for tx in data[BlockField.TRANSACTIONS]]
@@ -40,7 +45,8 @@ class DeserializeService:
             transactions=txs,
             leader_id=data[BlockField.LEADER_ID],
             poh=data[BlockField.POH],
-            validator_signatures=data[BlockField.VALIDATOR_SIGNATURES]
+            validator_signatures=data[BlockField.VALIDATOR_SIGNATURES],
+            state_root=data.get(BlockField.STATE_ROOT)
         )
 
     @staticmethod
@@ -51,19 +57,61 @@ class DeserializeService:
         return block, host, port
 
     @staticmethod
-    def deserialize_signature(data: dict) -> (str, str):
-        signature = data[SignatureField.SIGNATURE]
-        address = data[SignatureField.SIGNATURE]
-        return signature, address
+    def deserialize_vote(data: dict) -> Vote:
+        return Vote(
+            index=int(data[SignatureField.INDEX]),
+            block_hash=data[SignatureField.BLOCK_HASH],
+            address=data[SignatureField.ADDRESS],
+            pubkey=data[SignatureField.PUBKEY],
+            signature=data[SignatureField.SIGNATURE]
+        )
+
+    @staticmethod
+    def deserialize_signature(data: dict) -> List[Vote]:
+        return [DeserializeService.deserialize_vote(vote) for vote in data[SignatureField.VOTES]]
 
     @staticmethod
     def deserialize_chain(data: dict) -> List[Block]:
         return [DeserializeService.deserialize_block(b) for b in data[BlockchainField.BLOCKS]]
 
     @staticmethod
-    def deserialize_rebroadcast(data: dict) -> Tuple[str, int, Block]:
-        block = DeserializeService.deserialize_block(data[RebroadcastField.BLOCK])
-        return data[RebroadcastField.HOST], int(data[RebroadcastField.PORT]), block
+    def deserialize_header(data: dict) -> BlockHeader:
+        return BlockHeader(
+            index=data[BlockField.INDEX],
+            previous_hash=data[BlockField.PREVIOUS_HASH],
+            leader_id=data[BlockField.LEADER_ID],
+            poh=data[BlockField.POH],
+            txs_hash=data[BlockField.TXS_HASH],
+            validator_signatures=data[BlockField.VALIDATOR_SIGNATURES],
+            state_root=data.get(BlockField.STATE_ROOT)
+        )
+
+    @staticmethod
+    def deserialize_sync_peer(data: dict) -> Tuple[str, int]:
+        return data[SyncField.HOST], int(data[SyncField.PORT])
+
+    @staticmethod
+    def deserialize_tip(data: dict) -> Tuple[str, int, int]:
+        return data[SyncField.HOST], int(data[SyncField.PORT]), int(data[SyncField.HEIGHT])
+
+    @staticmethod
+    def deserialize_sync_request(data: dict) -> Tuple[str, int, int, int]:
+        return data[SyncField.HOST], int(data[SyncField.PORT]), int(data[SyncField.START]), int(data[SyncField.END])
+
+    @staticmethod
+    def deserialize_headers(data: dict) -> Tuple[str, int, List[BlockHeader]]:
+        headers = [DeserializeService.deserialize_header(h) for h in data[SyncField.HEADERS]]
+        return data[SyncField.HOST], int(data[SyncField.PORT]), headers
+
+    @staticmethod
+    def deserialize_blocks(data: dict) -> Tuple[str, int, List[Block]]:
+        blocks = [DeserializeService.deserialize_block(b) for b in data[SyncField.BLOCKS]]
+        return data[SyncField.HOST], int(data[SyncField.PORT]), blocks
+
+    @staticmethod
+    def deserialize_rebroadcast(data: dict) -> Tuple[str, int, str, List[str], dict]:
+        return (data[RebroadcastField.HOST], int(data[RebroadcastField.PORT]), data[RebroadcastField.KIND],
+                data[RebroadcastField.NODES], data[RebroadcastField.BLOCK])
 
     @staticmethod
     def deserialize_disconnect(data: dict) -> Tuple[str, int]:
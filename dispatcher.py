@@ -0,0 +1,120 @@
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+from constants import MessageType, MessageField, Constants, OverflowPolicy
+
+
+CONSENSUS_MESSAGES = {
+    MessageType.SIGNATURE,
+    MessageType.FINALISE_BLOCK,
+    MessageType.CREATOR,
+    MessageType.ROUND_TIMEOUT,
+    MessageType.SHARE_BLOCK,
+    MessageType.REBROADCAST,
+}
+
+TX_MESSAGES = {
+    MessageType.TX,
+    MessageType.TX_BATCH,
+}
+
+
+class Lane:
+    def __init__(self, name: str, capacity: Optional[int] = None):
+        self.name = name
+        self.capacity = capacity
+        self.items = deque()
+
+        self.enqueued = 0
+        self.dequeued = 0
+        self.dropped = 0
+        self.max_depth = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def is_full(self) -> bool:
+        return self.capacity is not None and len(self.items) >= self.capacity
+
+    def stats(self) -> dict:
+        return {
+            "depth": len(self.items),
+            "max_depth": self.max_depth,
+            "enqueued": self.enqueued,
+            "dequeued": self.dequeued,
+            "dropped": self.dropped,
+            "avg_wait": self.total_wait / self.dequeued if self.dequeued else 0.0,
+            "max_wait": self.max_wait
+        }
+
+
+class MessageDispatcher:
+    def __init__(self, tx_capacity: int = None, overflow: OverflowPolicy = None, put_timeout: float = None):
+        self.consensus = Lane("consensus")
+        self.control = Lane("control")
+        self.tx = Lane("tx", tx_capacity or Constants.TX_LANE_CAPACITY)
+        self._lanes = [self.consensus, self.control, self.tx]
+
+        self._overflow = overflow or Constants.TX_LANE_OVERFLOW
+        self._put_timeout = Constants.TX_LANE_PUT_TIMEOUT if put_timeout is None else put_timeout
+
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+
+    def _lane_for(self, message: dict) -> Lane:
+        msg_type = message.get(MessageField.TYPE)
+        if msg_type in CONSENSUS_MESSAGES:
+            return self.consensus
+        if msg_type in TX_MESSAGES:
+            return self.tx
+        return self.control
+
+    def put(self, message: dict) -> bool:
+        lane = self._lane_for(message)
+        with self._lock:
+            if lane.is_full() and self._overflow == OverflowPolicy.BLOCK:
+                deadline = time.perf_counter() + self._put_timeout
+                while lane.is_full():
+                    remaining = deadline - time.perf_counter()
+                    if remaining <= 0:
+                        break
+                    self._not_full.wait(remaining)
+
+            if lane.is_full():
+                lane.dropped += 1
+                return False
+
+            lane.items.append((time.perf_counter(), message))
+            lane.enqueued += 1
+            lane.max_depth = max(lane.max_depth, len(lane.items))
+            self._not_empty.notify()
+            return True
+
+    def get(self) -> dict:
+        with self._lock:
+            while True:
+                for lane in self._lanes:
+                    if lane.items:
+                        enqueued_at, message = lane.items.popleft()
+                        wait = time.perf_counter() - enqueued_at
+                        lane.dequeued += 1
+                        lane.total_wait += wait
+                        lane.max_wait = max(lane.max_wait, wait)
+                        if lane.capacity is not None:
+                            self._not_full.notify()
+                        return message
+                self._not_empty.wait()
+
+    def empty(self) -> bool:
+        with self._lock:
+            return not any(lane.items for lane in self._lanes)
+
+    def qsize(self) -> int:
+        with self._lock:
+            return sum(len(lane.items) for lane in self._lanes)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {lane.name: lane.stats() for lane in self._lanes}
@@ -0,0 +1,142 @@
+import json
+import queue
+import socket
+import socketserver
+import threading
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from constants import Constants, EventType
+
+Callback = Callable[[str, dict], None]
+
+
+class EventBus:
+    def __init__(self):
+        self._subscriptions: Dict[int, Tuple[str, Optional[str], Callback]] = {}
+        self._by_type: Dict[str, Dict[Optional[str], List[Tuple[int, Callback]]]] = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def subscribe(self, event_type: str, callback: Callback, key: Optional[str] = None) -> int:
+        # key narrows the subscription to one tx hash (TX_CONFIRMED) or one address (ACCOUNT_CHANGED)
+        with self._lock:
+            self._next_id += 1
+            self._subscriptions[self._next_id] = (event_type, key, callback)
+            self._rebuild(event_type)
+            return self._next_id
+
+    def unsubscribe(self, subscription: int):
+        with self._lock:
+            entry = self._subscriptions.pop(subscription, None)
+            if entry is not None:
+                self._rebuild(entry[0])
+
+    def _rebuild(self, event_type: str):
+        # publishers read an immutable snapshot, so publishing takes no lock
+        by_key: Dict[Optional[str], List[Tuple[int, Callback]]] = {}
+        for subscription, (kind, key, callback) in self._subscriptions.items():
+            if kind == event_type:
+                by_key.setdefault(key, []).append((subscription, callback))
+        if by_key:
+            self._by_type[event_type] = by_key
+        else:
+            self._by_type.pop(event_type, None)
+
+    def has_subscribers(self, event_type: str) -> bool:
+        return event_type in self._by_type
+
+    def publish(self, event_type: str, data: dict, key: Optional[str] = None):
+        by_key = self._by_type.get(event_type)
+        if not by_key:
+            return
+        callbacks = by_key.get(None, []) + (by_key.get(key, []) if key is not None else [])
+        for _, callback in callbacks:
+            # callbacks run on the thread that applied the block, so they must not block
+            try:
+                callback(event_type, data)
+            except Exception as e:
+                print(f"❌ Error in {event_type} subscriber: {e}")
+
+    def wait_for(self, event_type: str, key: Optional[str] = None, timeout: Optional[float] = None) -> Optional[dict]:
+        received = []
+        done = threading.Event()
+
+        def on_event(_, data):
+            received.append(data)
+            done.set()
+
+        subscription = self.subscribe(event_type, on_event, key)
+        try:
+            done.wait(timeout)
+        finally:
+            self.unsubscribe(subscription)
+        return received[0] if received else None
+
+
+class EventFeedServer:
+    def __init__(self, bus: EventBus, port: int, host: str = None):
+        self.bus = bus
+        self._stopped = threading.Event()
+        bus_ref = bus
+        stopped = self._stopped
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                try:
+                    request = json.loads(self.rfile.readline())
+                    event_types = [event for event in request["events"] if event in EventType.ALL]
+                    keys = request.get("keys") or [None]
+                except (ValueError, KeyError, TypeError):
+                    self.wfile.write(b'{"error": "expected {\\"events\\": [...], \\"keys\\": [...]}"}\n')
+                    return
+
+                pending = queue.Queue(maxsize=Constants.EVENT_FEED_QUEUE_SIZE)
+                overflowed = threading.Event()
+
+                def on_event(event_type, data):
+                    try:
+                        pending.put_nowait((event_type, data))
+                    except queue.Full:
+                        overflowed.set()
+
+                # block events carry no key, so a key list only narrows confirmations and account changes
+                subscriptions = [bus_ref.subscribe(event_type, on_event, key) for event_type in event_types
+                                 for key in (keys if event_type != EventType.BLOCK_ADDED else [None])]
+                try:
+                    while not stopped.is_set() and not overflowed.is_set():
+                        try:
+                            event_type, data = pending.get(timeout=Constants.EVENT_FEED_POLL_INTERVAL)
+                        except queue.Empty:
+                            continue
+                        self.wfile.write(json.dumps({"event": event_type, "data": data}).encode() + b"\n")
+                    if overflowed.is_set():
+                        self.wfile.write(b'{"error": "subscriber too slow, events dropped"}\n')
+                except OSError:
+                    pass
+                finally:
+                    for subscription in subscriptions:
+                        bus_ref.unsubscribe(subscription)
+
+        self._server = socketserver.ThreadingTCPServer((host or Constants.EVENT_FEED_HOST, port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+
+    def start(self):
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        print(f"📡 Event feed on {self._server.server_address[0]}:{self.port}")
+
+    def stop(self):
+        self._stopped.set()
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def subscribe_feed(host: str, port: int, event_types: List[str], keys: List[str] = None,
+                   timeout: Optional[float] = None) -> Iterator[Tuple[str, dict]]:
+    with socket.create_connection((host, port), timeout=timeout) as sock:
+        sock.sendall(json.dumps({"events": event_types, "keys": keys or []}).encode() + b"\n")
+        for line in sock.makefile("rb"):
+            message = json.loads(line)
+            if "error" in message:
+                raise ConnectionError(message["error"])
+            yield message["event"], message["data"]
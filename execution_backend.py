@@ -0,0 +1,122 @@
+import json
+import multiprocessing
+import threading
+from typing import List
+
+from blockchain import Blockchain, Block
+from constants import Constants, ExecutionField, ExecutionOp
+from deserialize_service import DeserializeService
+from shm_ring import ShmRingBuffer
+
+
+def _touched_accounts(block: Block) -> set:
+    touched = {block.leader_id}
+    for tx in block.transactions:
+        for instr in tx.instructions:
+            if instr.program_id == "SystemProgram":
+                touched.update(account.pubkey for account in instr.accounts[:2])
+    return touched
+
+
+def run_execution_backend(requests: ShmRingBuffer, results: ShmRingBuffer):
+    state = Blockchain()
+    state.reset_state()
+
+    while True:
+        request = json.loads(requests.get())
+        op = request[ExecutionField.OP]
+        result = {ExecutionField.OP: op, ExecutionField.SEQ: request[ExecutionField.SEQ]}
+        if request.get(ExecutionField.REPLAY):
+            result[ExecutionField.REPLAY] = True
+
+        if op == ExecutionOp.STOP:
+            results.put(json.dumps(result).encode())
+            return
+
+        if op == ExecutionOp.RESET:
+            state.reset_state()
+        elif op == ExecutionOp.BLOCK:
+            block = DeserializeService.deserialize_block(request[ExecutionField.BLOCK])
+            validators = set(state.validators)
+            state.apply_block(block)
+            state.publish_state()
+            result[ExecutionField.ACCOUNTS] = {address: state.get_balance(address)
+                                               for address in _touched_accounts(block) if address in state.accounts}
+            if state.validators != validators:
+                result[ExecutionField.VALIDATORS] = sorted(state.validators - validators)
+            if (block.index + 1) % Constants.SLOTS_PER_EPOCH == 0:
+                epoch = (block.index + 1) // Constants.SLOTS_PER_EPOCH
+                result[ExecutionField.EPOCH] = epoch
+                result[ExecutionField.STAKES] = state.get_epoch_stakes(epoch)
+
+        results.put(json.dumps(result).encode())
+
+
+class ExecutionClient:
+    def __init__(self, blockchain: Blockchain, capacity: int = None):
+        self._blockchain = blockchain
+        self._requests = ShmRingBuffer(capacity)
+        self._results = ShmRingBuffer(capacity)
+        self._process = multiprocessing.Process(target=run_execution_backend,
+                                                args=(self._requests, self._results), daemon=True)
+        self._sent = 0
+        self._applied = 0
+        self._cond = threading.Condition()
+        self._send_lock = threading.Lock()
+
+    def start(self):
+        self._process.start()
+        threading.Thread(target=self._read_results, daemon=True).start()
+
+    def _send(self, request: dict):
+        with self._send_lock:
+            with self._cond:
+                self._sent += 1
+                request[ExecutionField.SEQ] = self._sent
+            self._requests.put(json.dumps(request).encode())
+
+    def execute_block(self, block: Block):
+        self._send({ExecutionField.OP: ExecutionOp.BLOCK, ExecutionField.BLOCK: block.to_dict()})
+
+    def replay(self, blocks: List[Block]):
+        # every result but the last is marked, so the rebuilt state is published once, complete
+        self._send({ExecutionField.OP: ExecutionOp.RESET, ExecutionField.REPLAY: bool(blocks)})
+        for i, block in enumerate(blocks):
+            self._send({ExecutionField.OP: ExecutionOp.BLOCK, ExecutionField.BLOCK: block.to_dict(),
+                        ExecutionField.REPLAY: i < len(blocks) - 1})
+
+    def _read_results(self):
+        while True:
+            result = json.loads(self._results.get())
+            op = result[ExecutionField.OP]
+            publish = not result.get(ExecutionField.REPLAY)
+            if op == ExecutionOp.RESET:
+                self._blockchain.reset_state()
+                if publish:
+                    self._blockchain.publish_state()
+            elif op == ExecutionOp.BLOCK:
+                epoch = result.get(ExecutionField.EPOCH)
+                self._blockchain.apply_execution_result(result[ExecutionField.ACCOUNTS], epoch,
+                                                        result.get(ExecutionField.STAKES),
+                                                        result.get(ExecutionField.VALIDATORS), publish)
+
+            with self._cond:
+                self._applied = result[ExecutionField.SEQ]
+                self._cond.notify_all()
+            if op == ExecutionOp.STOP:
+                return
+
+    def lag(self) -> int:
+        with self._cond:
+            return self._sent - self._applied
+
+    def wait_applied(self, timeout: float = None) -> bool:
+        with self._cond:
+            return self._cond.wait_for(lambda: self._applied >= self._sent, timeout)
+
+    def stop(self, timeout: float = 5):
+        self._send({ExecutionField.OP: ExecutionOp.STOP})
+        self.wait_applied(timeout)
+        self._process.join(timeout)
+        self._requests.close()
+        self._results.close()
@@ -0,0 +1,82 @@
+import math
+import threading
+from typing import Dict, Iterable, Optional
+
+
+class LatencyHistogram:
+    # log-linear buckets as in HdrHistogram: exact below 2^significant_bits units, then
+    # 2^(significant_bits-1) linear sub-buckets per power of two, so relative error stays under 2^-(bits-1)
+    def __init__(self, unit: float = 1e-6, significant_bits: int = 7):
+        self.unit = unit
+        self._bits = significant_bits
+        self._counts: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+        self.count = 0
+        self.total = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def _key(self, units: int) -> int:
+        shift = max(units.bit_length() - self._bits, 0)
+        return (shift << self._bits) | (units >> shift)
+
+    def _upper_bound(self, key: int) -> float:
+        shift, mantissa = key >> self._bits, key & ((1 << self._bits) - 1)
+        return (((mantissa + 1) << shift) - 1) * self.unit
+
+    def record(self, value: float):
+        units = max(int(value / self.unit), 0)
+        key = self._key(units)
+        with self._lock:
+            self._counts[key] = self._counts.get(key, 0) + 1
+            self.count += 1
+            self.total += value
+            self.min = value if self.min is None else min(self.min, value)
+            self.max = value if self.max is None else max(self.max, value)
+
+    def record_many(self, values: Iterable[float]):
+        for value in values:
+            self.record(value)
+
+    def merge(self, other: "LatencyHistogram"):
+        if other.unit != self.unit or other._bits != self._bits:
+            raise ValueError("Histograms with different resolution cannot be merged")
+        with other._lock:
+            counts = dict(other._counts)
+            count, total, low, high = other.count, other.total, other.min, other.max
+        with self._lock:
+            for key, n in counts.items():
+                self._counts[key] = self._counts.get(key, 0) + n
+            self.count += count
+            self.total += total
+            if low is not None:
+                self.min = low if self.min is None else min(self.min, low)
+                self.max = high if self.max is None else max(self.max, high)
+
+    def percentile(self, percentile: float) -> Optional[float]:
+        with self._lock:
+            if not self.count:
+                return None
+            rank = max(1, math.ceil(percentile / 100 * self.count))
+            seen = 0
+            for key in sorted(self._counts):
+                seen += self._counts[key]
+                if seen >= rank:
+                    return min(self._upper_bound(key), self.max)
+            return self.max
+
+    def mean(self) -> Optional[float]:
+        return self.total / self.count if self.count else None
+
+    def summary(self) -> dict:
+        return {
+            "count": self.count,
+            "min": self.min,
+            "mean": self.mean(),
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+            "p999": self.percentile(99.9),
+            "max": self.max
+        }
@@ -7,9 +7,19 @@ import pytest
 from constants import Constants, Role
 from main import create_transfer_tx
 from node import SolanaNode
+from transport import InMemoryNetwork
 from wallet import generate_keypair
 
 Constants.TIME_TO_SLEEP = 10
+Constants.HEARTBEAT_INTERVAL = 1
+
+def wait_until(condition, timeout):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.1)
+    return True
 
 @pytest.fixture
 def temp_wallet_file1():
@@ -33,6 +43,7 @@ def test_leader_node_creates_block_and_updates_balance(temp_wallet_file1):
 
     node = SolanaNode(host=host, port=port, role=Role.LEADER, wallet_file=temp_wallet_file1)
     node.start()
+    assert node.register_validator()
 
     time.sleep(Constants.TIME_TO_SLEEP * 1.5)
 
@@ -40,61 +51,33 @@ def test_leader_node_creates_block_and_updates_balance(temp_wallet_file1):
     assert len(chain) == 2, "Expected 2 blocks (including genesis)"
 
     last_block = chain[-1]
-    assert len(last_block.transactions) == 0, "The last block must contain 0 transactions"
+    assert len(last_block.transactions) == 1, "The last block must contain only the validator registration"
+    assert node.blockchain.validators == {node.address}
 
     balance = node.blockchain.get_balance(node.address)
     assert balance == Constants.BLOCK_REWARD, f"The balance should be {Constants.BLOCK_REWARD}, but it is {balance}"
 
 def test_node_can_synchronize_chain(temp_wallet_file1, temp_wallet_file2):
-    host = "127.0.0.1"
+    network = InMemoryNetwork(seed=1)
     leader_port = 1111
     user_port = 2222
 
-    leader_node = SolanaNode(host=host, port=leader_port, role=Role.LEADER, wallet_file=temp_wallet_file1)
-    user_node = SolanaNode(host=host, port=user_port, role=Role.USER, wallet_file=temp_wallet_file2)
-
-    # mocks
-    leader_node._external_ip = host
-    user_node._external_ip = host
-
-    leader_node._listen_tcp = None
-    user_node._listen_tcp = None
-
-    leader_node._handle_tcp_connection = None
-    user_node._handle_tcp_connection = None
-
-    leader_node._listen_discovery = None
-    user_node._listen_discovery = None
-
-    leader_node._broadcast_presence = None
-    user_node._broadcast_presence = None
+    leader_node = SolanaNode(host="127.0.0.1", port=leader_port, role=Role.LEADER, wallet_file=temp_wallet_file1,
+                             transport=network.transport())
+    user_node = SolanaNode(host="127.0.0.1", port=user_port, role=Role.USER, wallet_file=temp_wallet_file2,
+                           transport=network.transport())
 
-    def broadcast_to_user(message: dict):
-        if len(leader_node.peers) > 0:
-            user_node.message_queue.put(message)
-
-    def broadcast_to_leader(message: dict):
-        if len(user_node.peers) > 0:
-            leader_node.message_queue.put(message)
-
-    leader_node._broadcast = broadcast_to_user
-    user_node._broadcast = broadcast_to_leader
-
-    # start miner node
+    # start miner node; without pending transactions it would not produce a block
     leader_node.start()
+    assert leader_node.register_validator()
 
     time.sleep(Constants.TIME_TO_SLEEP * 1.5)
 
-    # start user node
+    # start user node; it discovers the leader and syncs on its own
     user_node.start()
 
-    leader_node.peers.add((host, user_port))
-    user_node.peers.add((host, leader_port))
-    user_node.validators_nodes.add(f"{host}:{leader_port}")
-
-    user_node._broadcast_request_chain()
-
-    time.sleep(5)
+    assert wait_until(lambda: len(user_node.blockchain.blocks) == 2, Constants.TIME_TO_SLEEP * 0.5), \
+        "The user node did not sync the leader's block"
 
     miner_chain = copy.deepcopy(leader_node.blockchain.blocks)
     user_chain = copy.deepcopy(user_node.blockchain.blocks)
@@ -111,62 +94,34 @@ def test_node_can_synchronize_chain(temp_wallet_file1, temp_wallet_file2):
     assert user_balance == 0, f"The user balance should be 0, but it is {user_balance}"
 
 def test_transaction_propagates_between_nodes(temp_wallet_file1, temp_wallet_file2):
-    host = "127.0.0.1"
+    network = InMemoryNetwork(seed=1)
     leader_port = 1111
     user_port = 2222
 
-    leader_node = SolanaNode(host=host, port=leader_port, role=Role.LEADER, wallet_file=temp_wallet_file1)
-    user_node = SolanaNode(host=host, port=user_port, role=Role.USER, wallet_file=temp_wallet_file2)
-
-    # mocks
-    leader_node._external_ip = host
-    user_node._external_ip = host
-
-    leader_node._listen_tcp = None
-    user_node._listen_tcp = None
-
-    leader_node._handle_tcp_connection = None
-    user_node._handle_tcp_connection = None
-
-    leader_node._listen_discovery = None
-    user_node._listen_discovery = None
-
-    leader_node._broadcast_presence = None
-    user_node._broadcast_presence = None
+    leader_node = SolanaNode(host="127.0.0.1", port=leader_port, role=Role.LEADER, wallet_file=temp_wallet_file1,
+                             transport=network.transport())
+    user_node = SolanaNode(host="127.0.0.1", port=user_port, role=Role.USER, wallet_file=temp_wallet_file2,
+                           transport=network.transport())
 
-    def broadcast_to_user(message: dict):
-        if len(leader_node.peers) > 0:
-            user_node.message_queue.put(message)
-
-    def broadcast_to_leader(message: dict):
-        if len(user_node.peers) > 0:
-            leader_node.message_queue.put(message)
-
-    leader_node._broadcast = broadcast_to_user
-    user_node._broadcast = broadcast_to_leader
-
-    user_node.validators_nodes.add(f"{host}:{leader_port}")
-
-    # start miner node
+    # start miner node; without pending transactions it would not produce a block
     leader_node.start()
+    assert leader_node.register_validator()
 
     time.sleep(Constants.TIME_TO_SLEEP * 1.5)
 
     # start user node
     user_node.start()
 
-    leader_node.peers.add((host, user_port))
-    user_node.peers.add((host, leader_port))
-
-    user_node._broadcast_request_chain()
-
-    time.sleep(5)
+    # the nodes must know each other before the block carrying the transaction is finalized
+    assert wait_until(lambda: len(user_node.blockchain.blocks) == 2 and leader_node.peers,
+                      Constants.TIME_TO_SLEEP * 0.5), "The user node did not join the leader"
 
     coins_to_send = 1
     tx = create_transfer_tx(leader_node, to_address=user_node.address, amount=coins_to_send)
     leader_node.add_and_broadcast_tx(tx)
 
-    time.sleep(Constants.TIME_TO_SLEEP)
+    assert wait_until(lambda: len(leader_node.blockchain.blocks) == len(user_node.blockchain.blocks) == 3,
+                      Constants.TIME_TO_SLEEP * 1.5), "The block with the transaction did not reach both nodes"
 
     leader_chain = copy.deepcopy(leader_node.blockchain.blocks)
     user_chain = copy.deepcopy(user_node.blockchain.blocks)
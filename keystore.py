@@ -0,0 +1,112 @@
+import argparse
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from constants import Constants, SignatureScheme
+from wallet import Keypair, as_keypair, generate_keypair, load_wallet, pubkey_to_address
+
+Entry = Tuple[str, str, str]
+
+
+def _generate_entries(count: int, scheme: Optional[SignatureScheme]) -> List[Entry]:
+    entries = []
+    for _ in range(count):
+        privkey, pubkey = generate_keypair(scheme)
+        entries.append((pubkey_to_address(pubkey), pubkey, privkey))
+    return entries
+
+
+class Keystore:
+    def __init__(self, entries: Iterable[Entry] = ()):
+        self._entries: List[Entry] = []
+        self._index: Dict[str, int] = {}
+        self._keypairs: Dict[str, Keypair] = {}
+        for entry in entries:
+            self._add_entry(entry)
+
+    def _add_entry(self, entry: Entry) -> str:
+        address = entry[0]
+        if address not in self._index:
+            self._index[address] = len(self._entries)
+            self._entries.append(entry)
+        return address
+
+    def add(self, key: Union[Keypair, str]) -> str:
+        keypair = as_keypair(key)
+        self._keypairs.setdefault(keypair.address, keypair)
+        return self._add_entry((keypair.address, keypair.pubkey, keypair.privkey))
+
+    def extend(self, other: "Keystore"):
+        for entry in other._entries:
+            self._add_entry(entry)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, address: str) -> bool:
+        return address in self._index
+
+    def addresses(self) -> List[str]:
+        return [entry[0] for entry in self._entries]
+
+    def pubkey(self, address: str) -> str:
+        return self._entries[self._index[address]][1]
+
+    def privkey(self, address: str) -> str:
+        return self._entries[self._index[address]][2]
+
+    def keypair(self, address: str) -> Keypair:
+        # signing keys are only built for accounts that actually sign
+        keypair = self._keypairs.get(address)
+        if keypair is None:
+            keypair = self._keypairs[address] = Keypair(self.privkey(address))
+        return keypair
+
+    def keypairs(self, count: Optional[int] = None) -> List[Keypair]:
+        return [self.keypair(entry[0]) for entry in self._entries[:count]]
+
+    def save(self, path: str):
+        with open(path, "w") as f:
+            json.dump({"keys": [{"address": address, "pubkey": pubkey, "privkey": privkey}
+                                for address, pubkey, privkey in self._entries]}, f)
+
+    @classmethod
+    def load(cls, path: str) -> "Keystore":
+        with open(path, "r") as f:
+            data = json.load(f)
+        return cls((key["address"], key["pubkey"], key["privkey"]) for key in data["keys"])
+
+    @classmethod
+    def from_wallets(cls, paths: Iterable[str]) -> "Keystore":
+        keystore = cls()
+        for path in paths:
+            keystore.add(load_wallet(path))
+        return keystore
+
+
+def generate_keystore(count: int, scheme: Optional[SignatureScheme] = None, workers: Optional[int] = None,
+                      chunk_size: int = None) -> Keystore:
+    chunk_size = chunk_size or Constants.KEYSTORE_CHUNK_SIZE
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_generate_entries, min(chunk_size, count - start), scheme)
+                   for start in range(0, count, chunk_size)]
+        return Keystore(entry for future in futures for entry in future.result())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a keystore with many accounts")
+    parser.add_argument("output")
+    parser.add_argument("--count", type=int, default=1000)
+    parser.add_argument("--scheme", choices=[scheme.value for scheme in SignatureScheme])
+    parser.add_argument("--workers", type=int, help="generating processes (default: one per CPU)")
+    parser.add_argument("--wallets", nargs="*", default=[], help="existing wallets to put first")
+    args = parser.parse_args()
+
+    started = time.time()
+    keystore = Keystore.from_wallets(args.wallets)
+    generated = generate_keystore(args.count, SignatureScheme(args.scheme) if args.scheme else None, args.workers)
+    keystore.extend(generated)
+    keystore.save(args.output)
+    print(f"🔑 {len(keystore)} keys saved to {args.output} in {time.time() - started:.1f}s")
@@ -0,0 +1,34 @@
+import hashlib
+import random
+from typing import Dict, Optional
+
+from constants import Constants
+
+
+def epoch_of(slot: int) -> int:
+    return slot // Constants.SLOTS_PER_EPOCH
+
+
+class LeaderSchedule:
+    def __init__(self, epoch: int, stakes: Dict[str, float], seed: str):
+        self.epoch = epoch
+        self.first_slot = epoch * Constants.SLOTS_PER_EPOCH
+
+        self.validators = frozenset(stakes)
+        validators = sorted(stakes)
+        weights = [max(stakes[v], 0) for v in validators]
+        if not any(weights):
+            weights = [1] * len(validators)
+
+        rng = random.Random(hashlib.sha256(f"{seed}{epoch}".encode()).digest())
+        self._slots = rng.choices(validators, weights=weights, k=Constants.SLOTS_PER_EPOCH) if validators else []
+
+    @property
+    def is_open(self) -> bool:
+        # no validator is known yet, so any leader may produce, as a lone bootstrap validator does
+        return not self._slots
+
+    def leader_for(self, slot: int) -> Optional[str]:
+        if not self._slots:
+            return None
+        return self._slots[slot - self.first_slot]
@@ -0,0 +1,192 @@
+import argparse
+import hashlib
+import json
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Union
+
+from constants import Constants, EventType, Role
+from deserialize_service import DeserializeService
+from histogram import LatencyHistogram
+from keystore import Keystore
+from main import choose_port
+from node import SolanaNode
+from transaction import Transaction, Instruction, AccountMeta
+from wallet import Keypair, as_keypair, load_wallet
+
+
+def _sign_chunk(key: Union[Keypair, str], recipients: List[str], start: int, count: int,
+                recent_blockhash: str) -> List[dict]:
+    keypair = as_keypair(key)
+    txs = []
+    for i in range(start, start + count):
+        instr = Instruction(
+            program_id="SystemProgram",
+            accounts=[
+                AccountMeta(pubkey=keypair.address, is_signer=True, is_writable=True),
+                AccountMeta(pubkey=recipients[i % len(recipients)], is_signer=False, is_writable=True)
+            ],
+            data=json.dumps({"type": "transfer", "amount": 1, "nonce": i})
+        )
+        tx = Transaction([instr], recent_blockhash)
+        tx.sign(keypair)
+        txs.append(tx.to_dict())
+    return txs
+
+
+def presign_transfers(keys: List[Union[Keypair, str]], recipients: List[str], count: int, recent_blockhash: str,
+                      workers: int = None, chunk_size: int = 256) -> List[Transaction]:
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = []
+        for n, start in enumerate(range(0, count, chunk_size)):
+            futures.append(pool.submit(_sign_chunk, keys[n % len(keys)], recipients, start,
+                                       min(chunk_size, count - start), recent_blockhash))
+        return [DeserializeService.deserialize_tx(tx) for future in futures for tx in future.result()]
+
+
+class LoadGenerator:
+    def __init__(self, node: SolanaNode, rate: float, senders: int = 8, drain_timeout: float = 30.0):
+        self.node = node
+        self.rate = rate
+        self.senders = senders
+        self.drain_timeout = drain_timeout
+
+        self.latency = LatencyHistogram()
+        self.send_lag = LatencyHistogram()
+        self._intended: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._rejected = 0
+        self._confirmed = 0
+        self._last_confirm = 0.0
+        self._submitting = True
+        self._drained = threading.Event()
+
+    def _send(self, sender: int, txs: List[Transaction], hashes: List[str], start: float):
+        for i in range(sender, len(txs), self.senders):
+            due = start + i / self.rate
+            delay = due - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            # latency is measured from the intended send time, so a stalled sender cannot hide queueing delay
+            self.send_lag.record(max(time.monotonic() - due, 0.0))
+            with self._lock:
+                self._intended[hashes[i]] = due
+            if not self.node.add_and_broadcast_tx(txs[i]):
+                with self._lock:
+                    self._intended.pop(hashes[i], None)
+                    self._rejected += 1
+
+    def _on_confirmed(self, _, data: dict):
+        now = time.monotonic()
+        with self._lock:
+            due = self._intended.pop(data["hash"], None)
+            if due is None:
+                return
+            self._confirmed += 1
+            self._last_confirm = now
+            self.latency.record(now - due)
+            if not self._submitting and not self._intended:
+                self._drained.set()
+
+    def run(self, txs: List[Transaction]) -> dict:
+        hashes = [tx.hash() for tx in txs]
+        events = self.node.blockchain.events
+        subscription = events.subscribe(EventType.TX_CONFIRMED, self._on_confirmed)
+
+        start = time.monotonic() + 0.1
+        senders = [threading.Thread(target=self._send, args=(k, txs, hashes, start), daemon=True)
+                   for k in range(self.senders)]
+        for sender in senders:
+            sender.start()
+        for sender in senders:
+            sender.join()
+        submit_end = time.monotonic()
+
+        with self._lock:
+            self._submitting = False
+            if not self._intended:
+                self._drained.set()
+        self._drained.wait(self.drain_timeout)
+        events.unsubscribe(subscription)
+
+        submitted = len(txs) - self._rejected
+        confirm_window = (self._last_confirm or submit_end) - start
+        return {
+            "offered_tps": self.rate,
+            "submitted": submitted,
+            "rejected": self._rejected,
+            "confirmed": self._confirmed,
+            "unconfirmed": len(self._intended),
+            "submit_duration": submit_end - start,
+            "submitted_tps": submitted / (submit_end - start),
+            "achieved_tps": self._confirmed / confirm_window if confirm_window > 0 else 0.0,
+            "latency": self.latency.summary(),
+            "send_lag": self.send_lag.summary()
+        }
+
+
+def print_report(report: dict):
+    def ms(value):
+        return f"{value * 1000:.2f}" if value is not None else "-"
+
+    print(f"📊 Offered {report['offered_tps']:.1f} TPS, submitted {report['submitted_tps']:.1f} TPS, "
+          f"achieved {report['achieved_tps']:.1f} TPS")
+    print(f"  confirmed: {report['confirmed']}/{report['submitted']} "
+          f"(rejected {report['rejected']}, unconfirmed {report['unconfirmed']})")
+    for name in ("latency", "send_lag"):
+        stats = report[name]
+        print(f"  {name} (ms): p50 {ms(stats['p50'])}  p90 {ms(stats['p90'])}  p99 {ms(stats['p99'])}  "
+              f"p999 {ms(stats['p999'])}  max {ms(stats['max'])}")
+
+
+def _wait_for_sync(node: SolanaNode, timeout: float) -> bool:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        best = node.peer_table.best_height()
+        if node.peers and best and len(node.blockchain.blocks) >= best:
+            return True
+        time.sleep(0.5)
+    return False
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Open-loop transaction load generator")
+    parser.add_argument("--rate", type=float, default=100, help="offered transactions per second")
+    parser.add_argument("--count", type=int, default=2000, help="transactions to submit")
+    parser.add_argument("--senders", type=int, default=8, help="submitting threads")
+    parser.add_argument("--workers", type=int, help="signing processes")
+    parser.add_argument("--wallets", nargs="+", default=["research_files/leader_wallet.txt"],
+                        help="funded wallets to send from")
+    parser.add_argument("--keystore", help="send from and to the accounts of this keystore instead")
+    parser.add_argument("--keystore-senders", type=int, help="how many keystore accounts send (default: all)")
+    parser.add_argument("--recipients", type=int, default=100)
+    parser.add_argument("--drain", type=float, default=30, help="seconds to wait for confirmations")
+    parser.add_argument("--sync-timeout", type=float, default=60)
+    parser.add_argument("--output", help="write the JSON report to this file")
+    args = parser.parse_args()
+
+    node = SolanaNode("0.0.0.0", choose_port(), Role.USER, args.wallets[0])
+    node.start()
+    print("⏳ Waiting for peers and chain sync...")
+    if not _wait_for_sync(node, args.sync_timeout):
+        print("⚠️ Not synced, continuing anyway")
+
+    if args.keystore:
+        keystore = Keystore.load(args.keystore)
+        recipients = keystore.addresses()
+        keys = [keystore.privkey(address) for address in recipients[:args.keystore_senders]]
+    else:
+        keys = [load_wallet(path) for path in args.wallets]
+        recipients = [hashlib.sha256(f"loadgen-{i}".encode()).hexdigest() for i in range(args.recipients)]
+    print(f"✍️ Signing {args.count} transactions...")
+    txs = presign_transfers(keys, recipients, args.count, node.blockchain.get_last_block().hash(), args.workers)
+
+    print(f"🚀 Offering {args.rate} TPS from {args.senders} senders (slot {Constants.TIME_TO_SLEEP}s)")
+    report = LoadGenerator(node, args.rate, args.senders, args.drain).run(txs)
+    print_report(report)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    node.disconnect()
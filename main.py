@@ -4,17 +4,25 @@ import random
 import os
 import json
 
-from constants import Role, Stage
+from constants import Constants, Role, SignatureScheme
 from node import SolanaNode
 from transaction import Transaction, Instruction, AccountMeta
 from wallet import save_wallet, generate_keypair
 
 WALLET_FILE = os.getenv("WALLET_FILE", "my_wallet.txt")
+DISCOVERY_PORT = int(os.getenv("DISCOVERY_PORT", str(Constants.DISCOVERY_PORT)))
+SPLIT_EXECUTION = os.getenv("SPLIT_EXECUTION", "0") == "1"
+METRICS_PORT = int(os.getenv("METRICS_PORT")) if os.getenv("METRICS_PORT") else None
+TRACE_FILE = os.getenv("TRACE_FILE")
+RPC_PORT = int(os.getenv("RPC_PORT")) if os.getenv("RPC_PORT") else None
+EVENTS_PORT = int(os.getenv("EVENTS_PORT")) if os.getenv("EVENTS_PORT") else None
+SIGNATURE_SCHEME = SignatureScheme(os.getenv("SIGNATURE_SCHEME", Constants.SIGNATURE_SCHEME.value))
+GENESIS_VALIDATORS = tuple(address for address in os.getenv("GENESIS_VALIDATORS", "").split(",") if address)
 
 def ensure_wallet():
     if not os.path.exists(WALLET_FILE):
         print("🔐 Wallet not found. Generate a new one...")
-        priv, _ = generate_keypair()
+        priv, _ = generate_keypair(SIGNATURE_SCHEME)
         save_wallet(WALLET_FILE, priv)
         print("✅ The wallet is saved in", WALLET_FILE)
 
@@ -44,15 +52,8 @@ def show_menu(node: SolanaNode):
         if choice == "1":
             print("🏠 Address:", node.address)
         elif choice == "2":
-            acc = node.blockchain.accounts.get(node.address)
-            if acc:
-                print(f"💰 Balance: {acc.get('balance', 0)} SOL")
-            else:
-                print("💰 Balance: 0 SOL")
+            print(f"💰 Balance: {node.blockchain.get_balance(node.address)} SOL")
         elif choice == "3":
-            if node.stage != Stage.TX:
-                print("⏳ Wait until block is finalized")
-                continue
             to = input("Recipient address: ").strip()
             amt = input("Amount: ").strip()
             try:
@@ -67,7 +68,11 @@ def show_menu(node: SolanaNode):
         elif choice == "5":
             print("🔗 Connected peers:")
             for peer in node.peers:
-                print(" -", peer)
+                info = node.peer_table.get(peer)
+                if info and info.rtt is not None:
+                    print(f" - {peer} (rtt {info.rtt * 1000:.1f} ms, height {info.height})")
+                else:
+                    print(" -", peer)
         elif choice == "0":
             node.disconnect()
             print("👋 Goodbye!")
@@ -76,8 +81,7 @@ def show_menu(node: SolanaNode):
             print("⚠️ Incorrect input")
 
 def create_transfer_tx(node: SolanaNode, to_address: str, amount: int) -> Transaction:
-    acc = node.blockchain.accounts.get(node.address)
-    if not acc or acc.get("balance", 0) < amount:
+    if node.blockchain.get_balance(node.address) < amount:
         print("❌ Not enough SOL")
         return None
 
@@ -92,7 +96,7 @@ def create_transfer_tx(node: SolanaNode, to_address: str, amount: int) -> Transa
 
     recent_blockhash = node.blockchain.get_last_block().hash()
     tx = Transaction([instr], recent_blockhash)
-    tx.sign(node.private_key)
+    tx.sign(node.keypair)
     return tx
 
 if __name__ == "__main__":
@@ -103,9 +107,15 @@ if __name__ == "__main__":
         if command == "leader":
             role = Role.LEADER
 
+    Constants.GENESIS_VALIDATORS = GENESIS_VALIDATORS
     ensure_wallet()
     port = choose_port()
-    node = SolanaNode("0.0.0.0", port, role)
+    node = SolanaNode("0.0.0.0", port, role, WALLET_FILE, discovery_port=DISCOVERY_PORT,
+                      split_execution=SPLIT_EXECUTION, metrics_port=METRICS_PORT,
+                      trace_file=TRACE_FILE, rpc_port=RPC_PORT,
+                      events_port=EVENTS_PORT)
     node.start()
+    if role == Role.LEADER and node.register_validator():
+        print("🗳️ Validator registration sent")
 
     show_menu(node)
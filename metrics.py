@@ -0,0 +1,191 @@
+import bisect
+import threading
+from abc import ABC, abstractmethod
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+
+from constants import Constants
+
+Labels = Tuple[str, ...]
+
+DEFAULT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0)
+
+
+def _format_labels(names: Tuple[str, ...], values: Labels, extra: str = "") -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric(ABC):
+    kind = "untyped"
+
+    def __init__(self, name: str, description: str, label_names: Tuple[str, ...] = ()):
+        self.name = name
+        self.description = description
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+
+    @abstractmethod
+    def samples(self) -> List[Tuple[str, str, float]]:
+        ...
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} {self.kind}"]
+        for suffix, labels, value in self.samples():
+            lines.append(f"{self.name}{suffix}{labels} {_format_value(value)}")
+        return "\n".join(lines)
+
+
+class ValueMetric(Metric):
+    default: Optional[float] = None
+
+    def __init__(self, name: str, description: str, label_names: Tuple[str, ...] = ()):
+        super().__init__(name, description, label_names)
+        self._values: Dict[Labels, float] = {}
+        self._functions: Dict[Labels, Callable[[], float]] = {}
+
+    def set_function(self, function: Callable[[], float], *labels: str):
+        # evaluated only when scraped, so hot paths pay nothing for it
+        with self._lock:
+            self._functions[labels] = function
+
+    def get(self, *labels: str) -> Optional[float]:
+        with self._lock:
+            function = self._functions.get(labels)
+            value = self._values.get(labels, self.default)
+        return function() if function is not None else value
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+            functions = dict(self._functions)
+        for labels, function in functions.items():
+            values[labels] = function()
+        return [("", _format_labels(self.label_names, labels), value) for labels, value in values.items()]
+
+
+class Counter(ValueMetric):
+    # a function-backed counter must only ever return growing totals
+    kind = "counter"
+    default = 0
+
+    def inc(self, *labels: str, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+
+class Gauge(ValueMetric):
+    kind = "gauge"
+
+    def set(self, value: float, *labels: str):
+        with self._lock:
+            self._values[labels] = value
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, description: str, label_names: Tuple[str, ...] = (), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, description, label_names)
+        self.buckets = tuple(sorted(buckets))
+        self._counts: Dict[Labels, List[int]] = {}
+        self._sums: Dict[Labels, float] = {}
+
+    def observe(self, value: float, *labels: str):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._counts.get(labels)
+            if counts is None:
+                counts = self._counts[labels] = [0] * (len(self.buckets) + 1)
+                self._sums[labels] = 0.0
+            counts[index] += 1
+            self._sums[labels] += value
+
+    def count(self, *labels: str) -> int:
+        with self._lock:
+            return sum(self._counts.get(labels, ()))
+
+    def samples(self):
+        samples = []
+        with self._lock:
+            for labels, counts in self._counts.items():
+                cumulative = 0
+                for bound, n in zip(self.buckets + (float("inf"),), counts):
+                    cumulative += n
+                    le = f'le="{_format_value(bound)}"'
+                    samples.append(("_bucket", _format_labels(self.label_names, labels, le), cumulative))
+                samples.append(("_sum", _format_labels(self.label_names, labels), self._sums[labels]))
+                samples.append(("_count", _format_labels(self.label_names, labels), cumulative))
+        return samples
+
+
+class MetricsRegistry:
+    def __init__(self, prefix: str = "solana"):
+        self.prefix = prefix
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, description: str, label_names, **kwargs):
+        full_name = f"{self.prefix}_{name}" if self.prefix else name
+        with self._lock:
+            metric = self._metrics.get(full_name)
+            if metric is None:
+                metric = self._metrics[full_name] = cls(full_name, description, tuple(label_names), **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric {full_name} is already registered as a {metric.kind}")
+            return metric
+
+    def counter(self, name: str, description: str, label_names=()) -> Counter:
+        return self._get_or_create(Counter, name, description, label_names)
+
+    def gauge(self, name: str, description: str, label_names=()) -> Gauge:
+        return self._get_or_create(Gauge, name, description, label_names)
+
+    def histogram(self, name: str, description: str, label_names=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, description, label_names, buckets=buckets)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+class MetricsServer:
+    def __init__(self, registry: MetricsRegistry, port: int, host: str = None):
+        self.registry = registry
+        registry_ref = registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry_ref.render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host or Constants.METRICS_HOST, port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+
+    def start(self):
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        print(f"📈 Metrics on http://{self._server.server_address[0]}:{self.port}/metrics")
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
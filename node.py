@@ -1,55 +1,121 @@
-import random
-import socket
 import threading
 import json
 import time
-import queue
 from typing import Optional
 
 from blockchain import Blockchain, Block
-from transaction import Transaction
-from constants import MessageType, MessageField, Role, Stage, RebroadcastField, DisconnectField, Constants, \
-    ShareBlockField, SignatureField
-from wallet import load_wallet, pubkey_to_address, get_public_key
+from transaction import AccountMeta, Instruction, Transaction
+from chain_sync import ChainSync
+from constants import BlockField, MessageType, MessageField, Role, Stage, RebroadcastField, DisconnectField, Constants, \
+    ShareBlockField, SignatureField, SyncField, TxBatchField, WorkerPoolKind
+from wallet import load_wallet, sign
 from deserialize_service import DeserializeService
-
-def _get_local_ip():
-    s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-    try:
-        s.connect(("8.8.8.8", 80))
-        ip = s.getsockname()[0]
-    except:
-        ip = "127.0.0.1"
-    finally:
-        s.close()
-    return ip
+from dispatcher import MessageDispatcher
+from events import EventBus, EventFeedServer
+from execution_backend import ExecutionClient
+from leader_schedule import LeaderSchedule, epoch_of
+from metrics import MetricsRegistry, MetricsServer
+from peer_table import PeerTable
+from pipeline import DecodedMessage, WorkerPool, GOSSIP_MESSAGES, decode_payload, peek_message_type
+from rpc import RpcServer
+from seen_cache import SeenCache, message_digest
+from slot_scheduler import SlotScheduler
+from tracing import Tracer, now_us
+from turbine import turbine_order, turbine_children
+from transport import Transport, TcpTransport
+from tx_batcher import TxBatcher
+from vote_aggregator import Vote, VoteAggregator
+
+def _tx_digest(tx: Transaction) -> bytes:
+    if tx.signatures:
+        return message_digest("".join(sorted(tx.signatures.values())).encode())
+    return message_digest(tx.hash().encode())
 
 class SolanaNode:
-    def __init__(self, host: str, port: int, role: Role, wallet_file="my_wallet.txt"):
+    def __init__(self, host: str, port: int, role: Role, wallet_file="my_wallet.txt",
+                 worker_pool_kind: WorkerPoolKind = None, worker_pool_size: int = None, discovery_port: int = None,
+                 split_execution: bool = False, transport: Transport = None, metrics_port: int = None,
+                 trace_file: str = None, rpc_port: int = None, events_port: int = None):
         self._host = host
         self._port = port
         self.peers = set()
-        self.blockchain = Blockchain()
-        self.private_key = load_wallet(wallet_file)
-        self.public_key = get_public_key(self.private_key)
-        self.address = pubkey_to_address(self.public_key)
-        self._discovery_port = 9000
-        self._external_ip = _get_local_ip()
+        self.peer_table = PeerTable()
+        self.metrics = MetricsRegistry()
+        self._metrics_port = metrics_port
+        self._rpc_port = rpc_port
+        self._rpc_server: Optional[RpcServer] = None
+        self._events_port = events_port
+        self._event_feed: Optional[EventFeedServer] = None
+        self.events = EventBus()
+        self._transport = transport or TcpTransport()
+        self._external_ip = self._transport.local_ip()
+        self._trace_file = trace_file
+        self.tracer = Tracer(f"{self._external_ip}:{port}", enabled=trace_file is not None)
+        self.blockchain = Blockchain(self.metrics, self.tracer, self.events)
+        self._execution: Optional[ExecutionClient] = None
+        if split_execution:
+            self._execution = ExecutionClient(self.blockchain)
+            self.blockchain.set_executor(self._execution)
+        self.keypair = load_wallet(wallet_file)
+        self.public_key = self.keypair.pubkey
+        self.address = self.keypair.address
+        self._discovery_port = discovery_port or Constants.DISCOVERY_PORT
+        self._last_sync_request = 0.0
         self.role = role
 
         self.validators_nodes: set = set()
         self.stage: Stage = Stage.TX
         self._stage_lock = threading.Lock()
+        self._mining_since = 0.0
 
         self._temp_block: Optional[Block] = None
+        self.vote_aggregator = VoteAggregator()
 
-        self.message_queue = queue.Queue()
+        self.message_queue = MessageDispatcher()
+        self._worker_pool = WorkerPool(worker_pool_kind, worker_pool_size)
+        self.seen_messages = SeenCache()
+        self._seen_txs = SeenCache()
+        self._chain_sync = ChainSync()
+        self._tx_batcher = TxBatcher(self._broadcast_tx_batch)
 
         self._mining_thread = None
+        self._mining_round = 0
+        self._slot_scheduler = SlotScheduler()
+        self._last_block_at = time.monotonic()
+        self._leader_schedule: Optional[LeaderSchedule] = None
+        self._leader_schedule_seed: Optional[Block] = None
+
+        self._init_metrics()
 
         print(f"🟢 Node launched at {self._external_ip}:{self._port}")
         print(f"🏠 Wallet address: {self.address[:8]}...")
 
+    def _init_metrics(self):
+        self._m_handle = self.metrics.histogram("message_handling_seconds", "Time spent handling a message",
+                                                ("type",))
+        self._m_errors = self.metrics.counter("message_errors_total", "Messages whose handler raised", ("type",))
+        self._m_send_failures = self.metrics.counter("broadcast_failures_total", "Failed sends to peers",
+                                                     ("type",))
+        self._m_block_production = self.metrics.histogram("block_production_seconds",
+                                                          "Time to produce and send out a block")
+        self._m_slot = self.metrics.histogram("slot_duration_seconds", "Time between accepted blocks")
+        self._m_sync = self.metrics.histogram("sync_duration_seconds", "Duration of completed chain syncs",
+                                              buckets=(1, 5, 10, 30, 60, 300, 900))
+
+        queue_depth = self.metrics.gauge("queue_depth", "Messages waiting in a dispatcher lane", ("lane",))
+        queue_dropped = self.metrics.counter("queue_dropped_total", "Messages shed by a full dispatcher lane",
+                                             ("lane",))
+        for lane in ("consensus", "control", "tx"):
+            queue_depth.set_function(lambda lane=lane: self.message_queue.stats()[lane]["depth"], lane)
+            queue_dropped.set_function(lambda lane=lane: self.message_queue.stats()[lane]["dropped"], lane)
+        self.metrics.gauge("peers", "Known peers").set_function(lambda: len(self.peers))
+        self.metrics.counter("seen_cache_hits_total", "Duplicate gossip messages dropped").set_function(
+            self._seen_cache_hits)
+
+    def _seen_cache_hits(self) -> int:
+        stats = self.seen_messages.stats()
+        return stats["hits"] + stats["bloom_hits"]
+
     def _set_stage(self, stage: Stage):
         with self._stage_lock:
             self.stage = stage
@@ -58,110 +124,269 @@ class SolanaNode:
         with self._stage_lock:
             return self.stage
 
+    def _enter_mining(self):
+        if self.get_stage() == Stage.MINING:
+            return
+        self._set_stage(Stage.MINING)
+        self._mining_since = time.monotonic()
+        timer = threading.Timer(Constants.ROUND_TIMEOUT_SLOTS * Constants.TIME_TO_SLEEP, self.message_queue.put, ({
+            MessageField.TYPE: MessageType.ROUND_TIMEOUT,
+            MessageField.DATA: len(self.blockchain.blocks)
+        },))
+        timer.daemon = True
+        timer.start()
+
     def start(self):
-        threading.Thread(target=self._listen_tcp, daemon=True).start()
+        if self._execution is not None:
+            self._execution.start()
+        if self._metrics_port is not None:
+            MetricsServer(self.metrics, self._metrics_port).start()
+        if self._rpc_port is not None:
+            self._rpc_server = RpcServer(self.blockchain, self.add_and_broadcast_tx, self._rpc_port,
+                                         metrics=self.metrics)
+            self._rpc_server.start()
+        if self._events_port is not None:
+            self._event_feed = EventFeedServer(self.events, self._events_port)
+            self._event_feed.start()
+        threading.Thread(target=self._listen, daemon=True).start()
         threading.Thread(target=self._listen_discovery, daemon=True).start()
         threading.Thread(target=self._broadcast_presence, daemon=True).start()
         threading.Thread(target=self._process_message_queue, daemon=True).start()
+        threading.Thread(target=self._tx_batcher.run, daemon=True).start()
+
+        self._start_mining()
 
-        self._mining_thread = threading.Thread(target=self._broadcast_mining, daemon=True)
+    def _start_mining(self):
+        self._mining_round += 1
+        self._slot_scheduler.notify()
+        self._mining_thread = threading.Thread(target=self._broadcast_mining, args=(self._mining_round,), daemon=True)
         self._mining_thread.start()
 
     def _process_message_queue(self):
         while True:
-            time.sleep(0.0000001)
             message = self.message_queue.get()
+            msg_type = str(message.get(MessageField.TYPE))
+            started = time.perf_counter()
             try:
                 self._handle_message(message)
             except Exception as e:
+                self._m_errors.inc(msg_type)
                 print(f"❌ Error handling message: {e}")
+            self._m_handle.observe(time.perf_counter() - started, msg_type)
 
     def disconnect(self):
         self._broadcast_disconnect()
+        if self._execution is not None:
+            self._execution.stop()
+        if self._rpc_server is not None:
+            self._rpc_server.stop()
+        if self._event_feed is not None:
+            self._event_feed.stop()
+        self._transport.close()
+        if self._trace_file:
+            self.tracer.dump(self._trace_file)
+            print(f"💾 Trace saved to {self._trace_file}")
 
     def verify_and_add_block(self, block):
         if self.blockchain.add_external_block(block):
             return True
         return False
 
-    def _listen_tcp(self):
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.bind((self._host, self._port))
-        sock.listen()
-        print("📥 Waiting for TCP connections...")
-        while True:
-            conn, _ = sock.accept()
-            threading.Thread(target=self._handle_tcp_connection, args=(conn,), daemon=True).start()
+    def _listen(self):
+        self._transport.listen(self._host, self._port, self._on_raw_message)
+
+    def _on_raw_message(self, raw: bytes):
+        digest = None
+        if peek_message_type(raw) in GOSSIP_MESSAGES:
+            digest = message_digest(raw)
+            if self.seen_messages.check_and_add(digest):
+                return
+
+        def on_decoded(message: Optional[DecodedMessage]):
+            # a copy that was shed or failed to decode must not make the next copy look like a duplicate
+            delivered = message is not None and self.message_queue.put(message)
+            if not delivered and digest is not None:
+                self.seen_messages.discard(digest)
+
+        self._worker_pool.decode(raw, on_decoded)
 
-    def _handle_tcp_connection(self, conn):
+    def _message_block_index(self, msg_type: str, data) -> Optional[int]:
         try:
-            buffer = b""
-            while True:
-                chunk = conn.recv(10000)
-                if not chunk:
-                    break
-                buffer += chunk
-            data = buffer.decode()
-            message = json.loads(data)
-            self.message_queue.put(message)
-        except Exception as e:
-            print("❌ TCP error:", e)
-        finally:
-            conn.close()
+            if msg_type == MessageType.CREATOR:
+                return len(self.blockchain.blocks)
+            if msg_type == MessageType.SHARE_BLOCK:
+                return data[ShareBlockField.BLOCK][BlockField.INDEX]
+            if msg_type == MessageType.FINALISE_BLOCK:
+                return data[BlockField.INDEX]
+            if msg_type == MessageType.SIGNATURE:
+                return data[SignatureField.VOTES][0][SignatureField.INDEX]
+            if msg_type == MessageType.REBROADCAST:
+                return data[RebroadcastField.BLOCK][BlockField.INDEX]
+        except (KeyError, IndexError, TypeError):
+            pass
+        return None
 
     def _handle_message(self, message: dict):
+        if not self.tracer.enabled:
+            self._dispatch_message(message)
+            return
+
+        msg_type = message.get(MessageField.TYPE)
+        with self.tracer.span(str(msg_type), self._message_block_index(msg_type, message.get(MessageField.DATA))):
+            self._dispatch_message(message)
+
+    def _dispatch_message(self, message: dict):
         msg_type = message.get(MessageField.TYPE)
         data = message.get(MessageField.DATA)
 
+        if isinstance(message, DecodedMessage):
+            payload = message.payload
+        else:
+            payload = decode_payload(msg_type, data, verify=False)
+
         if msg_type == MessageType.TX:
-            tx = DeserializeService.deserialize_tx(data)
-            self.blockchain.add_transaction(tx)
+            if payload:
+                self._admit_transaction(payload)
+
+        elif msg_type == MessageType.TX_BATCH:
+            for tx in payload:
+                self._admit_transaction(tx)
 
         elif msg_type == MessageType.FINALISE_BLOCK:
             self._temp_block = None
-            block = DeserializeService.deserialize_block(data)
+            block = payload
             if self.verify_and_add_block(block):
                 self._set_stage(Stage.TX)
+                now = time.monotonic()
+                self._m_slot.observe(now - self._last_block_at)
+                self._slot_scheduler.record_slot(now - self._last_block_at)
+                self._last_block_at = now
 
-            self._mining_thread = threading.Thread(target=self._broadcast_mining, daemon=True)
-            self._mining_thread.start()
+            self._start_mining()
 
         elif msg_type == MessageType.SIGNATURE:
-            signature, address = DeserializeService.deserialize_signature(data)
-            self._temp_block.add_signature(address, signature=signature)
+            if self._temp_block is None:
+                return
+            for vote in self.vote_aggregator.add_votes(payload):
+                if vote.index == self._temp_block.index:
+                    self._temp_block.add_signature(vote.address, signature=vote.signature)
 
             self._try_finalize_block()
 
         elif msg_type == MessageType.SHARE_BLOCK:
-            self._set_stage(Stage.MINING)
-            block, ip, port = DeserializeService.deserialize_share_block(data)
+            self._enter_mining()
+            if payload is None:
+                print("❌ Block rejected: invalid transaction signature")
+                return
+            block, ip, port = payload
 
             if self.role == Role.LEADER and self.blockchain.validate_block(block):
-                signature = block.sign_block(self.private_key)
-
-                if ip == self._external_ip and port == self._port:
-                    message = {
-                        MessageField.TYPE: MessageType.SIGNATURE,
-                        MessageField.DATA: {
-                            SignatureField.SIGNATURE: signature,
-                            SignatureField.ADDRESS: self.address
-                        }
-                    }
-                    self.message_queue.put(message)
-                else:
-                    self._broadcast_signature(f"{ip}:{port}", signature)
+                if not self.is_slot_leader(block.leader_id, block.index):
+                    print(f"❌ Block rejected: {block.leader_id[:8]} is not the leader of slot {block.index}")
+                    return
+                block_hash = block.hash_content()
+                sign_started = now_us()
+
+                def on_signed(f):
+                    self.tracer.record("sign_block", sign_started, now_us(), block.index)
+                    self._send_vote(ip, port, Vote(block.index, block_hash, self.address, self.public_key, f.result()))
+
+                future = self._worker_pool.submit(sign, block_hash, self.keypair)
+                future.add_done_callback(on_signed)
 
         elif msg_type == MessageType.REQUEST_CHAIN:
-            self._broadcast_chain()
+            host, port = DeserializeService.deserialize_sync_peer(data)
+            self._send_chain(f"{host}:{port}")
 
         elif msg_type == MessageType.CHAIN:
-            blocks = DeserializeService.deserialize_chain(data)
-            self.blockchain.try_to_update_chain(blocks)
+            self.blockchain.try_to_update_chain(payload)
+
+        elif msg_type == MessageType.REQUEST_TIP:
+            host, port = DeserializeService.deserialize_sync_peer(data)
+            self._broadcast_to_user({
+                MessageField.TYPE: MessageType.TIP,
+                MessageField.DATA: {
+                    SyncField.HOST: self._external_ip,
+                    SyncField.PORT: self._port,
+                    SyncField.HEIGHT: len(self.blockchain.blocks)
+                }
+            }, f"{host}:{port}")
+
+        elif msg_type == MessageType.TIP:
+            host, port, height = DeserializeService.deserialize_tip(data)
+            peer = f"{host}:{port}"
+            header_range = self._chain_sync.on_tip(peer, height, self.blockchain.get_last_block())
+            if header_range:
+                self._send_sync_request(MessageType.REQUEST_HEADERS, peer, *header_range)
+
+        elif msg_type == MessageType.REQUEST_HEADERS:
+            host, port, start, end = DeserializeService.deserialize_sync_request(data)
+            end = min(end, start + Constants.SYNC_MAX_HEADERS)
+            self._broadcast_to_user({
+                MessageField.TYPE: MessageType.HEADERS,
+                MessageField.DATA: {
+                    SyncField.HOST: self._external_ip,
+                    SyncField.PORT: self._port,
+                    SyncField.HEADERS: [h.to_dict() for h in self.blockchain.get_headers(start, end)]
+                }
+            }, f"{host}:{port}")
+
+        elif msg_type == MessageType.HEADERS:
+            host, port, headers = payload
+            peer = f"{host}:{port}"
+            if not self._chain_sync.is_header_peer(peer):
+                return
+
+            first_batch = self._chain_sync.is_first_batch()
+            if not self._chain_sync.on_headers(headers):
+                self._chain_sync.reset()
+                if first_batch:
+                    print(f"⚠️ Chain of {peer} diverges from ours, requesting full chain")
+                    self._request_chain(peer)
+                return
+
+            for block_peer, start, end in self._chain_sync.assign_ranges():
+                self._send_sync_request(MessageType.REQUEST_BLOCKS, block_peer, start, end)
+
+            header_range = self._chain_sync.next_header_range()
+            if header_range:
+                self._send_sync_request(MessageType.REQUEST_HEADERS, peer, *header_range)
+
+        elif msg_type == MessageType.REQUEST_BLOCKS:
+            host, port, start, end = DeserializeService.deserialize_sync_request(data)
+            self._broadcast_to_user({
+                MessageField.TYPE: MessageType.BLOCKS,
+                MessageField.DATA: {
+                    SyncField.HOST: self._external_ip,
+                    SyncField.PORT: self._port,
+                    SyncField.BLOCKS: [b.to_dict() for b in self.blockchain.get_blocks(start, end)]
+                }
+            }, f"{host}:{port}")
+
+        elif msg_type == MessageType.BLOCKS:
+            _, _, blocks = payload
+            self._chain_sync.on_blocks(blocks)
+
+            for block in self._chain_sync.pop_ready(len(self.blockchain.blocks)):
+                if not self.verify_and_add_block(block):
+                    self._chain_sync.reset()
+                    break
+
+            if self._chain_sync.try_finish(len(self.blockchain.blocks)):
+                self._m_sync.observe(self._chain_sync.last_duration)
+                print(f"✅ Synced {len(self.blockchain.blocks)} blocks in {self._chain_sync.last_duration:.2f}s")
 
         elif msg_type == MessageType.CREATOR:
-            self._set_stage(Stage.MINING)
+            self._enter_mining()
             if self.role == Role.LEADER:
+                started = time.perf_counter()
                 self._temp_block = self.blockchain.produce_block(self.address)
+                if self._temp_block is None:
+                    self._set_stage(Stage.TX)
+                    self._start_mining()
+                    return
+                self.vote_aggregator.start(self._temp_block.index, self._temp_block.hash_content(),
+                                           self.epoch_validators(self._temp_block.index))
 
                 self._broadcast_block(self._temp_block)
                 self.message_queue.put({
@@ -172,55 +397,100 @@ class SolanaNode:
                         ShareBlockField.PORT: self._port
                     }
                 })
-
-        elif msg_type == MessageType.CHOOSE_CREATOR:
-            self._set_stage(Stage.MINING)
-
-            if self._is_leader():
-                creator = self._choose_creator()
-                ip, port = creator.split(":")
-                port = int(port)
-
-                message = { MessageField.TYPE: MessageType.CREATOR }
-
-                if ip == self._external_ip and port == self._port:
-                    self.message_queue.put(message)
-                else:
-                    self._broadcast_to_user(message, creator)
+                self._m_block_production.observe(time.perf_counter() - started)
+
+        elif msg_type == MessageType.REBROADCAST:
+            _, _, _, nodes, _ = DeserializeService.deserialize_rebroadcast(data)
+            my_id = f"{self._external_ip}:{self._port}"
+            if my_id in nodes:
+                for peer in turbine_children(nodes, nodes.index(my_id), Constants.TURBINE_FANOUT):
+                    self._broadcast_to_user(message, peer)
+
+            self._handle_message(payload)
+
+        elif msg_type == MessageType.ROUND_TIMEOUT:
+            # a block that never reaches quorum would otherwise hold the node in MINING for good
+            if data != len(self.blockchain.blocks) or self.get_stage() != Stage.MINING \
+                    or time.monotonic() - self._mining_since < Constants.ROUND_TIMEOUT_SLOTS * Constants.TIME_TO_SLEEP:
+                return
+            print(f"⚠️ No quorum for slot {data}, dropping the round")
+            self._temp_block = None
+            self.blockchain.release_next_slot()
+            self._set_stage(Stage.TX)
+            self._start_mining()
 
         elif msg_type == MessageType.DISCONNECT:
             peer_to_remove = DeserializeService.deserialize_disconnect(data)
-            self.peers.remove(peer_to_remove)
+            self._remove_peer(peer_to_remove)
 
         else:
             print("⚠️ Unknown message type:", msg_type)
 
     def _try_finalize_block(self):
-        if 3 * len(self._temp_block.validator_signatures) >= 2 * (len(self.validators_nodes) + 1):
+        if self.vote_aggregator.try_quorum(self._temp_block.index):
             self._finalize_block(self._temp_block)
             self.message_queue.put({
                 MessageField.TYPE: MessageType.FINALISE_BLOCK,
                 MessageField.DATA: self._temp_block.to_dict()
             })
 
-    def _choose_creator(self) -> str:
-        if self.role == Role.LEADER:
-            return random.choice(list(self.validators_nodes) + [f"{self._external_ip}:{self._port}"])
-        else:
-            return random.choice(list(self.validators_nodes))
+    def _schedule_for(self, slot: int) -> Optional[LeaderSchedule]:
+        # built once per epoch from the chain alone, so every node agrees on it whatever peers it sees
+        epoch = epoch_of(slot)
+        blocks = self.blockchain.blocks
+        seed_index = max(epoch * Constants.SLOTS_PER_EPOCH - 1, 0)
+        if seed_index >= len(blocks):
+            return None
+        seed_block = blocks[seed_index]
+        schedule = self._leader_schedule
+        if schedule is None or schedule.epoch != epoch or self._leader_schedule_seed is not seed_block:
+            stakes = self.blockchain.get_epoch_stakes(epoch)
+            if stakes is None:
+                return None
+            if not stakes:
+                stakes = dict.fromkeys(Constants.GENESIS_VALIDATORS, 0)
+            schedule = self._leader_schedule = LeaderSchedule(epoch, stakes, seed_block.hash())
+            self._leader_schedule_seed = seed_block
+        return schedule
+
+    def is_slot_leader(self, address: str, slot: int) -> bool:
+        schedule = self._schedule_for(slot)
+        if schedule is None:
+            return False
+        return schedule.is_open or schedule.leader_for(slot) == address
+
+    def epoch_validators(self, slot: int) -> frozenset:
+        schedule = self._schedule_for(slot)
+        if schedule is None or schedule.is_open:
+            return frozenset({self.address})
+        return schedule.validators
+
+    def register_validator(self) -> bool:
+        instr = Instruction("ValidatorProgram", [AccountMeta(self.address, True, False)],
+                            json.dumps({"action": "register"}))
+        tx = Transaction([instr], self.blockchain.get_last_block().hash())
+        tx.sign(self.keypair)
+        return self.add_and_broadcast_tx(tx)
 
     def _finalize_block(self, block: Block):
-        self._broadcast({
-            MessageField.TYPE: MessageType.FINALISE_BLOCK,
-            MessageField.DATA: block.to_dict()
-        })
+        self._turbine_broadcast(MessageType.FINALISE_BLOCK, block)
 
-    def _broadcast_signature(self, peer: str, signature: str):
+    def _send_vote(self, ip: str, port: int, vote: Vote):
+        if ip == self._external_ip and port == self._port:
+            self.message_queue.put({
+                MessageField.TYPE: MessageType.SIGNATURE,
+                MessageField.DATA: {
+                    SignatureField.VOTES: [vote.to_dict()]
+                }
+            })
+        else:
+            self._broadcast_signature(f"{ip}:{port}", [vote])
+
+    def _broadcast_signature(self, peer: str, votes: list):
         message = {
             MessageField.TYPE: MessageType.SIGNATURE,
             MessageField.DATA: {
-                SignatureField.SIGNATURE: signature,
-                SignatureField.ADDRESS: self.address
+                SignatureField.VOTES: [vote.to_dict() for vote in votes]
             }
         }
         self._broadcast_to_user(message, peer)
@@ -229,27 +499,76 @@ class SolanaNode:
         raw = json.dumps(message).encode()
         ip, port = peer.split(":")
         try:
-            with socket.socket() as s:
-                s.connect((ip, int(port)))
-                s.send(raw)
+            self._transport.send((ip, int(port)), raw)
         except Exception as e:
+            self._m_send_failures.inc(message['type'])
             print(f"❌ Failed to send {message['type']} → {peer}: {e}")
 
-    def _rebroadcast_block(self, block: Block):
-        self._broadcast({
+    def _turbine_broadcast(self, kind: str, block: Block):
+        block_data = block.to_dict()
+        if len(self.peers) <= Constants.TURBINE_FANOUT:
+            if kind == MessageType.SHARE_BLOCK:
+                self._broadcast({
+                    MessageField.TYPE: MessageType.SHARE_BLOCK,
+                    MessageField.DATA: {
+                        ShareBlockField.BLOCK: block_data,
+                        ShareBlockField.HOST: self._external_ip,
+                        ShareBlockField.PORT: self._port
+                    }
+                })
+            else:
+                self._broadcast({
+                    MessageField.TYPE: MessageType.FINALISE_BLOCK,
+                    MessageField.DATA: block_data
+                })
+            return
+
+        nodes = turbine_order(self.peers, block.hash_content(), kind)
+        self._rebroadcast_block(kind, block_data, nodes)
+
+    def _rebroadcast_block(self, kind: str, block_data: dict, nodes: list):
+        message = {
             MessageField.TYPE: MessageType.REBROADCAST,
             MessageField.DATA: {
                 RebroadcastField.HOST: self._external_ip,
                 RebroadcastField.PORT: self._port,
-                RebroadcastField.BLOCK: block.to_dict()
+                RebroadcastField.KIND: kind,
+                RebroadcastField.NODES: nodes,
+                RebroadcastField.BLOCK: block_data
             },
-        })
+        }
+        for peer in turbine_children(nodes, -1, Constants.TURBINE_FANOUT):
+            self._broadcast_to_user(message, peer)
 
-    def _broadcast_request_chain(self):
+    def _request_sync(self):
         self._broadcast({
-            MessageField.TYPE: MessageType.REQUEST_CHAIN
+            MessageField.TYPE: MessageType.REQUEST_TIP,
+            MessageField.DATA: {
+                SyncField.HOST: self._external_ip,
+                SyncField.PORT: self._port
+            }
         })
 
+    def _send_sync_request(self, msg_type: str, peer: str, start: int, end: int):
+        self._broadcast_to_user({
+            MessageField.TYPE: msg_type,
+            MessageField.DATA: {
+                SyncField.HOST: self._external_ip,
+                SyncField.PORT: self._port,
+                SyncField.START: start,
+                SyncField.END: end
+            }
+        }, peer)
+
+    def _request_chain(self, peer: str):
+        self._broadcast_to_user({
+            MessageField.TYPE: MessageType.REQUEST_CHAIN,
+            MessageField.DATA: {
+                SyncField.HOST: self._external_ip,
+                SyncField.PORT: self._port
+            }
+        }, peer)
+
     def _broadcast_disconnect(self):
         self._broadcast({
             MessageField.TYPE: MessageType.DISCONNECT,
@@ -263,89 +582,118 @@ class SolanaNode:
         raw = json.dumps(message).encode()
         for peer in self.peers.copy():
             try:
-                with socket.socket() as s:
-                    s.connect(peer)
-                    s.send(raw)
+                self._transport.send(peer, raw)
             except Exception as e:
+                self._m_send_failures.inc(message['type'])
                 print(f"❌ Failed to send {message['type']} → {peer}: {e}")
+                if self.peer_table.record_failure(peer):
+                    self._remove_peer(peer)
 
-    def _broadcast_chain(self):
-        self._broadcast({
+    def _remove_peer(self, peer: tuple):
+        self.peers.discard(peer)
+        self.validators_nodes.discard(f"{peer[0]}:{peer[1]}")
+        self.peer_table.remove(peer)
+
+    def _send_chain(self, peer: str):
+        self._broadcast_to_user({
             MessageField.TYPE: MessageType.CHAIN,
-            MessageField.DATA: self.blockchain.to_dict()})
+            MessageField.DATA: self.blockchain.to_dict()}, peer)
 
     def broadcast_transaction(self, tx: Transaction):
-        self._broadcast({
-            MessageField.TYPE: MessageType.TX,
-            MessageField.DATA: tx.to_dict()
-        })
+        self._tx_batcher.add(tx.to_dict())
 
-    def _broadcast_block(self, block):
+    def _broadcast_tx_batch(self, txs: list):
         self._broadcast({
-            MessageField.TYPE: MessageType.SHARE_BLOCK,
+            MessageField.TYPE: MessageType.TX_BATCH,
             MessageField.DATA: {
-                ShareBlockField.BLOCK: block.to_dict(),
-                ShareBlockField.HOST: self._external_ip,
-                ShareBlockField.PORT: self._port
+                TxBatchField.TXS: txs
             }
         })
 
+    def _broadcast_block(self, block):
+        self._turbine_broadcast(MessageType.SHARE_BLOCK, block)
+
+    def _admit_transaction(self, tx: Transaction) -> bool:
+        if self._seen_txs.check_and_add(_tx_digest(tx)):
+            return False
+        # consensus lanes overtake the tx lane, so a gossiped tx may arrive after its block was applied
+        if self.blockchain.get_transaction_block(tx.hash()) is not None:
+            return False
+        if not self.blockchain.add_transaction(tx, next_slot=self.get_stage() != Stage.TX):
+            return False
+        self._slot_scheduler.notify()
+        return True
+
     def add_and_broadcast_tx(self, tx: Transaction) -> bool:
-        if self.get_stage() == Stage.TX and self.blockchain.add_transaction(tx):
+        if self._admit_transaction(tx):
             self.broadcast_transaction(tx)
             return True
         return False
 
     def _listen_discovery(self):
-        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        sock.bind(('', self._discovery_port))
+        self._transport.serve_discovery(self._discovery_port, self._presence_response)
+
+    def _presence_response(self) -> str:
+        return f"{self._external_ip}:{self._port}:{self.role == Role.LEADER}:" \
+               f"{len(self.blockchain.blocks)}:{self.address}"
+
+    def get_effective_slot_duration(self) -> Optional[float]:
+        return self._slot_scheduler.effective_slot_duration
+
+    def _broadcast_mining(self, mining_round: int):
+        slot = len(self.blockchain.blocks)
+
+        def cancelled() -> bool:
+            return mining_round != self._mining_round or len(self.blockchain.blocks) != slot
+
         while True:
-            data, addr = sock.recvfrom(1024)
-            if data == b"DISCOVER":
-                response = f"{self._external_ip}:{self._port}:{self.role == Role.LEADER}"
-                sock.sendto(response.encode(), addr)
-
-    def _broadcast_mining(self):
-        time.sleep(Constants.TIME_TO_SLEEP)
-        if self._is_leader():
-            message = {MessageField.TYPE: MessageType.CHOOSE_CREATOR}
-            self._broadcast(message)
-            if self.role == Role.LEADER:
-                self.message_queue.put(message)
+            can_produce = self.role == Role.LEADER and self.get_stage() == Stage.TX \
+                          and self.is_slot_leader(self.address, slot)
+            if not self._slot_scheduler.wait_for_slot(self.blockchain.mempool_size,
+                                                      self.blockchain.oldest_pending_age, cancelled, can_produce):
+                return
+            # an idle slot passes without a block rather than filling the chain with empty ones
+            if can_produce and self.blockchain.mempool_size() > 0:
+                self.message_queue.put({MessageField.TYPE: MessageType.CREATOR})
+                return
 
     def _broadcast_presence(self):
-        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
         while True:
             try:
-                sock.sendto(b"DISCOVER", ('<broadcast>', self._discovery_port))
-                sock.settimeout(0.0000001)
-                while True:
-                    try:
-                        data, addr = sock.recvfrom(1024)
-                        peer_host, peer_port, is_leader = data.decode().split(":")
-                        if peer_host == self._external_ip and int(peer_port) == self._port:
-                            continue
-                        peer = (peer_host, int(peer_port))
-                        self.peers.add(peer)
-
-                        full_ip = f"{peer_host}:{peer_port}"
-
-                        if is_leader == "True":
-                            if full_ip not in self.validators_nodes:
-                                self.validators_nodes.add(full_ip)
-                        else:
-                            self.validators_nodes.discard(full_ip)
-
-                        if len(self.blockchain.blocks) == 1:
-                            self._broadcast_request_chain()
-                    except socket.timeout:
-                        break
+                self._transport.discover(self._discovery_port, Constants.DISCOVERY_WINDOW, self._on_presence)
+
+                for peer in self.peer_table.expire():
+                    print(f"⚠️ Peer {peer[0]}:{peer[1]} timed out")
+                    self._remove_peer(peer)
+
+                if self.peer_table.best_height() > len(self.blockchain.blocks):
+                    self._maybe_request_sync()
             except Exception as e:
                 print("Error during UDP discovery:", e)
-            time.sleep(5)
-
-    def _is_leader(self) -> bool:
-        my_id = f"{self._external_ip}:{self._port}"
-        peer_ids = [f"{host}:{port}" for (host, port) in self.peers]
-        return my_id == min([my_id] + peer_ids)
+            time.sleep(max(0.0, Constants.HEARTBEAT_INTERVAL - Constants.DISCOVERY_WINDOW))
+
+    def _on_presence(self, response: str, rtt: float):
+        fields = response.split(":")
+        peer_host, peer_port, is_leader = fields[:3]
+        height = int(fields[3]) if len(fields) > 3 else 0
+        address = fields[4] if len(fields) > 4 else None
+        if peer_host == self._external_ip and int(peer_port) == self._port:
+            return
+
+        peer = (peer_host, int(peer_port))
+        self.peer_table.touch(peer, is_leader == "True", height, rtt, address)
+        self.peers.add(peer)
+
+        full_ip = f"{peer_host}:{peer_port}"
+        if is_leader == "True":
+            self.validators_nodes.add(full_ip)
+        else:
+            self.validators_nodes.discard(full_ip)
+
+    def _maybe_request_sync(self):
+        now = time.time()
+        self._chain_sync.expire_stalled()
+        if self._chain_sync.is_syncing() or now - self._last_sync_request < Constants.SYNC_REQUEST_INTERVAL:
+            return
+        self._last_sync_request = now
+        self._request_sync()
@@ -0,0 +1,78 @@
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from constants import Constants
+
+Peer = Tuple[str, int]
+
+
+class PeerInfo:
+    def __init__(self, is_validator: bool, height: int, address: Optional[str]):
+        self.is_validator = is_validator
+        self.height = height
+        self.address = address
+        self.last_seen = time.time()
+        self.rtt: Optional[float] = None
+        self.failures = 0
+
+    def update_rtt(self, sample: float):
+        if self.rtt is None:
+            self.rtt = sample
+        else:
+            self.rtt = (1 - Constants.PEER_RTT_ALPHA) * self.rtt + Constants.PEER_RTT_ALPHA * sample
+
+
+class PeerTable:
+    def __init__(self, timeout: float = None):
+        self._timeout = timeout or Constants.PEER_TIMEOUT
+        self._peers: Dict[Peer, PeerInfo] = {}
+        self._lock = threading.Lock()
+
+    def touch(self, peer: Peer, is_validator: bool, height: int, rtt: Optional[float] = None,
+              address: Optional[str] = None) -> bool:
+        with self._lock:
+            info = self._peers.get(peer)
+            is_new = info is None
+            if is_new:
+                info = self._peers[peer] = PeerInfo(is_validator, height, address)
+            info.is_validator = is_validator
+            info.height = height
+            info.address = address or info.address
+            info.last_seen = time.time()
+            info.failures = 0
+            if rtt is not None:
+                info.update_rtt(rtt)
+            return is_new
+
+    def record_failure(self, peer: Peer) -> bool:
+        with self._lock:
+            info = self._peers.get(peer)
+            if info is None:
+                return False
+            info.failures += 1
+            return info.failures >= Constants.PEER_MAX_FAILURES
+
+    def expire(self) -> List[Peer]:
+        deadline = time.time() - self._timeout
+        with self._lock:
+            expired = [peer for peer, info in self._peers.items() if info.last_seen < deadline]
+            for peer in expired:
+                del self._peers[peer]
+            return expired
+
+    def remove(self, peer: Peer):
+        with self._lock:
+            self._peers.pop(peer, None)
+
+    def get(self, peer: Peer) -> Optional[PeerInfo]:
+        with self._lock:
+            return self._peers.get(peer)
+
+    def best_height(self) -> int:
+        with self._lock:
+            return max((info.height for info in self._peers.values()), default=0)
+
+    def items(self) -> List[Tuple[Peer, PeerInfo]]:
+        with self._lock:
+            return list(self._peers.items())
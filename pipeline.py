@@ -0,0 +1,125 @@
+import json
+import re
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Optional
+
+from constants import MessageType, MessageField, Constants, WorkerPoolKind, ShareBlockField
+from deserialize_service import DeserializeService
+
+
+GOSSIP_MESSAGES = {
+    MessageType.TX,
+    MessageType.TX_BATCH,
+    MessageType.SHARE_BLOCK,
+    MessageType.FINALISE_BLOCK,
+    MessageType.REBROADCAST,
+}
+
+_TYPE_PREFIX = re.compile(rb'^\{"' + MessageField.TYPE.encode() + rb'": "([a-z_]+)"')
+
+
+def peek_message_type(raw: bytes):
+    match = _TYPE_PREFIX.match(raw)
+    if match:
+        return match.group(1).decode()
+    # the fast path only knows json.dumps' layout; other encoders may order keys or space them differently
+    try:
+        message = json.loads(raw)
+    except ValueError:
+        return None
+    return message.get(MessageField.TYPE) if isinstance(message, dict) else None
+
+
+class DecodedMessage(dict):
+    def __init__(self, message: dict, payload):
+        super().__init__(message)
+        self.payload = payload
+
+
+def decode_payload(msg_type: str, data, verify: bool = True):
+    if msg_type == MessageType.TX:
+        tx = DeserializeService.deserialize_tx(data)
+        return tx if not verify or tx.verify() else None
+
+    if msg_type == MessageType.TX_BATCH:
+        txs = DeserializeService.deserialize_tx_batch(data)
+        return [tx for tx in txs if tx.verify()] if verify else txs
+
+    if msg_type == MessageType.SHARE_BLOCK:
+        block, host, port = DeserializeService.deserialize_share_block(data)
+        if verify and not all(tx.verify() for tx in block.transactions):
+            return None
+        return block, host, port
+
+    if msg_type == MessageType.SIGNATURE:
+        votes = DeserializeService.deserialize_signature(data)
+        return [vote for vote in votes if vote.verify()] if verify else votes
+
+    if msg_type == MessageType.REBROADCAST:
+        inner = unwrap_rebroadcast(data)
+        return DecodedMessage(inner, decode_payload(inner[MessageField.TYPE], inner[MessageField.DATA], verify))
+
+    if msg_type == MessageType.FINALISE_BLOCK:
+        return DeserializeService.deserialize_block(data)
+
+    if msg_type == MessageType.CHAIN:
+        return DeserializeService.deserialize_chain(data)
+
+    if msg_type == MessageType.HEADERS:
+        return DeserializeService.deserialize_headers(data)
+
+    if msg_type == MessageType.BLOCKS:
+        return DeserializeService.deserialize_blocks(data)
+
+    return None
+
+
+def unwrap_rebroadcast(data: dict) -> dict:
+    host, port, kind, _, block_data = DeserializeService.deserialize_rebroadcast(data)
+    if kind == MessageType.SHARE_BLOCK:
+        return {
+            MessageField.TYPE: MessageType.SHARE_BLOCK,
+            MessageField.DATA: {
+                ShareBlockField.BLOCK: block_data,
+                ShareBlockField.HOST: host,
+                ShareBlockField.PORT: port
+            }
+        }
+    return {
+        MessageField.TYPE: MessageType.FINALISE_BLOCK,
+        MessageField.DATA: block_data
+    }
+
+
+def decode_message(raw: bytes) -> DecodedMessage:
+    message = json.loads(raw)
+    payload = decode_payload(message.get(MessageField.TYPE), message.get(MessageField.DATA))
+    return DecodedMessage(message, payload)
+
+
+class WorkerPool:
+    def __init__(self, kind: WorkerPoolKind = None, size: int = None):
+        kind = kind or Constants.WORKER_POOL_KIND
+        size = size or Constants.WORKER_POOL_SIZE
+        if kind == WorkerPoolKind.PROCESS:
+            self._executor: Executor = ProcessPoolExecutor(max_workers=size)
+        else:
+            self._executor: Executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix="worker")
+
+    def decode(self, raw: bytes, on_decoded: Callable[[Optional[DecodedMessage]], None]):
+        # the receiving thread does not wait, so decodes of back-to-back messages overlap on the workers
+        def done(future: Future):
+            try:
+                message = future.result()
+            except Exception as e:
+                print("❌ Failed to decode message:", e)
+                message = None
+            on_decoded(message)
+
+        self._executor.submit(decode_message, raw).add_done_callback(done)
+
+    def submit(self, fn, *args) -> Future:
+        return self._executor.submit(fn, *args)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
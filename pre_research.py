@@ -1,23 +1,154 @@
+import argparse
+import glob
+import hashlib
 import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Union
 
-from constants import Role
-from node import SolanaNode
+from blockchain import Block, Blockchain
+from constants import Constants
+from keystore import Keystore, generate_keystore
+from transaction import Transaction, Instruction, AccountMeta
+from wallet import Keypair, load_wallet
 
+_worker_keys: List[Keypair] = []
 
-def prepare_leader(node: SolanaNode, amount_of_blocks: int, amount_of_tx_in_block: int):
-    for i in range(amount_of_blocks):
-        new_block = node.blockchain.produce_block(node.address)
-        node.verify_and_add_block(new_block)
-        print(f"Block #{i} added")
 
-    with open(f"research_files/blockchain.json", "w") as f:
-        json.dump(node.blockchain.to_dict(), f, indent=2)
+def _init_signer(privkeys: List[str]):
+    global _worker_keys
+    _worker_keys = [Keypair(key) for key in privkeys]
 
-if __name__ == "__main__":
-    role = Role.LEADER
-    AMOUNT_OF_BLOCKS = 3000
-    AMOUNT_OF_TX_IN_BLOCK = 1000
 
-    node = SolanaNode("0.0.0.0", 1111, role=role, wallet_file="research_files/leader_wallet.txt")
-    prepare_leader(node, AMOUNT_OF_BLOCKS, AMOUNT_OF_TX_IN_BLOCK)
+def _transfer(sender: str, receiver: str, amount: int, nonce: int, recent_blockhash: str) -> Transaction:
+    instr = Instruction(
+        program_id="SystemProgram",
+        accounts=[
+            AccountMeta(pubkey=sender, is_signer=True, is_writable=True),
+            AccountMeta(pubkey=receiver, is_signer=False, is_writable=True)
+        ],
+        data=json.dumps({"type": "transfer", "amount": amount, "nonce": nonce})
+    )
+    return Transaction([instr], recent_blockhash)
+
+
+def _sign_block(specs: List[tuple]) -> List[dict]:
+    signatures = []
+    for sender, receiver, amount, nonce, recent_blockhash in specs:
+        tx = _transfer(_worker_keys[sender].address, _worker_keys[receiver].address, amount, nonce, recent_blockhash)
+        tx.sign(_worker_keys[sender])
+        signatures.append(tx.signatures)
+    return signatures
+
+
+def _plan_transfers(balances: List[int], txs_per_block: int, rng: random.Random) -> List[tuple]:
+    funded = [i for i, balance in enumerate(balances) if balance > 0]
+    transfers = []
+    while funded and len(transfers) < txs_per_block:
+        slot = rng.randrange(len(funded))
+        sender = funded[slot]
+        receiver = rng.randrange(len(balances))
+        amount = min(balances[sender], rng.randint(1, 3))
+        balances[sender] -= amount
+        if balances[receiver] == 0 and receiver != sender:
+            funded.append(receiver)
+        balances[receiver] += amount
+        if balances[sender] == 0:
+            funded[slot] = funded[-1]
+            funded.pop()
+        transfers.append((sender, receiver, amount))
+    return transfers
+
+
+def generate_fixture(output: str, leader_key: Union[Keypair, str], extra_keys: List[Union[Keypair, str]],
+                     amount_of_accounts: int, amount_of_blocks: int, txs_per_block: int, workers: Optional[int] = None,
+                     seed: int = 0, keystore_file: Optional[str] = None) -> dict:
+    rng = random.Random(seed)
+    started = time.time()
+    in_flight = 4 * (workers or os.cpu_count() or 1)
+
+    keystore = Keystore()
+    for key in [leader_key] + extra_keys:
+        keystore.add(key)
+    keystore.extend(generate_keystore(amount_of_accounts, workers=workers))
+    addresses = keystore.addresses()
+    privkeys = [keystore.privkey(address) for address in addresses]
+    balances = [0] * len(privkeys)
+
+    if keystore_file:
+        keystore.save(keystore_file)
+
+    genesis = Blockchain().blocks[0]
+    previous_hash, poh = genesis.hash(), genesis.poh
+    amount_of_txs = 0
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_signer, initargs=(privkeys,)) as pool, \
+            open(output, "w") as f:
+        f.write('{"blocks": [\n')
+        f.write(json.dumps(genesis.to_dict()))
+
+        window = []
+
+        def flush_oldest():
+            block, future = window.pop(0)
+            for tx, signatures in zip(block.transactions, future.result()):
+                tx.signatures = signatures
+            f.write(",\n")
+            f.write(json.dumps(block.to_dict()))
+
+        for index in range(1, amount_of_blocks):
+            transfers = _plan_transfers(balances, txs_per_block, rng)
+            specs = [(sender, receiver, amount, amount_of_txs + n, previous_hash)
+                     for n, (sender, receiver, amount) in enumerate(transfers)]
+            amount_of_txs += len(specs)
+
+            # transaction hashes exclude signatures, so the chain can be linked before anything is signed
+            txs = [_transfer(addresses[s], addresses[r], amount, nonce, recent)
+                   for s, r, amount, nonce, recent in specs]
+            poh = hashlib.sha256(poh.encode()).hexdigest()
+            block = Block(index, previous_hash, txs, addresses[0], poh, {})
+            previous_hash = block.hash()
+            balances[0] += Constants.BLOCK_REWARD
+
+            window.append((block, pool.submit(_sign_block, specs)))
+            if len(window) > in_flight:
+                flush_oldest()
+            if index % 100 == 0:
+                print(f"🧱 Block #{index} planned ({amount_of_txs} transactions)")
+
+        while window:
+            flush_oldest()
+        f.write("\n]}\n")
+
+    summary = {
+        "blocks": amount_of_blocks,
+        "accounts": len(privkeys),
+        "transactions": amount_of_txs,
+        "seconds": time.time() - started,
+        "balances": dict(zip(addresses, balances))
+    }
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a pre-signed ledger fixture for research runs")
+    parser.add_argument("--accounts", type=int, default=100)
+    parser.add_argument("--blocks", type=int, default=3000)
+    parser.add_argument("--txs-per-block", type=int, default=1000)
+    parser.add_argument("--workers", type=int, help="signing processes (default: one per CPU)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--leader-wallet", default="research_files/leader_wallet.txt")
+    parser.add_argument("--extra-wallets", nargs="*", default=sorted(glob.glob("research_files/user_wallet*.txt")),
+                        help="existing wallets to include as accounts")
+    parser.add_argument("--output", default="research_files/blockchain.json")
+    parser.add_argument("--keystore", default="research_files/keystore.json",
+                        help="where to save the accounts' keys")
+    args = parser.parse_args()
 
+    summary = generate_fixture(args.output, load_wallet(args.leader_wallet),
+                               [load_wallet(path) for path in args.extra_wallets], args.accounts, args.blocks,
+                               args.txs_per_block, args.workers, args.seed, args.keystore)
+    print(f"✅ {summary['blocks']} blocks with {summary['transactions']} transactions for {summary['accounts']} "
+          f"accounts written to {args.output} in {summary['seconds']:.1f}s")
@@ -1,17 +1,20 @@
+import glob
 import json
+import os
 import random
 import statistics
 import sys
+import threading
 import time
 from concurrent.futures import ThreadPoolExecutor
 
 import numpy as np
 
-from constants import Role, Stage, Constants
+from constants import Role, Constants, EventType
 from deserialize_service import DeserializeService
+from keystore import Keystore
 from main import choose_port, create_transfer_tx
 from node import SolanaNode
-from wallet import load_wallet, pubkey_to_address, get_public_key
 
 
 def start_research(node: SolanaNode, addresses: list[str]) -> None:
@@ -27,25 +30,40 @@ def start_research(node: SolanaNode, addresses: list[str]) -> None:
 
     amount_of_added_txs = 0
     start = time.time()
-    old_amount_of_blocks = len(node.blockchain.blocks)
-
-    while len(node.blockchain.blocks) - amount_of_blocks_before != amount_of_generated_blocks:
-        if len(node.blockchain.blocks) - old_amount_of_blocks == 1:
-            old_amount_of_blocks = len(node.blockchain.blocks)
-
-            for tx in node.blockchain.blocks[-1].transactions:
-                tx_id = tx.hash()
-                if tx_id in tx_submit_time:
-                    latency = time.time() - tx_submit_time[tx_id]
-                    tx_latencies.append(latency)
-
-        if node.get_stage() != Stage.TX:
-            continue
+    blocks_done = threading.Event()
+    funds_changed = threading.Event()
+
+    def on_block(_, data):
+        if data["index"] + 1 - amount_of_blocks_before >= amount_of_generated_blocks:
+            blocks_done.set()
+        funds_changed.set()
+
+    def on_confirmed(_, data):
+        submitted = tx_submit_time.pop(data["hash"], None)
+        if submitted is not None:
+            tx_latencies.append(time.time() - submitted)
+
+    subscriptions = [
+        node.events.subscribe(EventType.BLOCK_ADDED, on_block),
+        node.events.subscribe(EventType.TX_CONFIRMED, on_confirmed),
+        node.events.subscribe(EventType.ACCOUNT_CHANGED, lambda *_: funds_changed.set(), node.address)
+    ]
 
+    while not blocks_done.is_set():
+        funds_changed.clear()
         tx = create_transfer_tx(node, random.choice(addresses), coins_to_send)
+        if tx is None:
+            funds_changed.wait(Constants.TIME_TO_SLEEP)
+            continue
+        tx_id = tx.hash()
+        tx_submit_time[tx_id] = time.time()
         if node.add_and_broadcast_tx(tx):
             amount_of_added_txs += 1
-            tx_submit_time[tx.hash()] = time.time()
+        else:
+            tx_submit_time.pop(tx_id, None)
+
+    for subscription in subscriptions:
+        node.events.unsubscribe(subscription)
 
     time_of_work = time.time() - start
     tps = amount_of_added_txs / time_of_work
@@ -85,8 +103,9 @@ def start_research(node: SolanaNode, addresses: list[str]) -> None:
 
     def read_task():
         count = 0
+        state = node.blockchain.state()
         for i in range(READS_PER_THREAD):
-            node.blockchain.get_balance(addresses[i % len(addresses)])
+            state.get_balance(addresses[i % len(addresses)])
             count += 1
         return count
 
@@ -105,19 +124,10 @@ def start_research(node: SolanaNode, addresses: list[str]) -> None:
 
 
 
-def get_addresses() -> list[str]:
-    wallet_files = [
-        "research_files/user_wallet0.txt",
-        "research_files/user_wallet1.txt",
-        "research_files/user_wallet2.txt"
-    ]
-
-    pr_keys: list[str] = []
-
-    for wallet_f in wallet_files:
-        pr_keys.append(load_wallet(wallet_f))
-
-    return [pubkey_to_address(get_public_key(pr_key)) for pr_key in pr_keys]
+def get_addresses(keystore_file: str = "research_files/keystore.json") -> list[str]:
+    if os.path.exists(keystore_file):
+        return Keystore.load(keystore_file).addresses()
+    return Keystore.from_wallets(sorted(glob.glob("research_files/user_wallet*.txt"))).addresses()
 
 def prepare_leader(node: SolanaNode):
     with open("research_files/blockchain.json", "r") as f:
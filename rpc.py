@@ -0,0 +1,228 @@
+import http.client
+import json
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, List, Optional, Tuple
+
+from blockchain import Blockchain
+from constants import Constants, RpcErrorCode, RpcMethod
+from deserialize_service import DeserializeService
+from metrics import MetricsRegistry
+from transaction import Transaction
+
+
+class RpcError(Exception):
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+def _error(request_id, code: int, message: str) -> dict:
+    return {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}
+
+
+class RpcServer:
+    def __init__(self, blockchain: Blockchain, submit: Callable[[Transaction], bool], port: int, host: str = None,
+                 metrics: MetricsRegistry = None):
+        self.blockchain = blockchain
+        self._submit = submit
+        self._methods = {
+            RpcMethod.SEND_TRANSACTION: self._send_transaction,
+            RpcMethod.SEND_TRANSACTION_BATCH: self._send_transaction_batch,
+            RpcMethod.GET_BALANCE: self._get_balance,
+            RpcMethod.GET_MULTIPLE_ACCOUNTS: self._get_multiple_accounts,
+            RpcMethod.GET_TRANSACTION_STATUS: self._get_transaction_status,
+            RpcMethod.GET_BLOCK: self._get_block,
+            RpcMethod.GET_STATE_NODES: self._get_state_nodes,
+            RpcMethod.GET_STATE_BUCKET: self._get_state_bucket,
+        }
+        metrics = metrics or MetricsRegistry()
+        self._m_calls = metrics.counter("rpc_calls_total", "JSON-RPC calls handled", ("method",))
+        self._m_errors = metrics.counter("rpc_errors_total", "JSON-RPC calls answered with an error", ("method",))
+        server_ref = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # HTTP/1.1 keeps the connection open between requests unless the client asks to close it
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                # headers and body go out in separate writes; without this each reply waits for a delayed ACK
+                self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+            def do_POST(self):
+                body = server_ref.handle(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                self.send_response(200 if body is not None else 204)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body or b"")))
+                self.end_headers()
+                if body is not None:
+                    self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host or Constants.RPC_HOST, port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+
+    def start(self):
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        print(f"🛰️ JSON-RPC on http://{self._server.server_address[0]}:{self.port}")
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def handle(self, raw: bytes) -> Optional[bytes]:
+        try:
+            request = json.loads(raw)
+        except ValueError:
+            return json.dumps(_error(None, RpcErrorCode.PARSE_ERROR, "Parse error")).encode()
+
+        if isinstance(request, list):
+            if not request or len(request) > Constants.RPC_MAX_BATCH:
+                return json.dumps(_error(None, RpcErrorCode.INVALID_REQUEST, "Invalid batch size")).encode()
+            responses = [response for response in map(self._call, request) if response is not None]
+            return json.dumps(responses).encode() if responses else None
+
+        response = self._call(request)
+        return json.dumps(response).encode() if response is not None else None
+
+    def _call(self, request) -> Optional[dict]:
+        if not isinstance(request, dict) or request.get("jsonrpc") != "2.0" \
+                or not isinstance(request.get("method"), str):
+            return _error(None, RpcErrorCode.INVALID_REQUEST, "Invalid request")
+
+        request_id = request.get("id")
+        name = request["method"]
+        method = self._methods.get(name)
+        if method is None:
+            return _error(request_id, RpcErrorCode.METHOD_NOT_FOUND, f"Method not found: {name}")
+        params = request.get("params", [])
+        if not isinstance(params, list):
+            return _error(request_id, RpcErrorCode.INVALID_PARAMS, "params must be an array")
+
+        self._m_calls.inc(name)
+        try:
+            result = method(*params)
+        except RpcError as e:
+            self._m_errors.inc(name)
+            return _error(request_id, e.code, e.message)
+        except (TypeError, ValueError, KeyError, IndexError) as e:
+            self._m_errors.inc(name)
+            return _error(request_id, RpcErrorCode.INVALID_PARAMS, f"Invalid params: {e}")
+        except Exception as e:
+            self._m_errors.inc(name)
+            return _error(request_id, RpcErrorCode.INTERNAL_ERROR, str(e))
+
+        if "id" not in request:
+            return None
+        return {"jsonrpc": "2.0", "id": request_id, "result": result}
+
+    def _submit_verified(self, tx: Transaction) -> bool:
+        # the same check gossip gets in pipeline.decode_payload, so a leader never packs a tx validators reject
+        return tx.verify() and self._submit(tx)
+
+    def _send_transaction(self, data: dict) -> str:
+        tx = DeserializeService.deserialize_tx(data)
+        if not self._submit_verified(tx):
+            raise RpcError(RpcErrorCode.TRANSACTION_REJECTED, "Transaction rejected")
+        return tx.hash()
+
+    def _send_transaction_batch(self, txs: list) -> List[Optional[str]]:
+        if not isinstance(txs, list):
+            raise TypeError("expected an array of transactions")
+        results = []
+        for data in txs:
+            # a malformed entry is rejected on its own, so the caller still learns which entries went out
+            try:
+                tx = DeserializeService.deserialize_tx(data)
+                results.append(tx.hash() if self._submit_verified(tx) else None)
+            except (TypeError, ValueError, KeyError, AttributeError):
+                results.append(None)
+        return results
+
+    def _get_balance(self, address: str) -> dict:
+        state = self.blockchain.state()
+        return {"context": {"height": state.height}, "value": state.get_balance(address)}
+
+    def _get_multiple_accounts(self, addresses: list) -> dict:
+        # every account comes from the same state version, even while blocks are being applied
+        state = self.blockchain.state()
+        accounts = []
+        for address in addresses:
+            balance = state.get_balance(address, None)
+            accounts.append({"balance": balance} if balance is not None else None)
+        return {"context": {"height": state.height}, "value": accounts}
+
+    def _get_transaction_status(self, tx_hash: str) -> Optional[dict]:
+        index = self.blockchain.get_transaction_block(tx_hash)
+        if index is not None:
+            return {"block": index, "status": "finalized"}
+        if self.blockchain.is_pending(tx_hash):
+            return {"block": None, "status": "pending"}
+        return None
+
+    def _get_block(self, index: int) -> Optional[dict]:
+        if not isinstance(index, int):
+            raise TypeError("block index must be an integer")
+        blocks = self.blockchain.blocks
+        return blocks[index].to_dict() if 0 <= index < len(blocks) else None
+
+    def _get_state_nodes(self, depth: int, indices: list) -> List[str]:
+        return self.blockchain.state_tree.node_hashes(depth, indices)
+
+    def _get_state_bucket(self, index: int) -> dict:
+        return self.blockchain.state_tree.bucket(index)
+
+
+class RpcClient:
+    def __init__(self, host: str, port: int, timeout: float = 10.0):
+        self._connection = http.client.HTTPConnection(host, port, timeout=timeout)
+        self._next_id = 0
+
+    def _post(self, payload) -> object:
+        body = json.dumps(payload).encode()
+        for attempt in range(2):
+            try:
+                self._connection.request("POST", "/", body, {"Content-Type": "application/json"})
+                data = self._connection.getresponse().read()
+                return json.loads(data) if data else None
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                # the server may have dropped an idle keep-alive connection
+                self._connection.close()
+                if attempt:
+                    raise
+
+    def _request(self, method: str, params) -> dict:
+        self._next_id += 1
+        return {"jsonrpc": "2.0", "id": self._next_id, "method": method, "params": list(params)}
+
+    @staticmethod
+    def _result(response: dict):
+        if "error" in response:
+            raise RpcError(response["error"]["code"], response["error"]["message"])
+        return response["result"]
+
+    def call(self, method: str, *params):
+        return self._result(self._post(self._request(method, params)))
+
+    def batch(self, calls: List[Tuple[str, list]]) -> list:
+        requests = [self._request(method, params) for method, params in calls]
+        batch = self._post(requests)
+        if isinstance(batch, dict):
+            self._result(batch)
+        responses = {response.get("id"): response for response in batch}
+        results = []
+        for request in requests:
+            try:
+                results.append(self._result(responses[request["id"]]))
+            except RpcError as e:
+                results.append(e)
+        return results
+
+    def close(self):
+        self._connection.close()
@@ -0,0 +1,107 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from constants import Constants
+
+
+def message_digest(raw: bytes) -> bytes:
+    return hashlib.blake2b(raw, digest_size=16).digest()
+
+
+class BloomFilter:
+    def __init__(self, bits: int, hashes: int):
+        self._bits = bits
+        self._hashes = hashes
+        self._array = bytearray((bits + 7) // 8)
+
+    def _positions(self, digest: bytes):
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:16], "little") | 1
+        return [(h1 + i * h2) % self._bits for i in range(self._hashes)]
+
+    def add(self, digest: bytes):
+        for position in self._positions(digest):
+            self._array[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, digest: bytes) -> bool:
+        return all(self._array[position >> 3] & (1 << (position & 7)) for position in self._positions(digest))
+
+
+class SeenCache:
+    def __init__(self, capacity: int = None, ttl: float = None, bloom_bits: int = None):
+        self._capacity = capacity or Constants.SEEN_CACHE_CAPACITY
+        self._ttl = ttl or Constants.SEEN_CACHE_TTL
+        bloom_bits = Constants.SEEN_CACHE_BLOOM_BITS if bloom_bits is None else bloom_bits
+
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+        self._bloom_bits = bloom_bits
+        self._bloom = BloomFilter(bloom_bits, Constants.SEEN_CACHE_BLOOM_HASHES) if bloom_bits else None
+        self._previous_bloom = None
+        self._bloom_rotated_at = time.time()
+
+        self.hits = 0
+        self.bloom_hits = 0
+        self.misses = 0
+
+    def check_and_add(self, digest: bytes) -> bool:
+        now = time.time()
+        with self._lock:
+            self._evict(now)
+
+            if digest in self._entries:
+                self._entries.move_to_end(digest)
+                self._entries[digest] = now
+                self.hits += 1
+                return True
+
+            if self._bloom is not None:
+                self._rotate_bloom(now)
+                if digest in self._bloom or (self._previous_bloom is not None and digest in self._previous_bloom):
+                    self.bloom_hits += 1
+                    return True
+
+            self._entries[digest] = now
+            self.misses += 1
+            return False
+
+    def _evict(self, now: float):
+        deadline = now - self._ttl
+        while self._entries:
+            digest, seen_at = next(iter(self._entries.items()))
+            if seen_at >= deadline and len(self._entries) < self._capacity:
+                break
+            self._entries.popitem(last=False)
+            if seen_at >= deadline and self._bloom is not None:
+                # pushed out by capacity while still fresh, so the bloom tier keeps it
+                self._bloom.add(digest)
+
+    def discard(self, digest: bytes):
+        # for a message that was never delivered, so a retransmission is not taken for a duplicate
+        with self._lock:
+            self._entries.pop(digest, None)
+
+    def _rotate_bloom(self, now: float):
+        if now - self._bloom_rotated_at < self._ttl:
+            return
+        self._previous_bloom = self._bloom
+        self._bloom = BloomFilter(self._bloom_bits, Constants.SEEN_CACHE_BLOOM_HASHES)
+        self._bloom_rotated_at = now
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.bloom_hits + self.misses
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "bloom_hits": self.bloom_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits + self.bloom_hits) / total if total else 0.0
+            }
@@ -0,0 +1,92 @@
+import multiprocessing
+import struct
+import time
+from multiprocessing import shared_memory
+from typing import Optional
+
+from constants import Constants
+
+_HEAD = struct.Struct("<Q")
+_TAIL_OFFSET = _HEAD.size
+_DATA_OFFSET = 2 * _HEAD.size
+_LENGTH = struct.Struct("<I")
+
+
+class ShmRingBuffer:
+    # single producer / single consumer; head and tail only ever grow, each side writes one of them
+    def __init__(self, capacity: int = None):
+        self.capacity = capacity or Constants.SHM_RING_CAPACITY
+        self._shm = shared_memory.SharedMemory(create=True, size=_DATA_OFFSET + self.capacity)
+        self._shm.buf[:_DATA_OFFSET] = bytes(_DATA_OFFSET)
+        self._records = multiprocessing.Semaphore(0)
+        self._owner = True
+
+    def __getstate__(self):
+        return {"capacity": self.capacity, "name": self._shm.name, "records": self._records}
+
+    def __setstate__(self, state):
+        self.capacity = state["capacity"]
+        self._shm = shared_memory.SharedMemory(name=state["name"])
+        self._records = state["records"]
+        self._owner = False
+
+    def _head(self) -> int:
+        return _HEAD.unpack_from(self._shm.buf, 0)[0]
+
+    def _tail(self) -> int:
+        return _HEAD.unpack_from(self._shm.buf, _TAIL_OFFSET)[0]
+
+    def used(self) -> int:
+        return self._head() - self._tail()
+
+    def _write(self, position: int, data: bytes):
+        offset = position % self.capacity
+        first = min(len(data), self.capacity - offset)
+        start = _DATA_OFFSET + offset
+        self._shm.buf[start:start + first] = data[:first]
+        if first < len(data):
+            self._shm.buf[_DATA_OFFSET:_DATA_OFFSET + len(data) - first] = data[first:]
+
+    def _read(self, position: int, size: int) -> bytes:
+        offset = position % self.capacity
+        first = min(size, self.capacity - offset)
+        start = _DATA_OFFSET + offset
+        data = bytes(self._shm.buf[start:start + first])
+        if first < size:
+            data += bytes(self._shm.buf[_DATA_OFFSET:_DATA_OFFSET + size - first])
+        return data
+
+    def put(self, payload: bytes, timeout: float = None) -> bool:
+        size = _LENGTH.size + len(payload)
+        if size > self.capacity:
+            raise ValueError(f"Record of {len(payload)} bytes does not fit into a {self.capacity} byte ring")
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        delay = 0.0001
+        head = self._head()
+        while self.capacity - (head - self._tail()) < size:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(delay)
+            delay = min(delay * 2, 0.01)
+
+        self._write(head, _LENGTH.pack(len(payload)))
+        self._write(head + _LENGTH.size, payload)
+        _HEAD.pack_into(self._shm.buf, 0, head + size)
+        self._records.release()
+        return True
+
+    def get(self, timeout: float = None) -> Optional[bytes]:
+        if not self._records.acquire(timeout=timeout):
+            return None
+
+        tail = self._tail()
+        length = _LENGTH.unpack(self._read(tail, _LENGTH.size))[0]
+        payload = self._read(tail + _LENGTH.size, length)
+        _HEAD.pack_into(self._shm.buf, _TAIL_OFFSET, tail + _LENGTH.size + length)
+        return payload
+
+    def close(self):
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
@@ -0,0 +1,187 @@
+import os
+from abc import ABC, abstractmethod
+from typing import Callable, Dict
+
+import ecdsa
+
+from constants import Constants, SignatureScheme
+
+Verifier = Callable[[bytes, bytes], bool]
+
+
+class Signer:
+    def __init__(self, public_key: bytes, sign: Callable[[bytes], bytes]):
+        self.public_key = public_key
+        self.sign = sign
+
+
+class SignatureBackend(ABC):
+    scheme: SignatureScheme
+    implementation = ""
+    private_key_size = 0
+    public_key_size = 0
+
+    @abstractmethod
+    def generate(self) -> bytes:
+        ...
+
+    @abstractmethod
+    def signer(self, private_key: bytes) -> Signer:
+        ...
+
+    @abstractmethod
+    def verifier(self, public_key: bytes) -> Verifier:
+        ...
+
+
+class EcdsaBackend(SignatureBackend):
+    scheme = SignatureScheme.ECDSA
+    implementation = "ecdsa"
+    private_key_size = 32
+    public_key_size = 64
+
+    def generate(self) -> bytes:
+        return ecdsa.SigningKey.generate(curve=ecdsa.SECP256k1).to_string()
+
+    def signer(self, private_key: bytes) -> Signer:
+        sk = ecdsa.SigningKey.from_string(private_key, curve=ecdsa.SECP256k1)
+        return Signer(sk.get_verifying_key().to_string(), sk.sign)
+
+    def verifier(self, public_key: bytes) -> Verifier:
+        vk = ecdsa.VerifyingKey.from_string(public_key, curve=ecdsa.SECP256k1)
+        # VerifyingKey.precompute() loses the curve order in ecdsa 0.19, so mark the point as precomputable directly
+        point = vk.pubkey.point
+        vk.pubkey.point = ecdsa.ellipticcurve.PointJacobi(point.curve(), point.x(), point.y(), 1,
+                                                          ecdsa.SECP256k1.order, generator=True)
+
+        def verify(signature: bytes, message: bytes) -> bool:
+            try:
+                return vk.verify(signature, message)
+            except (ecdsa.BadSignatureError, ValueError):
+                return False
+        return verify
+
+
+class Ed25519Backend(SignatureBackend):
+    # private keys are stored like Solana keypair files: 32-byte seed followed by the 32-byte public key
+    scheme = SignatureScheme.ED25519
+    private_key_size = 64
+    public_key_size = 32
+
+    def generate(self) -> bytes:
+        seed = os.urandom(32)
+        return seed + self._seed_signer(seed).public_key
+
+    def signer(self, private_key: bytes) -> Signer:
+        signer = self._seed_signer(private_key[:32])
+        if signer.public_key != private_key[32:]:
+            raise ValueError("Corrupt Ed25519 key: the stored public key does not match the seed")
+        return signer
+
+    @abstractmethod
+    def _seed_signer(self, seed: bytes) -> Signer:
+        ...
+
+
+class NaclEd25519Backend(Ed25519Backend):
+    implementation = "pynacl"
+
+    def __init__(self):
+        import nacl.exceptions
+        import nacl.signing
+        self._signing = nacl.signing
+        self._bad_signature = nacl.exceptions.BadSignatureError
+
+    def _seed_signer(self, seed: bytes) -> Signer:
+        sk = self._signing.SigningKey(seed)
+        return Signer(bytes(sk.verify_key), lambda message: sk.sign(message).signature)
+
+    def verifier(self, public_key: bytes) -> Verifier:
+        vk = self._signing.VerifyKey(public_key)
+
+        def verify(signature: bytes, message: bytes) -> bool:
+            try:
+                vk.verify(message, signature)
+                return True
+            except (self._bad_signature, ValueError):
+                return False
+        return verify
+
+
+class CryptographyEd25519Backend(Ed25519Backend):
+    implementation = "cryptography"
+
+    def __init__(self):
+        from cryptography.exceptions import InvalidSignature
+        from cryptography.hazmat.primitives.asymmetric import ed25519
+        from cryptography.hazmat.primitives.serialization import Encoding, PublicFormat
+        self._ed25519 = ed25519
+        self._raw = (Encoding.Raw, PublicFormat.Raw)
+        self._invalid_signature = InvalidSignature
+
+    def _seed_signer(self, seed: bytes) -> Signer:
+        sk = self._ed25519.Ed25519PrivateKey.from_private_bytes(seed)
+        return Signer(sk.public_key().public_bytes(*self._raw), sk.sign)
+
+    def verifier(self, public_key: bytes) -> Verifier:
+        vk = self._ed25519.Ed25519PublicKey.from_public_bytes(public_key)
+
+        def verify(signature: bytes, message: bytes) -> bool:
+            try:
+                vk.verify(signature, message)
+                return True
+            except (self._invalid_signature, ValueError):
+                return False
+        return verify
+
+
+class EcdsaEd25519Backend(Ed25519Backend):
+    implementation = "ecdsa"
+
+    def _seed_signer(self, seed: bytes) -> Signer:
+        sk = ecdsa.SigningKey.from_string(seed, curve=ecdsa.Ed25519)
+        return Signer(sk.get_verifying_key().to_string(), sk.sign)
+
+    def verifier(self, public_key: bytes) -> Verifier:
+        vk = ecdsa.VerifyingKey.from_string(public_key, curve=ecdsa.Ed25519)
+        vk.precompute(lazy=True)
+
+        def verify(signature: bytes, message: bytes) -> bool:
+            try:
+                return vk.verify(signature, message)
+            except (ecdsa.BadSignatureError, ValueError):
+                return False
+        return verify
+
+
+def _load_ed25519() -> Ed25519Backend:
+    for backend in (NaclEd25519Backend, CryptographyEd25519Backend):
+        try:
+            return backend()
+        except ImportError:
+            continue
+    return EcdsaEd25519Backend()
+
+
+BACKENDS: Dict[SignatureScheme, SignatureBackend] = {
+    SignatureScheme.ECDSA: EcdsaBackend(),
+    SignatureScheme.ED25519: _load_ed25519()
+}
+
+
+def get_backend(scheme: SignatureScheme = None) -> SignatureBackend:
+    return BACKENDS[scheme or Constants.SIGNATURE_SCHEME]
+
+
+def backend_for_private_key(private_key: bytes) -> SignatureBackend:
+    for backend in BACKENDS.values():
+        if len(private_key) == backend.private_key_size:
+            return backend
+    raise ValueError(f"Unsupported private key length: {len(private_key)}")
+
+
+def backend_for_public_key(public_key: bytes) -> SignatureBackend:
+    for backend in BACKENDS.values():
+        if len(public_key) == backend.public_key_size:
+            return backend
+    raise ValueError(f"Unsupported public key length: {len(public_key)}")
@@ -0,0 +1,136 @@
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+from constants import Constants, Role
+from node import SolanaNode
+from transaction import Transaction, Instruction, AccountMeta
+from transport import InMemoryNetwork
+from wallet import generate_keypair, save_wallet
+
+
+def _transfer(node: SolanaNode, to_address: str, amount: int) -> Transaction:
+    instr = Instruction(
+        program_id="SystemProgram",
+        accounts=[
+            AccountMeta(pubkey=node.address, is_signer=True, is_writable=True),
+            AccountMeta(pubkey=to_address, is_signer=False, is_writable=True)
+        ],
+        data=json.dumps({"type": "transfer", "amount": amount, "nonce": time.time_ns()})
+    )
+    tx = Transaction([instr], node.blockchain.get_last_block().hash())
+    tx.sign(node.keypair)
+    return tx
+
+
+def build_cluster(network: InMemoryNetwork, amount_of_nodes: int, amount_of_validators: int,
+                  wallet_dir: str, base_port: int = 10000, trace_dir: str = None) -> list[SolanaNode]:
+    nodes = []
+    for i in range(amount_of_nodes):
+        wallet_file = os.path.join(wallet_dir, f"wallet{i}.txt")
+        save_wallet(wallet_file, generate_keypair()[0])
+        role = Role.LEADER if i < amount_of_validators else Role.USER
+        trace_file = os.path.join(trace_dir, f"trace{i}.json") if trace_dir else None
+        nodes.append(SolanaNode("127.0.0.1", base_port + i, role, wallet_file, worker_pool_size=1,
+                                transport=network.transport(), trace_file=trace_file))
+    return nodes
+
+
+def run_simulation(amount_of_nodes: int = 50, amount_of_validators: int = 5, duration: float = 60.0,
+                   tx_rate: float = 20.0, latency: float = 0.02, jitter: float = 0.0, bandwidth: float = None,
+                   loss: float = 0.0, seed: int = 42, trace_dir: str = None) -> dict:
+    rng = random.Random(seed)
+    network = InMemoryNetwork(latency, jitter, bandwidth, loss, seed)
+
+    submitted = {}
+    latencies = []
+    with tempfile.TemporaryDirectory() as wallet_dir:
+        nodes = build_cluster(network, amount_of_nodes, amount_of_validators, wallet_dir, trace_dir=trace_dir)
+        Constants.GENESIS_VALIDATORS = tuple(node.address for node in nodes[:amount_of_validators])
+        for node in nodes:
+            node.start()
+
+        observer = nodes[-1]
+        seen_height = len(observer.blockchain.blocks)
+        start = time.time()
+        next_tx_at = start
+        while time.time() - start < duration:
+            now = time.time()
+            if tx_rate and now >= next_tx_at:
+                next_tx_at += 1 / tx_rate
+                sender = rng.choice(nodes)
+                if sender.blockchain.get_balance(sender.address) >= 1:
+                    tx = _transfer(sender, rng.choice(nodes).address, 1)
+                    if sender.add_and_broadcast_tx(tx):
+                        submitted[tx.hash()] = now
+
+            blocks = observer.blockchain.blocks
+            for block in blocks[seen_height:]:
+                for tx in block.transactions:
+                    submitted_at = submitted.pop(tx.hash(), None)
+                    if submitted_at is not None:
+                        latencies.append(now - submitted_at)
+            seen_height = len(blocks)
+            time.sleep(0.005)
+
+        elapsed = time.time() - start
+        heights = [len(node.blockchain.blocks) for node in nodes]
+        heads = {node.blockchain.get_last_block().hash() for node in nodes}
+        finality = [node.vote_aggregator.latency_stats() for node in nodes if node.role == Role.LEADER]
+        stats = network.stats()
+        network.close()
+        if trace_dir:
+            for i, node in enumerate(nodes):
+                node.tracer.dump(os.path.join(trace_dir, f"trace{i}.json"))
+
+    finalized = [stats["median"] for stats in finality if stats["count"]]
+    quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+    return {
+        "nodes": amount_of_nodes,
+        "validators": amount_of_validators,
+        "duration": elapsed,
+        "height_min": min(heights),
+        "height_max": max(heights),
+        "distinct_heads": len(heads),
+        "txs_confirmed": len(latencies),
+        "txs_pending": len(submitted),
+        "tps": len(latencies) / elapsed,
+        "latency_p50": quantiles[49] if quantiles else None,
+        "latency_p99": quantiles[98] if quantiles else None,
+        "finality_median": statistics.median(finalized) if finalized else None,
+        "network": stats
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run an in-process cluster over the simulated network")
+    parser.add_argument("--nodes", type=int, default=50)
+    parser.add_argument("--validators", type=int, default=5)
+    parser.add_argument("--duration", type=float, default=60)
+    parser.add_argument("--slot", type=float, default=2, help="maximum slot time in seconds")
+    parser.add_argument("--tx-rate", type=float, default=20, help="transactions per second offered")
+    parser.add_argument("--latency", type=float, default=0.02, help="one-way latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--bandwidth", type=float, help="bytes per second per link")
+    parser.add_argument("--loss", type=float, default=0.0, help="probability of dropping a message")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--trace-dir", help="write one Chrome trace per node into this directory")
+    parser.add_argument("--verbose", action="store_true", help="show node logs")
+    args = parser.parse_args()
+
+    Constants.TIME_TO_SLEEP = args.slot
+    Constants.HEARTBEAT_INTERVAL = 1
+
+    print(f"🧪 Simulating {args.nodes} nodes ({args.validators} validators) for {args.duration:.0f}s...")
+    stdout = sys.stdout
+    if not args.verbose:
+        # node logs from every thread would drown the report
+        sys.stdout = open(os.devnull, "w")
+    report = run_simulation(args.nodes, args.validators, args.duration, args.tx_rate, args.latency, args.jitter,
+                            args.bandwidth, args.loss, args.seed, args.trace_dir)
+    print(json.dumps(report, indent=2), file=stdout)
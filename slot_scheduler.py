@@ -0,0 +1,54 @@
+import threading
+import time
+from typing import Callable, Optional
+
+from constants import Constants
+
+
+class SlotScheduler:
+    def __init__(self, min_slot: float = None, mempool_threshold: int = None, max_tx_age: float = None):
+        self._min_slot = Constants.MIN_SLOT_TIME if min_slot is None else min_slot
+        self._mempool_threshold = mempool_threshold or Constants.SLOT_MEMPOOL_THRESHOLD
+        self._max_tx_age = Constants.SLOT_MAX_TX_AGE if max_tx_age is None else max_tx_age
+        self._cond = threading.Condition()
+
+        self.last_slot_duration: Optional[float] = None
+        self.effective_slot_duration: Optional[float] = None
+
+    def notify(self):
+        with self._cond:
+            self._cond.notify_all()
+
+    def wait_for_slot(self, mempool_size: Callable[[], int], oldest_tx_age: Callable[[], Optional[float]],
+                      cancelled: Callable[[], bool], early: bool = True) -> bool:
+        max_slot = Constants.TIME_TO_SLEEP
+        start = time.monotonic()
+        with self._cond:
+            while True:
+                if cancelled():
+                    return False
+
+                elapsed = time.monotonic() - start
+                if elapsed >= max_slot:
+                    return True
+
+                wake_in = max_slot - elapsed
+                if elapsed < self._min_slot:
+                    wake_in = min(wake_in, self._min_slot - elapsed)
+                elif early and mempool_size() > 0:
+                    if mempool_size() >= self._mempool_threshold:
+                        return True
+                    age = oldest_tx_age() or 0.0
+                    if age >= self._max_tx_age:
+                        return True
+                    wake_in = min(wake_in, self._max_tx_age - age)
+
+                self._cond.wait(wake_in)
+
+    def record_slot(self, duration: float):
+        self.last_slot_duration = duration
+        if self.effective_slot_duration is None:
+            self.effective_slot_duration = duration
+        else:
+            alpha = Constants.SLOT_DURATION_ALPHA
+            self.effective_slot_duration = (1 - alpha) * self.effective_slot_duration + alpha * duration
@@ -0,0 +1,43 @@
+from typing import Dict, Optional
+
+from constants import Constants
+
+
+class StateVersion:
+    # immutable once published: a version holds only the balances changed by its block and points at its parent,
+    # so readers can keep a handle without locks while execution derives the next version
+    __slots__ = ("height", "_balances", "_parent", "_depth")
+
+    def __init__(self, height: int, balances: Dict[str, float], parent: Optional["StateVersion"] = None):
+        self.height = height
+        self._balances = balances
+        self._parent = parent
+        self._depth = parent._depth + 1 if parent is not None else 0
+
+    def get_balance(self, address: str, default: float = 0.0) -> float:
+        version = self
+        while version is not None:
+            balance = version._balances.get(address)
+            if balance is not None:
+                return balance
+            version = version._parent
+        return default
+
+    def derive(self, height: int, changed: Dict[str, float]) -> "StateVersion":
+        if self._depth >= Constants.STATE_MAX_OVERLAYS:
+            balances = self.to_dict()
+            balances.update(changed)
+            return StateVersion(height, balances)
+        return StateVersion(height, changed, self)
+
+    def to_dict(self) -> Dict[str, float]:
+        chain = []
+        version = self
+        while version is not None:
+            chain.append(version._balances)
+            version = version._parent
+
+        balances = {}
+        for layer in reversed(chain):
+            balances.update(layer)
+        return balances
@@ -0,0 +1,91 @@
+import hashlib
+import threading
+from typing import Callable, Dict, List, Tuple
+
+from constants import Constants
+
+_MODULUS = 1 << 256
+
+
+def _entry_hash(address: str, balance: float) -> int:
+    return int.from_bytes(hashlib.sha256(f"{address}:{balance:.17g}".encode()).digest(), "big")
+
+
+class StateTree:
+    # each bucket keeps an additive set hash of its (address, balance) pairs, so a transfer updates it in O(1);
+    # a Merkle tree over the buckets is only rehashed along dirty paths when a root is asked for
+    def __init__(self, buckets: int = None):
+        self.buckets = buckets or Constants.STATE_TREE_BUCKETS
+        if self.buckets & (self.buckets - 1):
+            raise ValueError("The number of buckets must be a power of two")
+        self.depth = self.buckets.bit_length() - 1
+        self._accounts: List[Dict[str, float]] = [{} for _ in range(self.buckets)]
+        self._entries: Dict[str, Tuple[int, int]] = {}
+        self._sums = [0] * self.buckets
+        empty_leaf = hashlib.sha256(bytes(32)).digest()
+        self._nodes = [b""] * self.buckets + [empty_leaf] * self.buckets
+        for i in range(self.buckets - 1, 0, -1):
+            self._nodes[i] = hashlib.sha256(self._nodes[2 * i] + self._nodes[2 * i + 1]).digest()
+        self._dirty = set()
+        self._lock = threading.Lock()
+
+    def bucket_of(self, address: str) -> int:
+        return int.from_bytes(hashlib.sha256(address.encode()).digest()[:4], "big") & (self.buckets - 1)
+
+    def update(self, address: str, balance: float):
+        entry_hash = _entry_hash(address, balance)
+        with self._lock:
+            bucket, old_hash = self._entries.get(address) or (self.bucket_of(address), 0)
+            self._entries[address] = (bucket, entry_hash)
+            self._accounts[bucket][address] = balance
+            self._sums[bucket] = (self._sums[bucket] - old_hash + entry_hash) % _MODULUS
+            self._dirty.add(bucket)
+
+    def remove(self, address: str):
+        with self._lock:
+            entry = self._entries.pop(address, None)
+            if entry is not None:
+                bucket, old_hash = entry
+                del self._accounts[bucket][address]
+                self._sums[bucket] = (self._sums[bucket] - old_hash) % _MODULUS
+                self._dirty.add(bucket)
+
+    def _rehash(self):
+        level = set()
+        for bucket in self._dirty:
+            self._nodes[self.buckets + bucket] = hashlib.sha256(self._sums[bucket].to_bytes(32, "big")).digest()
+            level.add((self.buckets + bucket) // 2)
+        self._dirty = set()
+        while level:
+            for i in level:
+                self._nodes[i] = hashlib.sha256(self._nodes[2 * i] + self._nodes[2 * i + 1]).digest()
+            level = {i // 2 for i in level if i > 1}
+
+    def root(self) -> str:
+        with self._lock:
+            self._rehash()
+            return self._nodes[1].hex()
+
+    def node_hashes(self, depth: int, indices: List[int]) -> List[str]:
+        # depth 0 is the root, depth self.depth are the buckets
+        if not 0 <= depth <= self.depth or any(not 0 <= i < (1 << depth) for i in indices):
+            raise IndexError("No such subtree")
+        with self._lock:
+            self._rehash()
+            return [self._nodes[(1 << depth) + i].hex() for i in indices]
+
+    def bucket(self, index: int) -> Dict[str, float]:
+        with self._lock:
+            return dict(self._accounts[index])
+
+    def diff(self, remote_hashes: Callable[[int, List[int]], List[str]]) -> List[int]:
+        # one round trip per level, descending only into subtrees whose hashes differ
+        differing = [0]
+        for depth in range(self.depth + 1):
+            local = self.node_hashes(depth, differing)
+            differing = [i for i, mine, theirs in zip(differing, local, remote_hashes(depth, differing))
+                         if mine != theirs]
+            if not differing or depth == self.depth:
+                return differing
+            differing = [child for i in differing for child in (2 * i, 2 * i + 1)]
+        return differing
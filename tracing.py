@@ -0,0 +1,116 @@
+import argparse
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+from constants import Constants
+
+
+def now_us() -> float:
+    # wall clock so that traces taken on different nodes line up after merging
+    return time.time_ns() / 1000
+
+
+class Tracer:
+    def __init__(self, node_id: str = "node", enabled: bool = True, capacity: int = None):
+        self.node_id = node_id
+        self.enabled = enabled
+        self._spans = deque(maxlen=capacity or Constants.TRACE_CAPACITY)
+        self._threads: Dict[int, str] = {}
+        self._lock = threading.Lock()
+
+    def record(self, name: str, start_us: float, end_us: float, block_index: Optional[int] = None, **args):
+        if not self.enabled:
+            return
+        thread = threading.current_thread()
+        if block_index is not None:
+            args["block"] = block_index
+        with self._lock:
+            self._threads.setdefault(thread.ident, thread.name)
+            self._spans.append((name, start_us, end_us - start_us, thread.ident, args))
+
+    @contextmanager
+    def span(self, name: str, block_index: Optional[int] = None, **args):
+        if not self.enabled:
+            yield
+            return
+        start = now_us()
+        try:
+            yield
+        finally:
+            self.record(name, start, now_us(), block_index, **args)
+
+    def to_events(self, pid: int = 1) -> List[dict]:
+        with self._lock:
+            spans = list(self._spans)
+            threads = dict(self._threads)
+
+        events = [{"name": "process_name", "ph": "M", "pid": pid, "args": {"name": self.node_id}}]
+        for ident, name in threads.items():
+            events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": ident, "args": {"name": name}})
+        for name, start, duration, ident, args in spans:
+            events.append({"name": name, "cat": "block", "ph": "X", "ts": start, "dur": duration,
+                           "pid": pid, "tid": ident, "args": args})
+        return events
+
+    def dump(self, path: str):
+        with open(path, "w") as f:
+            json.dump({"traceEvents": self.to_events(), "displayTimeUnit": "ms"}, f)
+
+
+NULL_TRACER = Tracer(enabled=False)
+
+
+def merge_traces(traces: List[dict]) -> dict:
+    events = []
+    for pid, trace in enumerate(traces, start=1):
+        for event in trace["traceEvents"]:
+            events.append(dict(event, pid=pid))
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def block_critical_paths(trace: dict) -> Dict[int, dict]:
+    stages: Dict[int, Dict[str, List[float]]] = {}
+    for event in trace["traceEvents"]:
+        block = event.get("args", {}).get("block")
+        if event.get("ph") != "X" or block is None:
+            continue
+        first_start, last_end = stages.setdefault(block, {}).get(event["name"], (event["ts"], 0.0))
+        stages[block][event["name"]] = (min(first_start, event["ts"]), max(last_end, event["ts"] + event["dur"]))
+
+    paths = {}
+    for block, by_stage in stages.items():
+        ordered = sorted(by_stage.items(), key=lambda item: item[1][0])
+        start = ordered[0][1][0]
+        end = max(stage_end for _, (_, stage_end) in ordered)
+        paths[block] = {
+            "total_ms": (end - start) / 1000,
+            "stages": [{"name": name, "start_ms": (s - start) / 1000, "end_ms": (e - start) / 1000}
+                       for name, (s, e) in ordered]
+        }
+    return paths
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Merge per-node traces into one Chrome/Perfetto trace")
+    parser.add_argument("output", help="merged trace file")
+    parser.add_argument("traces", nargs="+", help="trace files written by SolanaNode(trace_file=...)")
+    args = parser.parse_args()
+
+    loaded = []
+    for path in args.traces:
+        with open(path, "r") as f:
+            loaded.append(json.load(f))
+
+    merged = merge_traces(loaded)
+    with open(args.output, "w") as f:
+        json.dump(merged, f)
+    print(f"💾 Merged {len(loaded)} traces into {args.output} (open in chrome://tracing or ui.perfetto.dev)")
+
+    for block, path in sorted(block_critical_paths(merged).items()):
+        stages = " → ".join(f"{stage['name']} @{stage['start_ms']:.1f}-{stage['end_ms']:.1f}ms"
+                            for stage in path["stages"])
+        print(f"🧱 Block {block}: {path['total_ms']:.1f}ms | {stages}")
@@ -1,8 +1,9 @@
 import hashlib
 import json
 import base64
-import ecdsa
-from typing import List
+from typing import List, Union
+
+from wallet import Keypair, as_keypair, pubkey_to_address, verifying_key
 
 class AccountMeta:
     def __init__(self, pubkey: str, is_signer: bool, is_writable: bool):
@@ -49,17 +50,18 @@ class Transaction:
     def hash(self) -> str:
         return hashlib.sha256(self.to_json(include_signatures=False).encode()).hexdigest()
 
-    def sign(self, privkey_base64: str):
-        sk = ecdsa.SigningKey.from_string(base64.b64decode(privkey_base64), curve=ecdsa.SECP256k1)
-        pubkey = base64.b64encode(sk.get_verifying_key().to_string()).decode()
-        signature = sk.sign(self.hash().encode())
-        self.signatures[pubkey] = base64.b64encode(signature).decode()
+    def sign(self, key: Union[Keypair, str]):
+        keypair = as_keypair(key)
+        self.signatures[keypair.pubkey] = keypair.sign(self.hash())
 
     def verify(self) -> bool:
+        if not self.signatures:
+            return False
+        message = self.hash().encode()
         for pubkey, signature in self.signatures.items():
-            try:
-                vk = ecdsa.VerifyingKey.from_string(base64.b64decode(pubkey), curve=ecdsa.SECP256k1)
-                vk.verify(base64.b64decode(signature), self.hash().encode())
-            except ecdsa.BadSignatureError:
+            if not verifying_key(pubkey)(base64.b64decode(signature), message):
                 return False
-        return True
+        # a valid signature from some other key does not authorise spending from the sender's account
+        signers = {pubkey_to_address(pubkey) for pubkey in self.signatures}
+        return all(account.pubkey in signers for instr in self.instructions for account in instr.accounts
+                   if account.is_signer)
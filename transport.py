@@ -0,0 +1,294 @@
+import heapq
+import queue
+import random
+import socket
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Optional, Tuple
+
+Address = Tuple[str, int]
+MessageHandler = Callable[[bytes], None]
+PresenceHandler = Callable[[str, float], None]
+DiscoveryResponder = Callable[[], str]
+
+DISCOVER = b"DISCOVER"
+
+
+def _get_local_ip():
+    s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        s.connect(("8.8.8.8", 80))
+        ip = s.getsockname()[0]
+    except:
+        ip = "127.0.0.1"
+    finally:
+        s.close()
+    return ip
+
+
+class Transport(ABC):
+    @abstractmethod
+    def local_ip(self) -> str:
+        ...
+
+    @abstractmethod
+    def listen(self, host: str, port: int, handler: MessageHandler):
+        ...
+
+    @abstractmethod
+    def send(self, address: Address, raw: bytes):
+        ...
+
+    @abstractmethod
+    def serve_discovery(self, port: int, responder: DiscoveryResponder):
+        ...
+
+    @abstractmethod
+    def discover(self, port: int, window: float, on_response: PresenceHandler):
+        ...
+
+    def close(self):
+        pass
+
+
+class TcpTransport(Transport):
+    def __init__(self):
+        self._presence_sock: Optional[socket.socket] = None
+
+    def local_ip(self) -> str:
+        return _get_local_ip()
+
+    def listen(self, host: str, port: int, handler: MessageHandler):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.bind((host, port))
+        sock.listen()
+        print("📥 Waiting for TCP connections...")
+        while True:
+            conn, _ = sock.accept()
+            threading.Thread(target=self._handle_connection, args=(conn, handler), daemon=True).start()
+
+    @staticmethod
+    def _handle_connection(conn, handler: MessageHandler):
+        try:
+            buffer = b""
+            while True:
+                chunk = conn.recv(10000)
+                if not chunk:
+                    break
+                buffer += chunk
+            handler(buffer)
+        except Exception as e:
+            print("❌ TCP error:", e)
+        finally:
+            conn.close()
+
+    def send(self, address: Address, raw: bytes):
+        with socket.socket() as s:
+            s.connect(address)
+            s.sendall(raw)
+
+    def serve_discovery(self, port: int, responder: DiscoveryResponder):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind(('', port))
+        while True:
+            data, addr = sock.recvfrom(1024)
+            if data == DISCOVER:
+                sock.sendto(responder().encode(), addr)
+
+    def discover(self, port: int, window: float, on_response: PresenceHandler):
+        if self._presence_sock is None:
+            self._presence_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self._presence_sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+        sock = self._presence_sock
+
+        sent_at = time.time()
+        sock.sendto(DISCOVER, ('<broadcast>', port))
+        deadline = sent_at + window
+        while True:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            sock.settimeout(remaining)
+            try:
+                data, addr = sock.recvfrom(1024)
+            except socket.timeout:
+                break
+            on_response(data.decode(), time.time() - sent_at)
+
+
+class _Endpoint:
+    def __init__(self, handler: MessageHandler):
+        self.handler = handler
+        self.inbox = queue.Queue()
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def _run(self):
+        while True:
+            raw = self.inbox.get()
+            if raw is None:
+                return
+            try:
+                self.handler(raw)
+            except Exception as e:
+                print("❌ In-memory delivery error:", e)
+
+
+class InMemoryNetwork:
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, bandwidth: Optional[float] = None,
+                 loss: float = 0.0, seed: Optional[int] = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.bandwidth = bandwidth
+        self.loss = loss
+
+        # one generator per link: the draws on a link do not depend on how sender threads interleave on others.
+        # delivery times still follow the wall clock, so runs match only as far as thread scheduling allows
+        self._seed = seed
+        self._link_rngs: Dict[tuple, random.Random] = {}
+        self._endpoints: Dict[Address, _Endpoint] = {}
+        self._responders: Dict[int, Dict[object, DiscoveryResponder]] = {}
+        self._link_free_at: Dict[Tuple[Address, Address], float] = {}
+        self._pending = []
+        self._seq = 0
+        self._cond = threading.Condition()
+        self._closed = False
+
+        self.sent = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.bytes_sent = 0
+
+        threading.Thread(target=self._deliver_loop, daemon=True).start()
+
+    def transport(self, host: str = "127.0.0.1") -> "InMemoryTransport":
+        return InMemoryTransport(self, host)
+
+    def _link_rng(self, *link) -> random.Random:
+        rng = self._link_rngs.get(link)
+        if rng is None:
+            rng = self._link_rngs[link] = random.Random(None if self._seed is None else f"{self._seed}:{link}")
+        return rng
+
+    def _delay(self, rng: random.Random) -> float:
+        return self.latency + (rng.uniform(0, self.jitter) if self.jitter else 0.0)
+
+    def register(self, address: Address, handler: MessageHandler):
+        with self._cond:
+            self._endpoints[address] = _Endpoint(handler)
+
+    def unregister(self, address: Optional[Address], owner: object):
+        with self._cond:
+            endpoint = self._endpoints.pop(address, None)
+            if endpoint is not None:
+                endpoint.inbox.put(None)
+            for responders in self._responders.values():
+                responders.pop(owner, None)
+
+    def register_responder(self, port: int, owner: object, responder: DiscoveryResponder):
+        with self._cond:
+            self._responders.setdefault(port, {})[owner] = responder
+
+    def send(self, source: Address, destination: Address, raw: bytes):
+        with self._cond:
+            endpoint = self._endpoints.get(destination)
+            if endpoint is None or self._closed:
+                raise ConnectionRefusedError(f"No endpoint listening on {destination[0]}:{destination[1]}")
+
+            self.sent += 1
+            self.bytes_sent += len(raw)
+            rng = self._link_rng(source, destination)
+            if rng.random() < self.loss:
+                self.dropped += 1
+                return
+
+            now = time.monotonic()
+            depart_at = now
+            if self.bandwidth:
+                link = (source, destination)
+                depart_at = max(now, self._link_free_at.get(link, now)) + len(raw) / self.bandwidth
+                self._link_free_at[link] = depart_at
+
+            self._seq += 1
+            heapq.heappush(self._pending, (depart_at + self._delay(rng), self._seq, endpoint, raw))
+            self._cond.notify()
+
+    def discover(self, port: int, owner: "InMemoryTransport", on_response: PresenceHandler):
+        with self._cond:
+            replies = []
+            for responder_owner, responder in self._responders.get(port, {}).items():
+                if responder_owner is owner:
+                    continue
+                rng = self._link_rng(port, owner.address, responder_owner.address)
+                if rng.random() < self.loss:
+                    continue
+                replies.append((responder, 2 * self._delay(rng)))
+
+        for responder, rtt in replies:
+            on_response(responder(), rtt)
+
+    def _deliver_loop(self):
+        with self._cond:
+            while not self._closed:
+                if not self._pending:
+                    self._cond.wait()
+                    continue
+                deliver_at, _, endpoint, raw = self._pending[0]
+                wait = deliver_at - time.monotonic()
+                if wait > 0:
+                    self._cond.wait(wait)
+                    continue
+                heapq.heappop(self._pending)
+                self.delivered += 1
+                endpoint.inbox.put(raw)
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            for endpoint in self._endpoints.values():
+                endpoint.inbox.put(None)
+            self._endpoints.clear()
+            self._pending.clear()
+            self._cond.notify_all()
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "endpoints": len(self._endpoints),
+                "sent": self.sent,
+                "delivered": self.delivered,
+                "dropped": self.dropped,
+                "in_flight": len(self._pending),
+                "bytes_sent": self.bytes_sent
+            }
+
+
+class InMemoryTransport(Transport):
+    def __init__(self, network: InMemoryNetwork, host: str = "127.0.0.1"):
+        self._network = network
+        self._host = host
+        self._address: Optional[Address] = None
+
+    @property
+    def address(self) -> Optional[Address]:
+        return self._address
+
+    def local_ip(self) -> str:
+        return self._host
+
+    def listen(self, host: str, port: int, handler: MessageHandler):
+        self._address = (self._host, port)
+        self._network.register(self._address, handler)
+
+    def send(self, address: Address, raw: bytes):
+        self._network.send(self._address, tuple(address), raw)
+
+    def serve_discovery(self, port: int, responder: DiscoveryResponder):
+        self._network.register_responder(port, self, responder)
+
+    def discover(self, port: int, window: float, on_response: PresenceHandler):
+        self._network.discover(port, self, on_response)
+
+    def close(self):
+        self._network.unregister(self._address, self)
@@ -0,0 +1,16 @@
+import hashlib
+import random
+from typing import Iterable, List, Tuple
+
+
+def turbine_order(peers: Iterable[Tuple[str, int]], block_hash: str, kind: str) -> List[str]:
+    nodes = sorted(f"{host}:{port}" for (host, port) in peers)
+    seed = hashlib.sha256(f"{block_hash}{kind}".encode()).digest()
+    random.Random(seed).shuffle(nodes)
+    return nodes
+
+
+def turbine_children(order: List[str], position: int, fanout: int) -> List[str]:
+    # position -1 is the root (block producer), which is not part of the order
+    start = fanout * (position + 1)
+    return order[start:start + fanout]
@@ -0,0 +1,45 @@
+import threading
+import time
+from typing import Callable, List, Tuple
+
+from constants import Constants
+
+
+class TxBatcher:
+    def __init__(self, flush: Callable[[List[dict]], None], max_size: int = None, window_us: int = None):
+        self._flush = flush
+        self._max_size = max_size or Constants.TX_BATCH_MAX_SIZE
+        self._window = (window_us or Constants.TX_BATCH_WINDOW_US) / 1_000_000
+        self._cond = threading.Condition()
+        # each tx keeps its arrival time, so leftovers of an oversized batch are not given a fresh window
+        self._batch: List[Tuple[float, dict]] = []
+
+    def add(self, tx_data: dict):
+        with self._cond:
+            self._batch.append((time.perf_counter(), tx_data))
+            if len(self._batch) == 1 or len(self._batch) >= self._max_size:
+                self._cond.notify()
+
+    def run(self):
+        while True:
+            batch = self._next_batch()
+            try:
+                self._flush(batch)
+            except Exception as e:
+                print(f"❌ Failed to flush tx batch: {e}")
+
+    def _next_batch(self) -> List[dict]:
+        with self._cond:
+            while not self._batch:
+                self._cond.wait()
+
+            deadline = self._batch[0][0] + self._window
+            while len(self._batch) < self._max_size:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            batch = [tx_data for _, tx_data in self._batch[:self._max_size]]
+            self._batch = self._batch[self._max_size:]
+            return batch
@@ -1,21 +1,65 @@
+import base64
 import hashlib
+import json
+import os
+import pickle
+import queue
+import tempfile
+import threading
+import time
+import urllib.request
 
+from benchmarks import compare, run_benchmarks
 from blockchain import Block, Blockchain
-from constants import Constants
+from chain_sync import ChainSync
+from constants import Constants, EventType, MessageType, OverflowPolicy, Role, RpcErrorCode, RpcMethod, \
+    SignatureScheme, Stage, WorkerPoolKind
+from deserialize_service import DeserializeService
+from dispatcher import MessageDispatcher
+from events import EventFeedServer, subscribe_feed
+from execution_backend import ExecutionClient
+from histogram import LatencyHistogram
+from keystore import Keystore, generate_keystore
+from leader_schedule import LeaderSchedule, epoch_of
+from loadgen import LoadGenerator, presign_transfers
+from metrics import MetricsRegistry, MetricsServer
+from node import SolanaNode
+from peer_table import PeerTable
+from pipeline import WorkerPool, decode_message, peek_message_type
+from pre_research import generate_fixture
+from rpc import RpcClient, RpcError, RpcServer
+from seen_cache import SeenCache, message_digest
+from shm_ring import ShmRingBuffer
+from signature_backend import BACKENDS, EcdsaEd25519Backend
+from slot_scheduler import SlotScheduler
+from state import StateVersion
+from state_root import StateTree
 from transaction import Instruction, AccountMeta, Transaction
-from wallet import generate_keypair
+from tracing import Tracer, block_critical_paths, merge_traces
+from transport import InMemoryNetwork
+from turbine import turbine_order, turbine_children
+from tx_batcher import TxBatcher
+from vote_aggregator import Vote, VoteAggregator
+from wallet import Keypair, generate_keypair, load_wallet, pubkey_to_address, save_wallet, verify, verifying_key
 
 
-def create_transaction(amount=10):
+def create_transaction(amount=10, sender=None):
     priv, pub = generate_keypair()
-    receiver_priv, receiver_pub = generate_keypair()
+    sender, receiver = sender or pubkey_to_address(pub), pubkey_to_address(generate_keypair()[1])
     instr = Instruction(
         "SystemProgram",
-        [AccountMeta(pub, True, True), AccountMeta(receiver_pub, False, True)],
+        [AccountMeta(sender, True, True), AccountMeta(receiver, False, True)],
         data=str({"amount": amount})
     )
     tx = Transaction([instr])
-    return tx, pub, priv, receiver_pub
+    return tx, sender, priv, receiver
+
+def create_registration(keypair: Keypair, address: str = None):
+    instr = Instruction("ValidatorProgram", [AccountMeta(address or keypair.address, True, False)],
+                        json.dumps({"action": "register"}))
+    tx = Transaction([instr])
+    tx.sign(keypair)
+    return tx
 
 def test_block_creation_and_hash():
     tx, pub, priv, _ = create_transaction()
@@ -81,4 +125,841 @@ def test_blockchain_to_dict_structure():
     result = blockchain.to_dict()
     assert isinstance(result, dict)
     assert "blocks" in result
-    assert isinstance(result["blocks"], list)
\ No newline at end of file
+    assert isinstance(result["blocks"], list)
+
+def test_turbine_tree_reaches_every_peer_once():
+    peers = {("10.0.0.1", 5000 + i) for i in range(20)}
+    order = turbine_order(peers, "a" * 64, "share_block")
+    assert order == turbine_order(set(peers), "a" * 64, "share_block")
+
+    reached = list(turbine_children(order, -1, 3))
+    for position in range(len(order)):
+        reached.extend(turbine_children(order, position, 3))
+
+    assert sorted(reached) == sorted(f"{host}:{port}" for (host, port) in peers)
+    assert len(turbine_children(order, -1, 3)) == 3
+
+
+def test_chain_sync_downloads_ranges_from_several_peers():
+    source = Blockchain()
+    for _ in range(250):
+        source.add_external_block(source.produce_block("leader"))
+
+    target = Blockchain()
+    sync = ChainSync()
+    sync.peer_tips["peer_b:1"] = len(source.blocks)
+
+    start, end = sync.on_tip("peer_a:1", len(source.blocks), target.get_last_block())
+    assert sync.on_headers(source.get_headers(start, end))
+
+    assignments = sync.assign_ranges()
+    assert {peer for peer, _, _ in assignments} == {"peer_a:1", "peer_b:1"}
+    assert sum(e - s for _, s, e in assignments) == len(source.blocks) - 1
+
+    for _, s, e in reversed(assignments):
+        sync.on_blocks(source.get_blocks(s, e))
+    for block in sync.pop_ready(len(target.blocks)):
+        assert target.add_external_block(block)
+
+    assert sync.try_finish(len(target.blocks))
+    assert [b.hash() for b in target.blocks] == [b.hash() for b in source.blocks]
+
+def test_chain_sync_rejects_headers_from_a_fork():
+    source = Blockchain()
+    source.add_external_block(source.produce_block("leader"))
+    target = Blockchain()
+    target.add_external_block(target.produce_block("other"))
+    target.add_external_block(target.produce_block("other"))
+    source.add_external_block(source.produce_block("leader"))
+    source.add_external_block(source.produce_block("leader"))
+
+    sync = ChainSync()
+    start, end = sync.on_tip("peer:1", len(source.blocks), target.get_last_block())
+    assert not sync.on_headers(source.get_headers(start, end))
+
+def test_tx_batcher_flushes_by_size_and_by_window():
+    flushed = []
+    batcher = TxBatcher(flushed.append, max_size=3, window_us=50_000)
+    threading.Thread(target=batcher.run, daemon=True).start()
+
+    for i in range(4):
+        batcher.add({"n": i})
+    time.sleep(0.2)
+
+    assert flushed == [[{"n": 0}, {"n": 1}, {"n": 2}], [{"n": 3}]]
+
+    flushed.clear()
+    batcher = TxBatcher(flushed.append, max_size=2, window_us=100_000)
+    for i in range(3):
+        batcher.add({"n": i})
+    time.sleep(0.1)
+    assert batcher._next_batch() == [{"n": 0}, {"n": 1}]
+    started = time.perf_counter()
+    assert batcher._next_batch() == [{"n": 2}]
+    assert time.perf_counter() - started < 0.05, "a leftover must not wait for a fresh window"
+
+def test_dispatcher_serves_consensus_before_queued_transactions():
+    dispatcher = MessageDispatcher()
+    for _ in range(3):
+        dispatcher.put({"type": MessageType.TX_BATCH, "data": {}})
+    dispatcher.put({"type": MessageType.REQUEST_TIP, "data": {}})
+    dispatcher.put({"type": MessageType.FINALISE_BLOCK, "data": {}})
+
+    order = [dispatcher.get()["type"] for _ in range(5)]
+    assert order == [MessageType.FINALISE_BLOCK, MessageType.REQUEST_TIP] + [MessageType.TX_BATCH] * 3
+    assert dispatcher.stats()["tx"]["dequeued"] == 3
+
+def test_dispatcher_sheds_transactions_when_tx_lane_is_full():
+    dispatcher = MessageDispatcher(tx_capacity=2, overflow=OverflowPolicy.DROP)
+    results = [dispatcher.put({"type": MessageType.TX, "data": {}}) for _ in range(3)]
+    assert results == [True, True, False]
+    assert dispatcher.put({"type": MessageType.SIGNATURE, "data": {}})
+
+    stats = dispatcher.stats()
+    assert stats["tx"]["dropped"] == 1
+    assert stats["tx"]["max_depth"] == 2
+
+def test_decode_message_filters_transactions_with_bad_signatures():
+    tx, pub, priv, _ = create_transaction()
+    tx.sign(priv)
+    forged, _, _, _ = create_transaction()
+    forged.signatures = dict(tx.signatures)
+
+    raw = json.dumps({"type": MessageType.TX_BATCH, "data": {"txs": [tx.to_dict(), forged.to_dict()]}}).encode()
+    message = decode_message(raw)
+
+    assert message["type"] == MessageType.TX_BATCH
+    assert [t.hash() for t in message.payload] == [tx.hash()]
+
+    decoded = queue.Queue()
+    pool = WorkerPool(WorkerPoolKind.THREAD, 1)
+    pool.decode(b"{not json", decoded.put)
+    pool.decode(raw, decoded.put)
+    assert decoded.get(timeout=5) is None, "a message that fails to decode is reported as None"
+    assert [t.hash() for t in decoded.get(timeout=5).payload] == [tx.hash()]
+    pool.shutdown()
+
+def test_peer_table_tracks_rtt_and_expires_silent_peers():
+    table = PeerTable(timeout=0.05)
+    assert table.touch(("10.0.0.1", 5000), True, 3, rtt=0.010)
+    assert not table.touch(("10.0.0.1", 5000), True, 4, rtt=0.020)
+    info = table.get(("10.0.0.1", 5000))
+    assert 0.010 < info.rtt < 0.020
+    assert table.best_height() == 4
+
+    time.sleep(0.1)
+    table.touch(("10.0.0.2", 5000), False, 1)
+    assert table.expire() == [("10.0.0.1", 5000)]
+    assert [peer for peer, _ in table.items()] == [("10.0.0.2", 5000)]
+
+def test_seen_cache_drops_duplicates_and_reports_hit_rate():
+    cache = SeenCache(capacity=2, ttl=60, bloom_bits=0)
+    a, b, c = (message_digest(x) for x in (b"a", b"b", b"c"))
+
+    assert not cache.check_and_add(a)
+    assert cache.check_and_add(a)
+    assert not cache.check_and_add(b)
+    assert not cache.check_and_add(c)
+    assert not cache.check_and_add(a), "a should have been evicted by the LRU"
+    assert cache.stats()["hit_rate"] == 0.2
+
+    cache.discard(a)
+    assert not cache.check_and_add(a), "a discarded digest was never delivered"
+
+def test_seen_cache_bloom_tier_remembers_evicted_digests():
+    cache = SeenCache(capacity=1, ttl=60, bloom_bits=1 << 16)
+    a, b = message_digest(b"a"), message_digest(b"b")
+
+    assert not cache.check_and_add(a)
+    assert not cache.check_and_add(b)
+    assert cache.check_and_add(a)
+    assert cache.stats()["bloom_hits"] == 1
+
+    cache = SeenCache(capacity=2, ttl=60, bloom_bits=1 << 16)
+    assert not cache.check_and_add(b)
+    cache.discard(b)
+    assert not cache.check_and_add(b), "only evicted digests go to the bloom tier"
+
+def test_peek_message_type_reads_type_without_parsing():
+    raw = json.dumps({"type": MessageType.TX_BATCH, "data": {"txs": []}}).encode()
+    assert peek_message_type(raw) == MessageType.TX_BATCH
+    assert peek_message_type(b"not json") is None
+    assert peek_message_type(b'{"data": {"txs": []}, "type": "tx_batch"}') == MessageType.TX_BATCH
+    assert peek_message_type(b'{ "type":"tx" ,"data":{}}') == MessageType.TX
+    assert peek_message_type(b'["type"]') is None
+
+def test_transactions_arriving_during_voting_go_into_the_next_block():
+    blockchain = Blockchain()
+    first, _, _, _ = create_transaction()
+    second, _, _, _ = create_transaction()
+    blockchain.add_transaction(first)
+
+    block = blockchain.produce_block("leader")
+    blockchain.add_transaction(second, next_slot=True)
+    assert [tx.hash() for tx in block.transactions] == [first.hash()]
+
+    assert blockchain.add_external_block(block)
+    assert [tx.hash() for tx in blockchain.pending_txs] == [second.hash()]
+    assert blockchain.next_slot_txs == []
+
+    next_block = blockchain.produce_block("leader")
+    assert [tx.hash() for tx in next_block.transactions] == [second.hash()]
+
+def test_leader_schedule_is_deterministic_and_stake_weighted():
+    stakes = {"big": 900, "small": 100}
+    schedule = LeaderSchedule(3, stakes, seed="a" * 64)
+    same = LeaderSchedule(3, dict(stakes), seed="a" * 64)
+
+    first_slot = 3 * Constants.SLOTS_PER_EPOCH
+    slots = range(first_slot, first_slot + Constants.SLOTS_PER_EPOCH)
+    leaders = [schedule.leader_for(slot) for slot in slots]
+
+    assert leaders == [same.leader_for(slot) for slot in slots]
+    assert leaders.count("big") > leaders.count("small") > 0
+    assert epoch_of(first_slot) == 3
+
+def test_leader_schedule_without_stake_rotates_between_validators():
+    schedule = LeaderSchedule(0, {"a": 0, "b": 0}, seed="genesis")
+    leaders = {schedule.leader_for(slot) for slot in range(Constants.SLOTS_PER_EPOCH)}
+    assert leaders == {"a", "b"}
+
+def test_epoch_stakes_snapshot_only_registered_validators():
+    validator = Keypair(generate_keypair()[0])
+    impostor = Keypair(generate_keypair()[0])
+    Constants.SLOTS_PER_EPOCH, old_slots_per_epoch = 2, Constants.SLOTS_PER_EPOCH
+    try:
+        blockchain = Blockchain()
+        assert blockchain.get_epoch_stakes(0) == {}
+        blockchain.add_transaction(create_registration(validator))
+        blockchain.add_transaction(create_registration(impostor, address="someone-else"))
+        blockchain.add_external_block(blockchain.produce_block(validator.address))
+        assert blockchain.validators == {validator.address}, "only the key behind an address may register it"
+        assert blockchain.get_epoch_stakes(1) == {validator.address: Constants.BLOCK_REWARD}
+        blockchain.add_external_block(blockchain.produce_block("leader"))
+        assert blockchain.get_epoch_stakes(2) is None, "live balances must never stand in for a snapshot"
+    finally:
+        Constants.SLOTS_PER_EPOCH = old_slots_per_epoch
+
+def test_node_schedule_ignores_peers_and_drops_rounds_without_quorum():
+    privkey, _ = generate_keypair()
+    old_genesis, old_slot, old_timeout = Constants.GENESIS_VALIDATORS, Constants.TIME_TO_SLEEP, \
+        Constants.ROUND_TIMEOUT_SLOTS
+    with tempfile.TemporaryDirectory() as wallet_dir:
+        wallet_file = os.path.join(wallet_dir, "wallet.txt")
+        save_wallet(wallet_file, privkey)
+        node = SolanaNode("127.0.0.1", 1, Role.LEADER, wallet_file, transport=InMemoryNetwork().transport())
+    try:
+        Constants.GENESIS_VALIDATORS = ()
+        assert node.is_slot_leader("anyone", 1), "with no validators known the epoch is open"
+        assert node.epoch_validators(1) == {node.address}
+
+        Constants.GENESIS_VALIDATORS = ("a", "b")
+        node._leader_schedule = None
+        leaders = {slot for slot in range(1, 20) if node.is_slot_leader("a", slot)}
+        node.peer_table.touch(("127.0.0.1", 2), True, 1, address="c")
+        assert leaders == {slot for slot in range(1, 20) if node.is_slot_leader("a", slot)}
+        assert 0 < len(leaders) < 19 and not node.is_slot_leader("c", 1)
+        assert node.epoch_validators(1) == {"a", "b"}
+
+        Constants.TIME_TO_SLEEP, Constants.ROUND_TIMEOUT_SLOTS = 0.05, 1
+        node._temp_block = node.blockchain.produce_block(node.address)
+        node._enter_mining()
+        tx, _, priv, _ = create_transaction()
+        tx.sign(priv)
+        node.blockchain.add_transaction(tx, next_slot=True)
+        node._dispatch_message(node.message_queue.get())
+        assert node.get_stage() == Stage.TX and node._temp_block is None
+        assert node.blockchain.pending_txs == [tx], "held-back transactions are due in the next round"
+    finally:
+        Constants.GENESIS_VALIDATORS, Constants.TIME_TO_SLEEP, Constants.ROUND_TIMEOUT_SLOTS = \
+            old_genesis, old_slot, old_timeout
+
+def test_vote_aggregator_counts_each_verified_validator_once():
+    block = Blockchain().produce_block("leader")
+    block_hash = block.hash_content()
+
+    votes = []
+    for _ in range(4):
+        priv, pub = generate_keypair()
+        votes.append(Vote(block.index, block_hash, pubkey_to_address(pub), pub, block.sign_block(priv)))
+    outsider = votes.pop()
+    forged = Vote(block.index, block_hash, votes[0].address, votes[1].pubkey, votes[1].signature)
+    stale = Vote(block.index - 1, block_hash, votes[2].address, votes[2].pubkey, votes[2].signature)
+    next_slot = Vote(block.index + 1, "f" * 64, votes[2].address, votes[2].pubkey, votes[2].signature)
+
+    aggregator = VoteAggregator()
+    validators = [vote.address for vote in votes] + ["offline"]
+    aggregator.start(block.index, block_hash, validators)
+    aggregator.start(block.index + 1, "f" * 64, validators)
+
+    assert all(vote.verify() for vote in votes) and outsider.verify()
+    assert not forged.verify()
+
+    assert aggregator.add_votes([votes[0], votes[0], stale, outsider]) == [votes[0]]
+    assert not aggregator.try_quorum(block.index)
+    assert aggregator.add_votes([votes[1], next_slot]) == [votes[1], next_slot]
+    assert aggregator.vote_count(block.index) == 2 and aggregator.vote_count(block.index + 1) == 1
+    assert not aggregator.try_quorum(block.index), "votes from outside the validator set never count"
+    assert aggregator.add_votes([votes[2]]) == [votes[2]]
+    assert aggregator.try_quorum(block.index)
+    assert not aggregator.try_quorum(block.index), "a block is finalized only once"
+    assert aggregator.latency_stats()["count"] == 1
+
+def test_slot_scheduler_cuts_slot_early_under_pressure_but_not_when_idle():
+    Constants.TIME_TO_SLEEP, old_time_to_sleep = 0.3, Constants.TIME_TO_SLEEP
+    try:
+        scheduler = SlotScheduler(min_slot=0.01, mempool_threshold=3, max_tx_age=10)
+
+        start = time.monotonic()
+        assert scheduler.wait_for_slot(lambda: 0, lambda: None, lambda: False)
+        assert time.monotonic() - start >= 0.3
+
+        start = time.monotonic()
+        assert scheduler.wait_for_slot(lambda: 5, lambda: 0.0, lambda: False)
+        assert time.monotonic() - start < 0.1
+
+        assert not scheduler.wait_for_slot(lambda: 0, lambda: None, lambda: True)
+
+        scheduler.record_slot(1.0)
+        scheduler.record_slot(2.0)
+        assert 1.0 < scheduler.effective_slot_duration < 2.0
+    finally:
+        Constants.TIME_TO_SLEEP = old_time_to_sleep
+
+def test_blockchain_reports_mempool_age():
+    blockchain = Blockchain()
+    assert blockchain.oldest_pending_age() is None
+    tx, _, _, _ = create_transaction()
+    blockchain.add_transaction(tx)
+    assert blockchain.mempool_size() == 1
+    assert blockchain.oldest_pending_age() >= 0
+
+def test_shm_ring_buffer_wraps_and_applies_backpressure():
+    ring = ShmRingBuffer(capacity=64)
+    try:
+        for i in range(20):
+            payload = f"record-{i}".encode() * (i % 3 + 1)
+            assert ring.put(payload)
+            assert ring.get(timeout=1) == payload
+
+        assert ring.put(b"x" * 40)
+        assert not ring.put(b"y" * 40, timeout=0.01), "a full ring must not overwrite unread records"
+        assert ring.get(timeout=1) == b"x" * 40
+        assert ring.get(timeout=0.01) is None
+    finally:
+        ring.close()
+
+def test_split_execution_matches_local_execution():
+    leader, other = generate_keypair()[1], generate_keypair()[1]
+    local = Blockchain()
+    split = Blockchain()
+    execution = ExecutionClient(split, capacity=1 << 16)
+    split.set_executor(execution)
+    execution.start()
+    try:
+        for i in range(3):
+            if i == 1:
+                instr = Instruction(
+                    "SystemProgram",
+                    [AccountMeta(leader, True, True), AccountMeta(other, False, True)],
+                    data=str({"amount": 4})
+                )
+                local.add_transaction(Transaction([instr]))
+            block = local.produce_block(leader)
+            assert local.add_external_block(block)
+            assert split.add_external_block(block)
+
+        assert execution.wait_applied(timeout=5)
+        assert split.get_balance(leader) == local.get_balance(leader) == 3 * Constants.BLOCK_REWARD - 4
+        assert split.get_balance(other) == local.get_balance(other) == 4
+        assert split.state_root() == local.state_root()
+
+    finally:
+        execution.stop()
+
+    resynced = Blockchain()
+    execution = ExecutionClient(resynced, capacity=1 << 16)
+    resynced.set_executor(execution)
+    execution.start()
+    try:
+        reference = Blockchain()
+        reference.try_to_update_chain(list(local.blocks))
+        resynced.try_to_update_chain(list(local.blocks))
+        assert execution.wait_applied(timeout=5)
+        assert resynced.accounts == reference.accounts
+    finally:
+        execution.stop()
+
+def test_split_execution_replay_publishes_the_rebuilt_state_once():
+    leader, other = generate_keypair()[1], generate_keypair()[1]
+    local = Blockchain()
+    for i in range(3):
+        if i == 1:
+            instr = Instruction(
+                "SystemProgram",
+                [AccountMeta(leader, True, True), AccountMeta(other, False, True)],
+                data=str({"amount": 4})
+            )
+            local.add_transaction(Transaction([instr]))
+        assert local.add_external_block(local.produce_block(leader))
+
+    split = Blockchain()
+    execution = ExecutionClient(split, capacity=1 << 16)
+    split.set_executor(execution)
+    execution.start()
+    try:
+        for block in local.blocks[1:3]:
+            assert split.add_external_block(block)
+        assert execution.wait_applied(timeout=5)
+        assert split.get_balance(other) == 4
+
+        published = []
+        publish_state = split.publish_state
+
+        def record():
+            publish_state()
+            published.append(split.state().to_dict())
+        split.publish_state = record
+
+        split.try_to_update_chain(list(local.blocks))
+        assert execution.wait_applied(timeout=5)
+        assert published == [local.state().to_dict()], "readers must never see a half-replayed ledger"
+    finally:
+        execution.stop()
+
+def test_split_execution_epoch_stakes_wait_for_the_executor():
+    Constants.SLOTS_PER_EPOCH, old_slots_per_epoch = 2, Constants.SLOTS_PER_EPOCH
+    local = Blockchain()
+    split = Blockchain()
+    execution = ExecutionClient(split, capacity=1 << 16)
+    split.set_executor(execution)
+    execution.start()
+    try:
+        validator = Keypair(generate_keypair()[0])
+        local.add_transaction(create_registration(validator))
+        block = local.produce_block(validator.address)
+        assert local.add_external_block(block)
+        assert split.add_external_block(block)
+        assert split.get_epoch_stakes(1) == local.get_epoch_stakes(1) == {validator.address: Constants.BLOCK_REWARD}
+        assert split.validators == {validator.address}
+    finally:
+        execution.stop()
+        Constants.SLOTS_PER_EPOCH = old_slots_per_epoch
+
+def test_benchmarks_report_and_flag_regressions():
+    report = run_benchmarks(amount_of_blocks=5, txs_per_block=2, ops=5, sign_ops=1, repeat=2, warmup=0,
+                            only=["tx_hash", "try_to_update_chain"])
+    assert set(report["results"]) == {"tx_hash", "try_to_update_chain"}
+    assert json.loads(json.dumps(report)) == report
+
+    baseline = json.loads(json.dumps(report))
+    baseline["results"]["tx_hash"]["median"] = report["results"]["tx_hash"]["median"] / 2
+    assert set(compare(report, baseline, threshold=0.1)) == {"tx_hash"}
+
+def test_in_memory_network_delays_drops_and_discovers():
+    network = InMemoryNetwork(latency=0.05, loss=0.5, seed=7)
+    received = []
+    done = threading.Event()
+
+    sender, receiver = network.transport(), network.transport()
+    sender.listen("127.0.0.1", 1, lambda raw: None)
+    receiver.listen("127.0.0.1", 2, lambda raw: (received.append(raw), done.set()))
+    receiver.serve_discovery(9000, lambda: "127.0.0.1:2:False:1:addr")
+
+    start = time.monotonic()
+    for i in range(20):
+        sender.send(("127.0.0.1", 2), str(i).encode())
+    assert done.wait(1)
+    assert time.monotonic() - start >= 0.05
+    time.sleep(0.1)
+
+    assert 0 < len(received) < 20
+    assert network.stats()["dropped"] == 20 - len(received)
+
+    responses = []
+    network.loss = 0.0
+    sender.discover(9000, 0.1, lambda response, rtt: responses.append((response, rtt)))
+    assert responses == [("127.0.0.1:2:False:1:addr", 0.1)]
+
+    try:
+        sender.send(("127.0.0.1", 3), b"x")
+        assert False, "sending to an unknown endpoint must fail like a refused connection"
+    except ConnectionRefusedError:
+        pass
+    network.close()
+
+def test_in_memory_network_draws_each_link_from_its_own_seeded_stream():
+    def dropped_on_first_link(other_traffic: int) -> list:
+        network = InMemoryNetwork(loss=0.5, seed=7)
+        a, b, c = network.transport(), network.transport(), network.transport()
+        for port, transport in enumerate((a, b, c), 1):
+            transport.listen("127.0.0.1", port, lambda raw: None)
+        dropped = []
+        for i in range(20):
+            for _ in range(other_traffic):
+                c.send(("127.0.0.1", 2), b"noise")
+            before = network.dropped
+            a.send(("127.0.0.1", 2), b"x")
+            dropped.append(network.dropped > before)
+        network.close()
+        return dropped
+
+    assert dropped_on_first_link(0) == dropped_on_first_link(3)
+
+def test_latency_histogram_percentiles_stay_within_resolution():
+    histogram = LatencyHistogram()
+    values = [i / 1000 for i in range(1, 1001)]
+    histogram.record_many(values)
+
+    assert histogram.count == 1000
+    for percentile, exact in ((50, 0.5), (90, 0.9), (99, 0.99), (99.9, 0.999)):
+        assert abs(histogram.percentile(percentile) - exact) / exact < 2 ** -6
+    assert histogram.percentile(100) == histogram.max == 1.0
+
+    other = LatencyHistogram()
+    other.record(5.0)
+    histogram.merge(other)
+    assert histogram.max == 5.0 and histogram.count == 1001
+
+def test_loadgen_tracks_confirmation_by_block_inclusion():
+    class LocalNode:
+        def __init__(self):
+            self.blockchain = Blockchain()
+
+        def add_and_broadcast_tx(self, tx):
+            return self.blockchain.add_transaction(tx)
+
+    node = LocalNode()
+    stop = threading.Event()
+
+    def produce():
+        while not stop.wait(0.05):
+            node.blockchain.add_external_block(node.blockchain.produce_block("leader"))
+
+    privkey, _ = generate_keypair()
+    txs = presign_transfers([privkey], ["a" * 64, "b" * 64], 20, node.blockchain.get_last_block().hash(),
+                            workers=2, chunk_size=8)
+    assert len({tx.hash() for tx in txs}) == 20
+    assert all(tx.verify() for tx in txs)
+
+    threading.Thread(target=produce, daemon=True).start()
+    try:
+        report = LoadGenerator(node, rate=200, senders=4, drain_timeout=2).run(txs)
+    finally:
+        stop.set()
+
+    assert report["confirmed"] == 20 and report["unconfirmed"] == 0
+    assert 0 < report["latency"]["p50"] <= report["latency"]["p99"] <= report["latency"]["max"]
+
+def test_metrics_registry_renders_prometheus_text_over_http():
+    metrics = MetricsRegistry()
+    blockchain = Blockchain(metrics)
+    blockchain.add_external_block(blockchain.produce_block("leader"))
+    handling = metrics.histogram("message_handling_seconds", "Handling time", ("type",), buckets=(0.01, 0.1))
+    handling.observe(0.05, "tx")
+    handling.observe(0.5, "tx")
+    dropped = metrics.counter("queue_dropped_total", "Messages shed", ("lane",))
+    dropped.set_function(lambda: 3, "tx")
+
+    server = MetricsServer(metrics, 0)
+    server.start()
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{server.port}/metrics") as response:
+            text = response.read().decode()
+    finally:
+        server.stop()
+
+    assert "# TYPE solana_blocks_added_total counter" in text
+    assert "solana_blocks_added_total 1" in text
+    assert "solana_chain_height 2" in text
+    assert 'solana_mempool_size{slot="current"} 0' in text
+    assert 'solana_message_handling_seconds_bucket{type="tx",le="0.1"} 1' in text
+    assert 'solana_message_handling_seconds_bucket{type="tx",le="+Inf"} 2' in text
+    assert 'solana_message_handling_seconds_count{type="tx"} 2' in text
+    assert '# TYPE solana_queue_dropped_total counter' in text and 'solana_queue_dropped_total{lane="tx"} 3' in text
+
+def test_block_traces_merge_into_chrome_trace_with_critical_path():
+    leader_tracer, validator_tracer = Tracer("leader"), Tracer("validator")
+    leader_chain = Blockchain(tracer=leader_tracer)
+    validator_chain = Blockchain(tracer=validator_tracer)
+
+    block = leader_chain.produce_block("leader")
+    time.sleep(0.01)
+    with validator_tracer.span("share_block", block.index):
+        assert validator_chain.add_external_block(block)
+    assert Tracer("off", enabled=False).to_events()[1:] == []
+
+    merged = merge_traces([{"traceEvents": leader_tracer.to_events()},
+                           {"traceEvents": validator_tracer.to_events()}])
+    spans = [event for event in merged["traceEvents"] if event["ph"] == "X"]
+    assert {(event["name"], event["pid"]) for event in spans} == {
+        ("produce_block", 1), ("share_block", 2), ("add_external_block", 2)}
+    assert all(event["args"]["block"] == 1 for event in spans)
+
+    path = block_critical_paths(merged)[1]
+    assert [stage["name"] for stage in path["stages"]][0] == "produce_block"
+    assert path["total_ms"] >= 10
+
+def test_fixture_generator_streams_a_replayable_signed_ledger():
+    leader_key, _ = generate_keypair()
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "blockchain.json")
+        summary = generate_fixture(path, leader_key, [], amount_of_accounts=3, amount_of_blocks=6, txs_per_block=4,
+                                   workers=2, seed=1)
+        with open(path, "r") as f:
+            blocks = DeserializeService.deserialize_chain(json.load(f))
+
+    assert len(blocks) == 6 and summary["transactions"] == sum(len(b.transactions) for b in blocks) > 0
+    assert all(blocks[i].previous_hash == blocks[i - 1].hash() for i in range(1, len(blocks)))
+    assert all(tx.verify() and tx.signatures for block in blocks for tx in block.transactions)
+
+    blockchain = Blockchain()
+    blockchain.try_to_update_chain(blocks)
+    for address, balance in summary["balances"].items():
+        assert blockchain.get_balance(address) == balance
+
+def test_state_versions_stay_consistent_for_readers():
+    blockchain = Blockchain()
+    leader = generate_keypair()[1]
+    before = blockchain.state()
+
+    assert blockchain.add_external_block(blockchain.produce_block(leader))
+    after = blockchain.state()
+    assert before.get_balance(leader) == 0.0
+    assert after.get_balance(leader) == blockchain.get_balance(leader) == Constants.BLOCK_REWARD
+
+    blockchain.try_to_update_chain([blockchain.blocks[0]])
+    assert blockchain.state() is after, "a shorter chain must not touch the published state"
+
+    version = StateVersion(0, {"a": 1.0})
+    for height in range(1, 3 * Constants.STATE_MAX_OVERLAYS):
+        version = version.derive(height, {f"b{height}": float(height)})
+    assert version.get_balance("a") == 1.0 and version.get_balance("missing") == 0.0
+    assert version.to_dict() == {"a": 1.0, **{f"b{h}": float(h) for h in range(1, 3 * Constants.STATE_MAX_OVERLAYS)}}
+
+def test_keypair_signs_like_raw_keys_and_caches_verifying_keys():
+    privkey, pubkey = generate_keypair()
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "wallet.txt")
+        save_wallet(path, privkey)
+        keypair = load_wallet(path)
+
+    assert keypair.pubkey == pubkey and keypair.address == pubkey_to_address(pubkey)
+    assert pickle.loads(pickle.dumps(keypair)).address == keypair.address
+
+    tx, _, _, _ = create_transaction(sender=keypair.address)
+    tx.sign(keypair)
+    by_string = Transaction(tx.instructions, tx.recent_blockhash)
+    by_string.sign(privkey)
+    assert set(tx.signatures) == set(by_string.signatures) == {pubkey}
+    assert tx.verify() and by_string.verify()
+
+    assert verify("message", keypair.sign("message"), pubkey)
+    assert not verify("other", keypair.sign("message"), pubkey)
+    assert verifying_key(pubkey) is verifying_key(pubkey)
+
+def test_ed25519_keypairs_sign_and_verify_alongside_ecdsa():
+    ed25519, secp256k1 = Keypair.generate(SignatureScheme.ED25519), Keypair.generate(SignatureScheme.ECDSA)
+    assert ed25519.scheme == SignatureScheme.ED25519 and secp256k1.scheme == SignatureScheme.ECDSA
+    assert len(base64.b64decode(ed25519.pubkey)) == BACKENDS[SignatureScheme.ED25519].public_key_size == 32
+    assert pickle.loads(pickle.dumps(ed25519)).pubkey == ed25519.pubkey
+
+    tx, _, _, _ = create_transaction(sender=ed25519.address)
+    tx.sign(ed25519)
+    tx.sign(secp256k1.privkey)
+    assert tx.verify()
+
+    block = Block(1, "0" * 64, [tx], ed25519.address, "poh", {})
+    assert verify(block.hash_content(), block.sign_block(ed25519), ed25519.pubkey)
+
+    tx.signatures[ed25519.pubkey] = tx.signatures[secp256k1.pubkey][:88]
+    assert not tx.verify()
+
+    private_key = base64.b64decode(ed25519.privkey)
+    for backend in (EcdsaEd25519Backend(), BACKENDS[SignatureScheme.ED25519]):
+        assert backend.signer(private_key).public_key == private_key[32:]
+        try:
+            backend.signer(private_key[:32] + bytes(32))
+            assert False, "a key file whose public half does not match its seed must be rejected"
+        except ValueError:
+            pass
+
+def test_keystore_generates_indexes_and_round_trips_keys():
+    keystore = generate_keystore(5, workers=2, chunk_size=2)
+    leader = Keypair.generate(SignatureScheme.ED25519)
+    keystore.add(leader)
+    keystore.add(leader.privkey)
+    assert len(keystore) == 6 and leader.address in keystore
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "keystore.json")
+        keystore.save(path)
+        loaded = Keystore.load(path)
+
+    assert loaded.addresses() == keystore.addresses()
+    for address in loaded.addresses():
+        keypair = loaded.keypair(address)
+        assert keypair.address == address and keypair.pubkey == loaded.pubkey(address)
+        assert loaded.keypair(address) is keypair
+
+def test_node_does_not_readmit_a_transaction_that_is_already_in_a_block():
+    privkey, _ = generate_keypair()
+    with tempfile.TemporaryDirectory() as wallet_dir:
+        wallet_file = os.path.join(wallet_dir, "wallet.txt")
+        save_wallet(wallet_file, privkey)
+        node = SolanaNode("127.0.0.1", 1, Role.LEADER, wallet_file, transport=InMemoryNetwork().transport())
+
+    tx, _, priv, _ = create_transaction()
+    tx.sign(priv)
+    node.blockchain.add_transaction(tx)
+    assert node.blockchain.add_external_block(node.blockchain.produce_block(node.address))
+
+    assert not node._admit_transaction(tx), "a late gossip copy must not be executed a second time"
+    assert node.blockchain.pending_txs == []
+
+def test_rpc_server_answers_single_and_batched_calls_over_one_connection():
+    blockchain = Blockchain()
+    tx, sender, priv, receiver = create_transaction(amount=5)
+    tx.sign(priv)
+    forged, _, _, _ = create_transaction(amount=1)
+    forged.signatures = dict(tx.signatures)
+    other, _, other_priv, _ = create_transaction(amount=1)
+    other.sign(other_priv)
+    unsigned, _, _, _ = create_transaction(amount=1)
+    impersonating, _, _, _ = create_transaction(amount=50, sender=sender)
+    impersonating.sign(other_priv)
+    blockchain.accounts[sender] = {"balance": 50}
+    server = RpcServer(blockchain, blockchain.add_transaction, 0)
+    server.start()
+    client = RpcClient("127.0.0.1", server.port)
+    try:
+        assert client.call(RpcMethod.SEND_TRANSACTION, tx.to_dict()) == tx.hash()
+        assert client.call(RpcMethod.GET_TRANSACTION_STATUS, tx.hash())["status"] == "pending"
+        try:
+            client.call(RpcMethod.SEND_TRANSACTION, forged.to_dict())
+            assert False, "a transaction with someone else's signature must be rejected"
+        except RpcError as e:
+            assert e.code == RpcErrorCode.TRANSACTION_REJECTED
+        for rejected in (unsigned, impersonating):
+            try:
+                client.call(RpcMethod.SEND_TRANSACTION, rejected.to_dict())
+                assert False, "a transaction must be signed by the key behind its sender"
+            except RpcError as e:
+                assert e.code == RpcErrorCode.TRANSACTION_REJECTED
+        assert client.call(RpcMethod.SEND_TRANSACTION_BATCH, [forged.to_dict(), {"bad": 1}, other.to_dict()]) \
+            == [None, None, other.hash()]
+        assert [pending.hash() for pending in blockchain.pending_txs] == [tx.hash(), other.hash()]
+        assert blockchain.add_external_block(blockchain.produce_block(sender))
+
+        status, balance, accounts, block, missing = client.batch([
+            (RpcMethod.GET_TRANSACTION_STATUS, [tx.hash()]),
+            (RpcMethod.GET_BALANCE, [receiver]),
+            (RpcMethod.GET_MULTIPLE_ACCOUNTS, [[sender, receiver, "unknown"]]),
+            (RpcMethod.GET_BLOCK, [1]),
+            ("getNothing", []),
+        ])
+        assert status == {"block": 1, "status": "finalized"}
+        assert balance == {"context": {"height": 2}, "value": 5}
+        assert accounts["value"] == [{"balance": 45 + Constants.BLOCK_REWARD}, {"balance": 5}, None]
+        assert DeserializeService.deserialize_block(block).hash() == blockchain.blocks[1].hash()
+        assert isinstance(missing, RpcError) and missing.code == RpcErrorCode.METHOD_NOT_FOUND
+
+        try:
+            client.call(RpcMethod.GET_BLOCK, "one")
+            assert False, "a non-integer block index must be rejected"
+        except RpcError as e:
+            assert e.code == RpcErrorCode.INVALID_PARAMS
+    finally:
+        client.close()
+        server.stop()
+
+def test_event_bus_and_feed_report_blocks_confirmations_and_balances():
+    blockchain = Blockchain()
+    tx, sender, priv, receiver = create_transaction(amount=5)
+    blockchain.accounts[sender] = {"balance": 50}
+    events = []
+    blockchain.events.subscribe(EventType.TX_CONFIRMED, lambda kind, data: events.append((kind, data)), tx.hash())
+    blockchain.events.subscribe(EventType.ACCOUNT_CHANGED, lambda kind, data: events.append((kind, data)), receiver)
+    unrelated = blockchain.events.subscribe(EventType.TX_CONFIRMED, lambda *_: events.append("other"), "f" * 64)
+    blockchain.events.unsubscribe(unrelated)
+
+    feed = EventFeedServer(blockchain.events, 0)
+    feed.start()
+    try:
+        stream = subscribe_feed("127.0.0.1", feed.port, [EventType.BLOCK_ADDED, EventType.ACCOUNT_CHANGED],
+                                keys=[sender], timeout=5)
+        first = threading.Thread(target=lambda: events.append(next(stream)))
+        first.start()
+        while not blockchain.events.has_subscribers(EventType.BLOCK_ADDED):
+            time.sleep(0.01)
+
+        blockchain.add_transaction(tx)
+        assert blockchain.add_external_block(blockchain.produce_block(sender))
+        first.join(5)
+        streamed = [events.pop(), next(stream)]
+        stream.close()
+    finally:
+        feed.stop()
+
+    assert events == [
+        (EventType.ACCOUNT_CHANGED, {"address": receiver, "balance": 5, "height": 2}),
+        (EventType.TX_CONFIRMED, {"hash": tx.hash(), "block": 1})
+    ]
+    assert sorted(kind for kind, _ in streamed) == [EventType.ACCOUNT_CHANGED, EventType.BLOCK_ADDED]
+    assert {kind: data for kind, data in streamed}[EventType.ACCOUNT_CHANGED]["balance"] == 45 + Constants.BLOCK_REWARD
+
+def test_account_events_fire_when_the_state_is_rebuilt():
+    source = Blockchain()
+    for _ in range(2):
+        assert source.add_external_block(source.produce_block("leader"))
+
+    target = Blockchain()
+    target.apply_execution_result({"gone": 7})
+    events = []
+    for address in ("leader", "gone"):
+        target.events.subscribe(EventType.ACCOUNT_CHANGED, lambda kind, data: events.append(data), address)
+
+    target.try_to_update_chain(list(source.blocks))
+    assert sorted((event["address"], event["balance"]) for event in events) == \
+        [("gone", 0.0), ("leader", 2 * Constants.BLOCK_REWARD)]
+
+    events.clear()
+    target.replace_state_buckets({target.state_tree.bucket_of("leader"): {}})
+    assert [(event["address"], event["balance"]) for event in events] == [("leader", 0.0)]
+
+def test_state_root_is_validated_and_diff_finds_only_changed_buckets():
+    leader, follower = Blockchain(), Blockchain()
+    tx, sender, priv, receiver = create_transaction(amount=5)
+    for blockchain in (leader, follower):
+        blockchain.apply_execution_result({sender: 50})
+    leader.add_transaction(tx)
+
+    block = leader.produce_block(sender)
+    assert block.state_root == follower.state_root()
+    assert DeserializeService.deserialize_block(block.to_dict()).hash() == block.hash()
+    assert leader.add_external_block(block) and follower.add_external_block(block)
+    assert leader.state_root() == follower.state_root() != block.state_root
+
+    legacy = Block(2, block.hash(), [], sender, "poh", {})
+    assert "state_root" not in legacy.to_dict()
+    assert legacy.hash() == hashlib.sha256(f"2{block.hash()}{sender}poh{legacy._txs_hash}".encode()).hexdigest()
+
+    forged = leader.produce_block(sender)
+    forged.state_root = StateTree().root()
+    assert not follower.add_external_block(forged)
+
+    class LaggingExecutor:
+        def wait_applied(self, timeout=None):
+            return False
+
+    lagging = Blockchain()
+    lagging.set_executor(LaggingExecutor())
+    assert lagging.produce_block(sender) is None, "a leader must not stamp a root its parent is not applied to"
+
+    follower.apply_execution_result({receiver: 1000})
+    remote = leader.state_tree
+    assert follower.state_tree.diff(remote.node_hashes) == [follower.state_tree.bucket_of(receiver)]
+    differing = follower.state_tree.diff(remote.node_hashes)
+    follower.replace_state_buckets({bucket: remote.bucket(bucket) for bucket in differing})
+    assert follower.state_root() == leader.state_root() and follower.get_balance(receiver) == 5
+
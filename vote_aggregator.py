@@ -0,0 +1,95 @@
+import statistics
+import threading
+import time
+from collections import deque
+from typing import Dict, Iterable, List
+
+from constants import Constants, SignatureField
+from wallet import pubkey_to_address, verify
+
+
+class Vote:
+    def __init__(self, index: int, block_hash: str, address: str, pubkey: str, signature: str):
+        self.index = index
+        self.block_hash = block_hash
+        self.address = address
+        self.pubkey = pubkey
+        self.signature = signature
+
+    def verify(self) -> bool:
+        if pubkey_to_address(self.pubkey) != self.address:
+            return False
+        return verify(self.block_hash, self.signature, self.pubkey)
+
+    def to_dict(self):
+        return {
+            SignatureField.INDEX: self.index,
+            SignatureField.BLOCK_HASH: self.block_hash,
+            SignatureField.ADDRESS: self.address,
+            SignatureField.PUBKEY: self.pubkey,
+            SignatureField.SIGNATURE: self.signature
+        }
+
+
+class VoteRound:
+    def __init__(self, block_hash: str, validators: Iterable[str]):
+        self.block_hash = block_hash
+        self.validators = frozenset(validators)
+        self.votes: Dict[str, Vote] = {}
+        self.started_at = time.perf_counter()
+        self.finalized = False
+
+
+class VoteAggregator:
+    def __init__(self, history: int = 1000, max_rounds: int = None):
+        # one vote set per slot, so a SIGNATURE message may carry votes for several slots
+        self._rounds: Dict[int, VoteRound] = {}
+        self._max_rounds = max_rounds or Constants.VOTE_ROUNDS
+        self._latencies = deque(maxlen=history)
+        self._lock = threading.Lock()
+
+    def start(self, index: int, block_hash: str, validators: Iterable[str]):
+        with self._lock:
+            self._rounds[index] = VoteRound(block_hash, validators)
+            while len(self._rounds) > self._max_rounds:
+                del self._rounds[min(self._rounds)]
+
+    def add_votes(self, votes: List[Vote]) -> List[Vote]:
+        accepted = []
+        with self._lock:
+            for vote in votes:
+                vote_round = self._rounds.get(vote.index)
+                if vote_round is None or vote.block_hash != vote_round.block_hash:
+                    continue
+                # a valid signature only proves a keypair; only validators known when the round started may vote
+                if vote.address not in vote_round.validators or vote.address in vote_round.votes:
+                    continue
+                vote_round.votes[vote.address] = vote
+                accepted.append(vote)
+        return accepted
+
+    def try_quorum(self, index: int) -> bool:
+        with self._lock:
+            vote_round = self._rounds.get(index)
+            if vote_round is None or vote_round.finalized or 3 * len(vote_round.votes) < 2 * len(vote_round.validators):
+                return False
+            vote_round.finalized = True
+            self._latencies.append(time.perf_counter() - vote_round.started_at)
+            return True
+
+    def vote_count(self, index: int) -> int:
+        with self._lock:
+            vote_round = self._rounds.get(index)
+            return len(vote_round.votes) if vote_round is not None else 0
+
+    def latency_stats(self) -> dict:
+        with self._lock:
+            latencies = list(self._latencies)
+        if not latencies:
+            return {"count": 0}
+        return {
+            "count": len(latencies),
+            "avg": statistics.mean(latencies),
+            "median": statistics.median(latencies),
+            "max": max(latencies)
+        }
@@ -1,15 +1,19 @@
-import ecdsa
 import hashlib
 import base64
 import os
+from functools import lru_cache
+from typing import Union
 
+from constants import Constants, SignatureScheme
+from signature_backend import Verifier, backend_for_private_key, backend_for_public_key, get_backend
 
-def generate_keypair() -> (str, str):
-    sk = ecdsa.SigningKey.generate(curve=ecdsa.SECP256k1)
-    vk = sk.get_verifying_key()
 
-    privkey_b64 = base64.b64encode(sk.to_string()).decode()
-    pubkey_b64 = base64.b64encode(vk.to_string()).decode()
+def generate_keypair(scheme: SignatureScheme = None) -> (str, str):
+    backend = get_backend(scheme)
+    private_key = backend.generate()
+
+    privkey_b64 = base64.b64encode(private_key).decode()
+    pubkey_b64 = base64.b64encode(backend.signer(private_key).public_key).decode()
     return privkey_b64, pubkey_b64
 
 
@@ -18,36 +22,57 @@ def pubkey_to_address(pubkey_b64: str) -> str:
     return hashlib.sha256(pubkey_bytes).hexdigest()
 
 
+class Keypair:
+    def __init__(self, privkey_b64: str):
+        private_key = base64.b64decode(privkey_b64)
+        backend = backend_for_private_key(private_key)
+        self.privkey = privkey_b64
+        self.scheme = backend.scheme
+        self.signer = backend.signer(private_key)
+        self.pubkey = base64.b64encode(self.signer.public_key).decode()
+        self.address = pubkey_to_address(self.pubkey)
+
+    @classmethod
+    def generate(cls, scheme: SignatureScheme = None) -> "Keypair":
+        return cls(generate_keypair(scheme)[0])
+
+    def sign(self, message: str) -> str:
+        return base64.b64encode(self.signer.sign(message.encode())).decode()
+
+    def __reduce__(self):
+        # worker processes rebuild the signing key from the encoded private key
+        return Keypair, (self.privkey,)
+
+
+def as_keypair(key: Union[Keypair, str]) -> Keypair:
+    return key if isinstance(key, Keypair) else Keypair(key)
+
+
+@lru_cache(maxsize=Constants.VERIFYING_KEY_CACHE_SIZE)
+def verifying_key(pubkey_b64: str) -> Verifier:
+    public_key = base64.b64decode(pubkey_b64)
+    return backend_for_public_key(public_key).verifier(public_key)
+
+
 def save_wallet(filename: str, privkey_b64: str) -> None:
     with open(filename, 'w') as f:
         f.write(privkey_b64)
 
 
-def load_wallet(filename: str) -> str:
+def load_wallet(filename: str) -> Keypair:
     if not os.path.exists(filename):
         raise FileNotFoundError("Wallet not found")
     with open(filename, 'r') as f:
-        return f.read()
+        return Keypair(f.read())
 
 
 def get_public_key(privkey_b64: str) -> str:
-    sk = ecdsa.SigningKey.from_string(base64.b64decode(privkey_b64), curve=ecdsa.SECP256k1)
-    vk = sk.get_verifying_key()
-    pubkey_bytes = vk.to_string()
-    return base64.b64encode(pubkey_bytes).decode()
+    return Keypair(privkey_b64).pubkey
 
 
-def sign(message: str, privkey_b64: str) -> str:
-    sk = ecdsa.SigningKey.from_string(base64.b64decode(privkey_b64), curve=ecdsa.SECP256k1)
-    signature = sk.sign(message.encode())
-    return base64.b64encode(signature).decode()
+def sign(message: str, key: Union[Keypair, str]) -> str:
+    return as_keypair(key).sign(message)
 
 
 def verify(message: str, signature_b64: str, pubkey_b64: str) -> bool:
-    vk = ecdsa.VerifyingKey.from_string(base64.b64decode(pubkey_b64), curve=ecdsa.SECP256k1)
-    try:
-        vk.verify(base64.b64decode(signature_b64), message.encode())
-        return True
-    except ecdsa.BadSignatureError:
-        return False
-
+    return verifying_key(pubkey_b64)(base64.b64decode(signature_b64), message.encode())